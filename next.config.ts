@@ -1,4 +1,5 @@
 import type { NextConfig } from "next";
+import { ARTIFACTS, ARTIFACT_MANIFEST } from "./src/lib/artifacts";
 
 const nextConfig: NextConfig = {
   eslint: {
@@ -7,6 +8,36 @@ const nextConfig: NextConfig = {
   turbopack: {
     root: __dirname,
   },
+  // Files read from disk at request time, which tracing can't infer
+  outputFileTracingIncludes: {
+    // Case studies, from their version store
+    "/api/ai-consultant": ["./Case_studies/version-store.json"],
+    // Precompressed crawler artifacts (and their .gz/.br variants) in public/
+    "/artifacts/[name]": [
+      `./public/${ARTIFACT_MANIFEST}`,
+      ...ARTIFACTS.map((name) => `./public/${name}*`),
+    ],
+  },
+  // /artifacts/<name> is only an internal rewrite target; send direct
+  // requests to the canonical URL so each file has one cacheable address
+  async redirects() {
+    return ARTIFACTS.map((name) => ({
+      source: `/artifacts/${name}`,
+      destination: `/${name}`,
+      permanent: true,
+    }));
+  },
+  async rewrites() {
+    return {
+      // beforeFiles, so these win over the plain files in public/
+      beforeFiles: ARTIFACTS.map((name) => ({
+        source: `/${name}`,
+        destination: `/artifacts/${name}`,
+      })),
+      afterFiles: [],
+      fallback: [],
+    };
+  },
 };
 
 export default nextConfig;
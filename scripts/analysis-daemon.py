@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Analysis Scheduler Daemon
+
+Runs the traffic, bot and concierge analyses on a schedule from one
+long-lived process instead of cold cron runs:
+- The scripts are loaded once and one GA4 client is authenticated once,
+  so its gRPC channel and OAuth token stay warm between runs
+- Each analysis has its own interval with random jitter, so runs drift
+  apart instead of all landing on the same minute
+- Analyses due within the same coalescing window run as one batch
+  through a shared response cache: an identical GA4 request is fetched
+  once and reused until --cache-ttl expires
+- The latest results (report text, metrics, timings, next run) are
+  written atomically to a JSON file and can be served on a local port
+
+The client is rebuilt after a batch with errors, in case its credentials
+or channel went bad. SIGINT/SIGTERM stop the daemon after the current
+analysis.
+
+Usage:
+    python scripts/analysis-daemon.py
+    python scripts/analysis-daemon.py --schedule traffic=60,bots=30,concierge=120 --jitter 0.1
+    python scripts/analysis-daemon.py --serve 8765 --metrics .cache/daemon/cie.prom
+    python scripts/analysis-daemon.py --once  # one batch of every analysis, then exit
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import signal
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import metrics_export
+
+BASE_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = Path(__file__).parent
+RESULTS_FILE = BASE_DIR / ".cache" / "daemon" / "latest.json"
+
+# Analysis → script providing get_ga4_client() and run_analyses()
+ANALYSES = {
+    'traffic': 'analyze-ga4-traffic.py',
+    'bots': 'analyze-ai-bot-traffic.py',
+    'concierge': 'analyze-concierge-usage.py',
+}
+
+DEFAULT_SCHEDULE_MINUTES = {
+    'traffic': 60,
+    'bots': 30,
+    'concierge': 120,
+}
+
+DEFAULT_JITTER = 0.1            # ± fraction of each interval
+DEFAULT_COALESCE_SECONDS = 120  # analyses due this close together share a batch
+DEFAULT_CACHE_TTL_SECONDS = 600
+
+GA4_METHODS = ('run_report', 'run_pivot_report', 'run_realtime_report')
+
+
+def _now_iso(timestamp: Optional[float] = None) -> str:
+    moment = datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else datetime.now(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def load_script(filename: str):
+    """Import a hyphenated script as a module (its main() is not run)."""
+    path = SCRIPTS_DIR / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _request_key(method: str, request) -> Optional[str]:
+    try:
+        return f"{method}:{type(request).to_json(request)}"
+    except Exception:
+        return None  # not a proto-plus message; never cached
+
+
+class ResponseCache:
+    """GA4 responses by request, shared by every analysis in the daemon."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, response):
+        self.misses += 1
+        self.entries[key] = (time.monotonic() + self.ttl, response)
+
+    def expire(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self.entries.items() if expires < now]:
+            del self.entries[key]
+
+
+class CachingClient:
+    """GA4 client proxy answering repeated requests from a ResponseCache."""
+
+    def __init__(self, client, cache: ResponseCache):
+        self._client = client
+        self._cache = cache
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name not in GA4_METHODS or not callable(attribute):
+            return attribute
+
+        def call(request=None, *args, **kwargs):
+            key = _request_key(name, request) if not args and not kwargs else None
+            if key is not None:
+                response = self._cache.get(key)
+                if response is not None:
+                    return response
+            response = attribute(request, *args, **kwargs)
+            if key is not None:
+                self._cache.put(key, response)
+            return response
+        return call
+
+
+class Job:
+    def __init__(self, name: str, interval_minutes: float, jitter: float):
+        self.name = name
+        self.interval = interval_minutes * 60
+        self.jitter = jitter
+        self.next_run = time.time()
+
+    def schedule_next(self, now: float):
+        self.next_run = now + self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+class AnalysisDaemon:
+    def __init__(self, args):
+        self.args = args
+        self.modules = {name: load_script(filename) for name, filename in ANALYSES.items()}
+        self.jobs = [Job(name, minutes, args.jitter) for name, minutes in args.schedule.items()]
+        self.cache = ResponseCache(args.cache_ttl)
+        self.client = None
+        self.client_created = None
+        self.batches = 0
+        self.results: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+        # Bot state kept in memory between runs, persisted after each one
+        from crawl_anomaly import CrawlAnomalyDetector
+        from sketches import DailySketchStore
+
+        self.detector = CrawlAnomalyDetector.load(args.crawl_state) if args.crawl_state else None
+        self.sketch_store = DailySketchStore(args.sketch_dir) if args.sketch_dir else None
+
+    def ensure_client(self):
+        if self.client is None:
+            self.client = self.modules['traffic'].get_ga4_client()
+            self.client_created = time.time()
+        return self.client
+
+    def run_analysis(self, name: str, client) -> None:
+        module = self.modules[name]
+        days = self.args.days
+        if name == 'bots':
+            module.run_analyses(client, days=days, detector=self.detector, sketch_store=self.sketch_store)
+            if self.detector is not None:
+                self.detector.save(self.args.crawl_state)
+        else:
+            module.run_analyses(client, days=days)
+
+    def run_job(self, job: Job, raw_client) -> bool:
+        started = time.time()
+        hits, misses = self.cache.hits, self.cache.misses
+        report = io.StringIO()
+        error = None
+        collected = None
+        try:
+            with metrics_export.collecting(self.args.metrics, Path(ANALYSES[job.name]).stem) as collected:
+                client = CachingClient(metrics_export.metered_client(raw_client), self.cache)
+                with contextlib.redirect_stdout(report):
+                    self.run_analysis(job.name, client)
+        except Exception as e:
+            import traceback
+
+            error = f"{type(e).__name__}: {e}"
+            report.write("\n" + traceback.format_exc())
+
+        finished = time.time()
+        job.schedule_next(finished)
+        # The analyses report GA4 errors themselves and carry on; they show up as a failed run
+        ok = error is None and collected is not None and collected.success
+        result = {
+            'status': 'ok' if ok else 'error',
+            'error': error,
+            'started': _now_iso(started),
+            'duration_s': round(finished - started, 3),
+            'next_run': _now_iso(job.next_run),
+            'ga4_requests': collected.ga4_requests if collected else 0,
+            'cache_hits': self.cache.hits - hits,
+            'cache_misses': self.cache.misses - misses,
+            'metrics': collected.sample_list() if collected else [],
+            'report': report.getvalue(),
+        }
+        with self.lock:
+            self.results[job.name] = result
+
+        print(f"  {'✓' if ok else '❌'} {job.name}: {result['duration_s']:.1f}s, {result['ga4_requests']} GA4 requests, "
+              f"{result['cache_hits']} cache hits, next run {result['next_run']}")
+        if not ok:
+            print(f"     {error or 'run reported errors'}")
+        return ok
+
+    def run_batch(self, jobs: List[Job]):
+        self.batches += 1
+        self.cache.expire()
+        print(f"\n🕒 {_now_iso()} batch {self.batches}: {', '.join(job.name for job in jobs)}")
+        try:
+            client = self.ensure_client()
+        except Exception as e:
+            print(f"  ❌ Could not create GA4 client: {e}")
+            for job in jobs:
+                job.schedule_next(time.time())
+            return
+
+        healthy = True
+        for job in jobs:
+            if self.stopping.is_set():
+                break
+            healthy = self.run_job(job, client) and healthy
+
+        if not healthy:
+            # Rebuilt on the next batch in case the credentials or channel went bad
+            self.client = None
+        self.write_results()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'updated': _now_iso(),
+                'client_created': _now_iso(self.client_created) if self.client_created else None,
+                'batches': self.batches,
+                'schedule': {job.name: {'interval_minutes': job.interval / 60, 'next_run': _now_iso(job.next_run)}
+                             for job in self.jobs},
+                'analyses': dict(self.results),
+            }
+
+    def write_results(self):
+        path = Path(self.args.results)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def due_jobs(self, now: float) -> List[Job]:
+        return [job for job in self.jobs if job.next_run <= now + self.args.coalesce]
+
+    def run(self):
+        while not self.stopping.is_set():
+            now = time.time()
+            due = [job for job in self.jobs if job.next_run <= now]
+            if due:
+                # Pull in anything due shortly so it shares this batch's fetches
+                self.run_batch(self.due_jobs(now))
+                if self.args.once:
+                    break
+                continue
+            wake = min(job.next_run for job in self.jobs)
+            self.stopping.wait(max(1.0, wake - now))
+
+    def serve(self, port: int):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.strip('/')
+                if not name:
+                    body = json.dumps(daemon.snapshot(), indent=2, ensure_ascii=False)
+                    content_type = 'application/json'
+                elif name in daemon.results:
+                    body = daemon.results[name]['report']
+                    content_type = 'text/plain; charset=utf-8'
+                else:
+                    self.send_error(404, f"Unknown analysis; try one of {', '.join(ANALYSES)}")
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 Serving latest results on http://127.0.0.1:{port}/ (/<analysis> for report text)")
+        return server
+
+
+def parse_schedule(value: str) -> Dict[str, float]:
+    schedule = {}
+    for item in value.split(','):
+        name, _, minutes = item.partition('=')
+        name = name.strip()
+        if name not in ANALYSES:
+            raise ValueError(f"unknown analysis '{name}' (choose from {', '.join(ANALYSES)})")
+        schedule[name] = float(minutes)
+        if schedule[name] <= 0:
+            raise ValueError(f"interval for '{name}' must be positive")
+    return schedule
+
+
+def main():
+    """Run the analyses on a schedule until interrupted."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run GA4 analyses on a schedule with warm clients')
+    parser.add_argument('--schedule', default=','.join(f"{k}={v}" for k, v in DEFAULT_SCHEDULE_MINUTES.items()),
+                        help='Comma-separated analysis=minutes (default: %(default)s); omit one to skip it')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER,
+                        help='Random ± fraction applied to each interval')
+    parser.add_argument('--coalesce', type=float, default=DEFAULT_COALESCE_SECONDS,
+                        help='Seconds within which due analyses run together as one batch')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL_SECONDS,
+                        help='Seconds a GA4 response is reused across analyses')
+    parser.add_argument('--days', type=int, default=30, help='Number of days each analysis covers')
+    parser.add_argument('--results', default=str(RESULTS_FILE), help='JSON file with the latest results')
+    parser.add_argument('--serve', type=int, metavar='PORT', help='Serve the latest results on 127.0.0.1:PORT')
+    parser.add_argument('--metrics', metavar='PROM_FILE', help='Also write each run to an OpenMetrics textfile')
+    parser.add_argument('--crawl-state', help='Crawl anomaly state for the bot analysis')
+    parser.add_argument('--sketch-dir', help='Daily sketch directory for the bot analysis')
+    parser.add_argument('--once', action='store_true', help='Run one batch of every scheduled analysis and exit')
+    args = parser.parse_args()
+
+    try:
+        args.schedule = parse_schedule(args.schedule)
+    except ValueError as e:
+        parser.error(str(e))
+
+    daemon = AnalysisDaemon(args)
+
+    def stop(signum, frame):
+        print("\n⏹️  Stopping after the current analysis...")
+        daemon.stopping.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print("\n" + "=" * 70)
+    print("  ANALYSIS DAEMON")
+    print("  Context is Everything - Property ID: 506980538")
+    print("=" * 70)
+    for job in daemon.jobs:
+        print(f"  • {job.name}: every {job.interval / 60:g} min ±{args.jitter:.0%}")
+    print(f"  Results: {args.results}")
+
+    server = daemon.serve(args.serve) if args.serve else None
+    try:
+        daemon.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+    print("✓ Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
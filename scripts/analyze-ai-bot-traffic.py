@@ -14,9 +14,18 @@ Tracks:
 - What content they're accessing
 - JSON/structured data consumption
 - Article discovery patterns
+- Which Google searches lead to which articles (Search Console exports)
 
 Usage:
     python scripts/analyze-ai-bot-traffic.py [--days 30]
+    python scripts/analyze-ai-bot-traffic.py --crawl-state .cache/crawl-state.json
+    python scripts/analyze-ai-bot-traffic.py --sketch-dir .cache/sketches --days 365
+    python scripts/analyze-ai-bot-traffic.py --search-console-export exports/*.csv.gz  # real organic queries
+    python scripts/analyze-ai-bot-traffic.py --access-log logs/*.jsonl.gz  # offline, no GA4
+    python scripts/analyze-ai-bot-traffic.py --profile trace.json  # phase and GA4 request timings
+    python scripts/analyze-ai-bot-traffic.py --metrics /var/lib/node_exporter/textfile/cie.prom  # OpenMetrics export
+    python scripts/analyze-ai-bot-traffic.py --properties ga4-properties.json  # several sites concurrently, with rollups
+    python scripts/analyze-ai-bot-traffic.py --days 365 --shard month  # long ranges as parallel monthly requests
 """
 
 import json
@@ -24,19 +33,38 @@ import base64
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import (
-    DateRange,
-    Dimension,
-    Metric,
-    RunReportRequest,
-    FilterExpression,
-    Filter,
+from functools import partial
+from article_index import BASE_DIR, get_article_index, normalize_path
+from crawl_anomaly import CrawlAnomalyDetector
+from endpoint_accounting import (
+    DEFAULT_COST_PER_GB,
+    EndpointAccounting,
+    cache_hit_ratio,
+    conditional_ratio,
+    format_bytes,
+    read_log_records,
 )
+from ga4_rows import DailySourceRow, LandingPageRow, PathRow, SearchQueryRow, TechnologyRow, intern
+from metrics_export import metered_client, record, record_failure, start_metrics
+from profiling import annotate, profiled_client, span, start_profiling, traced
+from sketches import DailySketchStore, TrafficSketch, build_daily_sketches
 
 # GA4 Property ID
 GA4_PROPERTY_ID = "506980538"
 
+# Rows per page when paging through large reports
+REPORT_PAGE_SIZE = 100000
+
+# GA4 keeps processing a day's events for up to 48 hours, so only days at
+# least this old are final enough to persist (sketches, detector state)
+GA4_SETTLED_DAYS = 3
+
+# Paths exported per endpoint metric (keeps label cardinality bounded)
+METRICS_TOP_PATHS = 20
+
+# Search Console store used when exports are ingested without --search-console-db
+DEFAULT_SEARCH_CONSOLE_DB = BASE_DIR / ".cache" / "search-console.sqlite3"
+
 # Known AI bot user agents
 AI_BOTS = {
     'ChatGPT': ['GPTBot', 'ChatGPT-User', 'OpenAI'],
@@ -50,8 +78,20 @@ AI_BOTS = {
 }
 
 
+def classify_ai_bot(value):
+    """Return the AI_BOTS name matching a source/user-agent string, or None."""
+    value = value.lower()
+    for bot_name, patterns in AI_BOTS.items():
+        if bot_name.lower() in value or any(p.lower() in value for p in patterns):
+            return bot_name
+    return None
+
+
+@traced
 def get_ga4_client():
     """Initialize GA4 client with credentials from environment or file."""
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+
     credentials_b64 = os.getenv('GA4_SERVICE_ACCOUNT_KEY')
 
     if credentials_b64:
@@ -63,13 +103,16 @@ def get_ga4_client():
     return BetaAnalyticsDataClient.from_service_account_info(credentials_json)
 
 
-def analyze_bot_traffic_by_user_agent(client, days=30):
+@traced
+def analyze_bot_traffic_by_user_agent(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze traffic patterns by user agent to identify AI bots."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n🤖 AI BOT TRAFFIC ANALYSIS (Last {days} days)")
     print("=" * 70)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -92,52 +135,41 @@ def analyze_bot_traffic_by_user_agent(client, days=30):
     human_sessions = []
 
     for row in response.rows:
-        os_name = row.dimension_values[0].value
-        browser = row.dimension_values[1].value
-        device = row.dimension_values[2].value
-        sessions = int(row.metric_values[0].value)
-        pageviews = int(row.metric_values[1].value)
-        duration = float(row.metric_values[2].value)
+        entry = TechnologyRow.from_row(row)
 
         # Bot detection heuristics
         is_likely_bot = (
-            duration == 0 or
-            browser.lower() in ['(not set)', 'unknown'] or
-            os_name == '(not set)' or
-            (pageviews / sessions) > 10  # Too many pages too fast
+            entry.duration == 0 or
+            entry.browser.lower() in ['(not set)', 'unknown'] or
+            entry.os == '(not set)' or
+            (entry.pageviews / entry.sessions) > 10  # Too many pages too fast
         )
 
-        entry = {
-            'os': os_name,
-            'browser': browser,
-            'device': device,
-            'sessions': sessions,
-            'pageviews': pageviews,
-            'duration': duration,
-        }
-
         if is_likely_bot:
             bot_sessions.append(entry)
         else:
             human_sessions.append(entry)
 
+    record('bot_sessions', sum(s.sessions for s in bot_sessions))
+    record('human_sessions', sum(s.sessions for s in human_sessions))
+
     # Print bot traffic
     if bot_sessions:
-        total_bot_sessions = sum(s['sessions'] for s in bot_sessions)
-        total_bot_pageviews = sum(s['pageviews'] for s in bot_sessions)
+        total_bot_sessions = sum(s.sessions for s in bot_sessions)
+        total_bot_pageviews = sum(s.pageviews for s in bot_sessions)
         print(f"\n🔍 DETECTED BOT TRAFFIC:")
         print(f"Total Bot Sessions: {total_bot_sessions}")
         print(f"Total Bot Pageviews: {total_bot_pageviews}")
         print(f"\nTop Bot Patterns:")
-        for entry in sorted(bot_sessions, key=lambda x: x['sessions'], reverse=True)[:10]:
-            print(f"  • {entry['browser']} on {entry['os']} ({entry['device']})")
-            print(f"    Sessions: {entry['sessions']}, Pages: {entry['pageviews']}, Duration: {entry['duration']:.1f}s")
+        for entry in sorted(bot_sessions, key=lambda x: x.sessions, reverse=True)[:10]:
+            print(f"  • {entry.browser} on {entry.os} ({entry.device})")
+            print(f"    Sessions: {entry.sessions}, Pages: {entry.pageviews}, Duration: {entry.duration:.1f}s")
     else:
         print("\n✓ No obvious bot traffic detected")
 
     # Print human traffic for comparison
-    total_human_sessions = sum(s['sessions'] for s in human_sessions)
-    total_human_pageviews = sum(s['pageviews'] for s in human_sessions)
+    total_human_sessions = sum(s.sessions for s in human_sessions)
+    total_human_pageviews = sum(s.pageviews for s in human_sessions)
     print(f"\n👥 HUMAN TRAFFIC (for comparison):")
     print(f"Total Human Sessions: {total_human_sessions}")
     print(f"Total Human Pageviews: {total_human_pageviews}")
@@ -145,13 +177,16 @@ def analyze_bot_traffic_by_user_agent(client, days=30):
     return bot_sessions, human_sessions
 
 
-def analyze_json_content_access(client, days=30):
+@traced
+def analyze_json_content_access(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze access to JSON files and structured content."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n📄 STRUCTURED CONTENT ACCESS ANALYSIS")
     print("=" * 70)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -167,61 +202,137 @@ def analyze_json_content_access(client, days=30):
 
     response = client.run_report(request)
 
+    index = get_article_index()
     json_pages = []
     api_pages = []
-    article_pages = []
+    article_pages = defaultdict(lambda: {'views': 0, 'users': 0, 'paths': 0})
     other_pages = []
 
     for row in response.rows:
-        path = row.dimension_values[0].value
-        views = int(row.metric_values[0].value)
-        users = int(row.metric_values[1].value)
-
-        entry = {'path': path, 'views': views, 'users': users}
+        entry = PathRow.from_row(row)
+        path = entry.path
+        article = index.resolve(path)
 
         if '.json' in path.lower():
             json_pages.append(entry)
         elif '/api/' in path:
             api_pages.append(entry)
-        elif '/insights/' in path or '/articles/' in path:
-            article_pages.append(entry)
+        elif article:
+            # Fold query-string/locale variants into the canonical article
+            totals = article_pages[article['id']]
+            totals['path'] = f"/insights/{article['slug']}"
+            totals['views'] += entry.views
+            totals['users'] += entry.users
+            totals['paths'] += 1
         else:
             other_pages.append(entry)
 
+    for metric, pages in (('json_endpoint_hits', json_pages), ('api_endpoint_hits', api_pages)):
+        for entry in sorted(pages, key=lambda x: x.views, reverse=True)[:METRICS_TOP_PATHS]:
+            record(metric, entry.views, path=entry.path)
+    for entry in article_pages.values():
+        record('article_views', entry['views'], path=entry['path'])
+
     # JSON file access
     if json_pages:
         print(f"\n📋 JSON FILE ACCESS:")
         print(f"Total JSON files accessed: {len(json_pages)}")
-        for entry in sorted(json_pages, key=lambda x: x['views'], reverse=True)[:10]:
-            print(f"  • {entry['path']}")
-            print(f"    Views: {entry['views']}, Users: {entry['users']}")
+        for entry in sorted(json_pages, key=lambda x: x.views, reverse=True)[:10]:
+            print(f"  • {entry.path}")
+            print(f"    Views: {entry.views}, Users: {entry.users}")
     else:
         print(f"\n📋 JSON FILE ACCESS: None detected")
 
     # API endpoint access
     if api_pages:
         print(f"\n🔌 API ENDPOINT ACCESS:")
-        for entry in sorted(api_pages, key=lambda x: x['views'], reverse=True)[:10]:
-            print(f"  • {entry['path']}")
-            print(f"    Views: {entry['views']}, Users: {entry['users']}")
+        for entry in sorted(api_pages, key=lambda x: x.views, reverse=True)[:10]:
+            print(f"  • {entry.path}")
+            print(f"    Views: {entry.views}, Users: {entry.users}")
 
     # Article/insight pages
     if article_pages:
         print(f"\n📰 ARTICLE/INSIGHT ACCESS:")
-        print(f"Total articles accessed: {len(article_pages)}")
-        for entry in sorted(article_pages, key=lambda x: x['views'], reverse=True)[:10]:
+        print(f"Total articles accessed: {len(article_pages)} of {len(index)}")
+        for entry in sorted(article_pages.values(), key=lambda x: x['views'], reverse=True)[:10]:
             print(f"  • {entry['path']}")
-            print(f"    Views: {entry['views']}, Users: {entry['users']}")
+            print(f"    Views: {entry['views']}, Users: {entry['users']}, Path variants: {entry['paths']}")
+
 
+@traced
+def analyze_endpoint_bandwidth(log_paths, cost_per_gb=DEFAULT_COST_PER_GB):
+    """Attribute bytes, cache hits and refetches on machine endpoints to bots.
+
+    Unlike the GA4 analyses this reads raw request logs, which carry the
+    response sizes and cache status GA4 never sees.
+    """
+    print(f"\n💾 MACHINE ENDPOINT BANDWIDTH ACCOUNTING")
+    print("=" * 70)
+
+    accounting = EndpointAccounting(classify=classify_ai_bot)
+    skipped = {}
+    accounting.add_all(read_log_records(log_paths, skipped))
+    if skipped.get('invalid'):
+        print(f"\n⚠️  Skipped {skipped['invalid']} log records with a non-numeric status or size")
+
+    if not accounting.stats:
+        print(f"\n⚠️  No requests to machine-readable endpoints found")
+        return accounting
+
+    def describe(stats):
+        hit_ratio = cache_hit_ratio(stats)
+        cond_ratio = conditional_ratio(stats)
+        hit_text = f"{hit_ratio*100:.0f}%" if hit_ratio is not None else "n/a"
+        cond_text = f"{cond_ratio*100:.0f}%" if cond_ratio is not None else "n/a"
+        return (f"{stats['requests']} requests, {format_bytes(stats['bytes'])}, "
+                f"cache hits {hit_text}, 304s {cond_text}, repeat downloads {stats['repeat_full']}")
+
+    for endpoint, stats in accounting.rollup('endpoint').items():
+        record('endpoint_bytes', stats['bytes'], endpoint=endpoint)
+
+    total_bytes = sum(stats['bytes'] for stats in accounting.stats.values())
+    print(f"\n📦 Total served: {format_bytes(total_bytes)} "
+          f"(≈ ${total_bytes / 1024 ** 3 * cost_per_gb:.4f} at ${cost_per_gb}/GB)")
+
+    print(f"\n🔌 BY ENDPOINT:")
+    for endpoint, stats in sorted(accounting.rollup('endpoint').items(),
+                                  key=lambda x: x[1]['bytes'], reverse=True):
+        print(f"  • {endpoint}")
+        print(f"    {describe(stats)}")
+
+    print(f"\n🤖 BY BOT:")
+    for bot, stats in sorted(accounting.rollup('bot').items(),
+                             key=lambda x: x[1]['bytes'], reverse=True):
+        print(f"  • {bot}")
+        print(f"    {describe(stats)}")
+
+    repeaters = [(key, stats) for key, stats in accounting.stats.items() if stats['repeat_full']]
+    if repeaters:
+        print(f"\n🔁 TOP RE-DOWNLOADERS (full fetches within 24h of the previous one):")
+        # Rank by bytes wasted: repeats × average response size
+        repeaters.sort(key=lambda x: x[1]['repeat_full'] * x[1]['bytes'] / x[1]['requests'], reverse=True)
+        for (bot, endpoint), stats in repeaters[:10]:
+            print(f"  • {bot} → {endpoint}: {stats['repeat_full']} repeats, "
+                  f"{stats['not_modified']} conditional hits")
+
+    return accounting
+
+
+@traced
+def analyze_crawl_patterns(client, days=30, detector=None, property_id=GA4_PROPERTY_ID):
+    """Analyze page view patterns that indicate crawling behavior.
+
+    If a CrawlAnomalyDetector is given, daily pageviews per source are also
+    fed through it to flag crawler surges and drop-offs.
+    """
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
 
-def analyze_crawl_patterns(client, days=30):
-    """Analyze page view patterns that indicate crawling behavior."""
     print(f"\n🕷️  CRAWL PATTERN ANALYSIS")
     print("=" * 70)
 
     # Look for sessions with many pageviews (typical crawler behavior)
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -240,42 +351,159 @@ def analyze_crawl_patterns(client, days=30):
     response = client.run_report(request)
 
     crawl_patterns = []
+    daily_activity = []
+    settled = (datetime.now() - timedelta(days=GA4_SETTLED_DAYS)).strftime("%Y%m%d")
     for row in response.rows:
-        date = row.dimension_values[0].value
-        source = row.dimension_values[1].value
-        sessions = int(row.metric_values[0].value)
-        pageviews = int(row.metric_values[1].value)
-        duration = float(row.metric_values[2].value)
-
-        if sessions > 0:
-            pages_per_session = pageviews / sessions
-
-            # Crawler indicators: many pages, short duration
-            if pages_per_session > 5 and duration < 60:
-                crawl_patterns.append({
-                    'date': date,
-                    'source': source,
-                    'sessions': sessions,
-                    'pages_per_session': pages_per_session,
-                    'duration': duration
-                })
+        entry = DailySourceRow.from_row(row)
+
+        # The last few days are still being processed and would read as drop-offs;
+        # the detector's state only ever takes final days
+        if entry.date <= settled:
+            daily_activity.append((entry.date, entry.source, entry.pageviews))
+
+        # Crawler indicators: many pages, short duration
+        if entry.sessions > 0 and entry.pages_per_session > 5 and entry.duration < 60:
+            crawl_patterns.append(entry)
 
     if crawl_patterns:
         print(f"\n🔍 POTENTIAL CRAWLER ACTIVITY:")
         print(f"Sessions with crawler-like patterns: {len(crawl_patterns)}")
-        for entry in sorted(crawl_patterns, key=lambda x: x['pages_per_session'], reverse=True)[:10]:
-            date_formatted = f"{entry['date'][:4]}-{entry['date'][4:6]}-{entry['date'][6:]}"
-            print(f"  • {date_formatted} - {entry['source']}")
-            print(f"    {entry['pages_per_session']:.1f} pages/session, {entry['duration']:.0f}s duration")
+        for entry in sorted(crawl_patterns, key=lambda x: x.pages_per_session, reverse=True)[:10]:
+            date_formatted = f"{entry.date[:4]}-{entry.date[4:6]}-{entry.date[6:]}"
+            print(f"  • {date_formatted} - {entry.source}")
+            print(f"    {entry.pages_per_session:.1f} pages/session, {entry.duration:.0f}s duration")
+
+    if detector is None:
+        return crawl_patterns, []
+
+    alerts = detector.process_rows(daily_activity)
+    if alerts:
+        print(f"\n🚨 CRAWL ACTIVITY CHANGES:")
+        for alert in sorted(alerts, key=lambda x: abs(x['z']), reverse=True)[:10]:
+            date_formatted = f"{alert['date'][:4]}-{alert['date'][4:6]}-{alert['date'][6:]}"
+            icon = "📈" if alert['kind'] == 'surge' else "📉"
+            print(f"  {icon} {date_formatted} - {alert['source']} ({alert['kind']})")
+            print(f"    {alert['value']:.0f} pageviews vs {alert['expected']:.1f} expected (z={alert['z']:+.1f})")
+    else:
+        print(f"\n✓ No crawl surges or drop-offs detected")
+    print(f"  Tracking {len(detector.sources)} sources, up to date through {detector.last_date or 'n/a'}")
+
+    return crawl_patterns, alerts
+
 
+@traced
+def analyze_bot_path_sketches(client, store, days=30, property_id=GA4_PROPERTY_ID):
+    """Report unique pages/bots and top paths per bot from daily sketches.
+
+    Settled days (GA4_SETTLED_DAYS or older) missing from the sketch store
+    are fetched and stored; the most recent days are still being processed
+    by GA4, so they are fetched every run and never stored. The report
+    window is answered by merging both.
+    """
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
+    print(f"\n🧮 LONG-HORIZON BOT & PATH STATISTICS (Last {days} days)")
+    print("=" * 70)
+
+    today = datetime.now().date()
+    window = [today - timedelta(days=offset) for offset in range(days, 0, -1)]
+    settled = today - timedelta(days=GA4_SETTLED_DAYS)
+    recent = [day for day in window if day > settled]
+    missing = [day for day in window if day > settled or not store.has(day.strftime("%Y%m%d"))]
+    annotate(cache_hits=len(window) - len(missing), cache_misses=len(missing))
+
+    daily = {}
+    if missing:
+        # Paged, and sketches are saved only once every page is in: a day
+        # saved from a truncated response would never be fetched again
+        rows = []
+        offset = 0
+        while True:
+            request = RunReportRequest(
+                property=f"properties/{property_id}",
+                date_ranges=[DateRange(
+                    start_date=missing[0].isoformat(),
+                    end_date=missing[-1].isoformat()
+                )],
+                dimensions=[
+                    Dimension(name="date"),
+                    Dimension(name="sessionSource"),
+                    Dimension(name="pagePath"),
+                ],
+                metrics=[
+                    Metric(name="screenPageViews"),
+                ],
+                limit=REPORT_PAGE_SIZE,
+                offset=offset,
+            )
+
+            response = client.run_report(request)
+
+            for row in response.rows:
+                source = intern(row.dimension_values[1].value)
+                rows.append((
+                    intern(row.dimension_values[0].value),
+                    source,
+                    intern(row.dimension_values[2].value),
+                    int(row.metric_values[0].value),
+                    classify_ai_bot(source),
+                ))
+
+            offset += len(response.rows)
+            if not response.rows or offset >= response.row_count:
+                break
+
+        daily = build_daily_sketches(rows)
+        stored = [day for day in missing if day <= settled]
+        for day in stored:
+            date = day.strftime("%Y%m%d")
+            # Days without traffic are stored empty so they aren't refetched every run
+            store.save(date, daily.get(date) or TrafficSketch())
+        for day in recent:
+            # Partial sketches saved before a day settled would never be refetched
+            store.discard(day.strftime("%Y%m%d"))
+        if stored:
+            print(f"\n✓ Sketched {len(stored)} new days ({len(rows)} rows) into {store.directory}")
+
+    merged, days_found = store.query(window[0].strftime("%Y%m%d"), settled.strftime("%Y%m%d"))
+    for day in recent:
+        sketch = daily.get(day.strftime("%Y%m%d"))
+        if sketch is not None:
+            merged.merge(sketch)
+            days_found += 1
+
+    print(f"\n📈 ESTIMATES ({days_found} days with data, ±1.6% distinct counts):")
+    print(f"  Pageviews: {merged.pageviews}")
+    print(f"  Unique pages: ~{merged.pages.count()}")
+    print(f"  Unique sources: ~{merged.sources.count()}")
+    print(f"  Unique AI bots: ~{merged.bots.count()}")
+
+    for name, top_paths in sorted(merged.top_paths.items()):
+        print(f"\n  🔝 Top paths - {name}:")
+        for path, views in top_paths.top(5):
+            print(f"    • {path}: ~{views} views")
+
+    return merged
+
+
+@traced
+def analyze_search_console_queries(client, days=30, property_id=GA4_PROPERTY_ID, search_console_db=None):
+    """Analyze what search queries are bringing traffic.
+
+    With a Search Console store (search_console_db), queries come from the
+    ingested exports, joined with GA4's Google organic landing pages;
+    otherwise from sessionGoogleAdsQuery, which organic traffic rarely sets.
+    """
+    if search_console_db:
+        return analyze_search_console_store(client, search_console_db, days=days, property_id=property_id)
+
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
 
-def analyze_search_console_queries(client, days=30):
-    """Analyze what search queries are bringing traffic."""
     print(f"\n🔎 SEARCH QUERY ANALYSIS")
     print("=" * 70)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -294,30 +522,151 @@ def analyze_search_console_queries(client, days=30):
 
     queries = []
     for row in response.rows:
-        query = row.dimension_values[0].value
-        source = row.dimension_values[1].value
-        sessions = int(row.metric_values[0].value)
-        users = int(row.metric_values[1].value)
-
-        if query and query != '(not set)':
-            queries.append({
-                'query': query,
-                'source': source,
-                'sessions': sessions,
-                'users': users
-            })
+        entry = SearchQueryRow.from_row(row)
+        if entry.query and entry.query != '(not set)':
+            queries.append(entry)
 
     if queries:
         print(f"\n🎯 SEARCH QUERIES DRIVING TRAFFIC:")
-        for entry in sorted(queries, key=lambda x: x['sessions'], reverse=True)[:10]:
-            print(f"  • \"{entry['query']}\" from {entry['source']}")
-            print(f"    Sessions: {entry['sessions']}, Users: {entry['users']}")
+        for entry in sorted(queries, key=lambda x: x.sessions, reverse=True)[:10]:
+            print(f"  • \"{entry.query}\" from {entry.source}")
+            print(f"    Sessions: {entry.sessions}, Users: {entry.users}")
     else:
         print(f"\n⚠️  No search query data available")
         print(f"  Note: GA4 doesn't always capture search queries")
-        print(f"  Consider connecting Google Search Console for query data")
+        print(f"  Ingest Search Console exports with --search-console-export for query data")
+
 
+@traced
+def analyze_search_console_store(client, db_path, days=30, property_id=GA4_PROPERTY_ID, top=10):
+    """Query-to-article performance from ingested Search Console rows and GA4 landing pages."""
+    from google.analytics.data_v1beta.types import (
+        DateRange, Dimension, Filter, FilterExpression, FilterExpressionList, Metric, RunReportRequest,
+    )
+    from search_console import SearchConsoleStore, average_position, query_performance
 
+    store = SearchConsoleStore(db_path)
+    try:
+        first, last = store.date_range()
+        if last is None:
+            print(f"\n🔎 SEARCH QUERY ANALYSIS")
+            print("=" * 70)
+            print(f"\n⚠️  No Search Console rows in {db_path}")
+            print(f"  Ingest exports with --search-console-export")
+            return None
+
+        # Search Console lags GA4 by a few days; both sides use the same window
+        end = min(last, (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"))
+        start = (datetime.strptime(end, "%Y-%m-%d") - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+        print(f"\n🔎 SEARCH QUERY ANALYSIS (Search Console, {start} to {end})")
+        print("=" * 70)
+
+        # Only Google organic sessions can come from Search Console clicks
+        google_organic = FilterExpression(and_group=FilterExpressionList(expressions=[
+            FilterExpression(filter=Filter(
+                field_name=field,
+                string_filter=Filter.StringFilter(value=value, match_type=Filter.StringFilter.MatchType.EXACT),
+            ))
+            for field, value in (("sessionSource", "google"), ("sessionMedium", "organic"))
+        ]))
+
+        # Build side of the join: Google organic landing pages by normalized path
+        landing_pages = {}
+        offset = 0
+        while True:
+            request = RunReportRequest(
+                property=f"properties/{property_id}",
+                date_ranges=[DateRange(start_date=start, end_date=end)],
+                dimensions=[
+                    Dimension(name="landingPage"),
+                ],
+                metrics=[
+                    Metric(name="sessions"),
+                    Metric(name="engagedSessions"),
+                ],
+                dimension_filter=google_organic,
+                limit=REPORT_PAGE_SIZE,
+                offset=offset,
+            )
+
+            response = client.run_report(request)
+
+            for row in response.rows:
+                entry = LandingPageRow.from_row(row)
+                page = landing_pages.setdefault(normalize_path(entry.path), {'sessions': 0, 'engaged_sessions': 0})
+                page['sessions'] += entry.sessions
+                page['engaged_sessions'] += entry.engaged_sessions
+
+            offset += len(response.rows)
+            if not response.rows or offset >= response.row_count:
+                break
+
+        # Probe side: grouped store rows, streamed from SQLite
+        with span('search_console_join'):
+            performance = query_performance(store.page_queries(start, end), landing_pages, top=top)
+    finally:
+        store.close()
+
+    pages = performance['pages']
+    total_clicks = sum(page['clicks'] for page in pages.values())
+    total_impressions = sum(page['impressions'] for page in pages.values())
+    total_queries = sum(page['queries'] for page in pages.values())
+    print(f"\n{len(pages)} pages, {total_queries} query/page pairs: "
+          f"{total_clicks} clicks, {total_impressions} impressions (from {first} to {last} stored)")
+
+    for path, page in sorted(pages.items(), key=lambda x: x[1]['clicks'], reverse=True)[:METRICS_TOP_PATHS]:
+        record('search_clicks', page['clicks'], path=path)
+        record('search_impressions', page['impressions'], path=path)
+
+    if performance['top_queries']:
+        print(f"\n🎯 TOP SEARCH QUERIES BY CLICKS:")
+        for entry in performance['top_queries']:
+            sessions = ""
+            if entry['sessions'] is not None:
+                sessions = f", Est. sessions: {entry['sessions']:.1f}"
+                if entry['engagement_rate'] is not None:
+                    sessions += f" ({entry['engagement_rate']:.0%} engaged)"
+            print(f"  • \"{entry['query']}\" → {entry['path']}")
+            print(f"    Clicks: {entry['clicks']}, Impressions: {entry['impressions']} "
+                  f"(CTR {entry['ctr']:.1%}), Position: {entry['position']:.1f}{sessions}")
+
+    # Fold page paths to their canonical article
+    index = get_article_index()
+    articles = {}
+    for path, page in pages.items():
+        article = index.resolve(path)
+        if article is None:
+            continue
+        totals = articles.setdefault(article['slug'], {
+            'title': article['title'], 'clicks': 0, 'impressions': 0, 'position_sum': 0.0,
+            'sessions': 0, 'top_query': None, 'top_query_clicks': -1,
+        })
+        for key in ('clicks', 'impressions', 'position_sum', 'sessions'):
+            totals[key] += page[key]
+        if page['top_query_clicks'] > totals['top_query_clicks']:
+            totals['top_query'], totals['top_query_clicks'] = page['top_query'], page['top_query_clicks']
+
+    if articles:
+        print(f"\n📄 ARTICLES FROM GOOGLE SEARCH:")
+        for totals in sorted(articles.values(), key=lambda x: x['clicks'], reverse=True)[:top]:
+            ctr = totals['clicks'] / totals['impressions'] if totals['impressions'] else 0.0
+            print(f"  • {totals['title']}")
+            print(f"    Clicks: {totals['clicks']}, Impressions: {totals['impressions']} (CTR {ctr:.1%}), "
+                  f"Position: {average_position(totals['position_sum'], totals['impressions']):.1f}, "
+                  f"Organic sessions: {totals['sessions']}")
+            if totals['top_query']:
+                print(f"    Top query: \"{totals['top_query']}\"")
+
+    unmatched = [page for page in pages.values() if page['clicks'] and not page['matched']]
+    if unmatched:
+        print(f"\n⚠️  {len(unmatched)} pages with search clicks have no Google organic landing sessions in GA4 "
+              f"({sum(page['clicks'] for page in unmatched)} clicks)")
+
+    return performance
+
+
+@traced
 def generate_ai_discoverability_report(client, days=30):
     """Generate recommendations for improving AI discoverability."""
     print(f"\n💡 AI DISCOVERABILITY RECOMMENDATIONS")
@@ -354,22 +703,163 @@ def generate_ai_discoverability_report(client, days=30):
     print(f"     • /api/search - Allow AI agents to query content")
 
 
+@traced
+def ingest_search_console(db_path, export_paths):
+    """Stream Search Console export files into the local store."""
+    from search_console import SearchConsoleStore
+
+    print(f"\n📥 SEARCH CONSOLE INGEST ({db_path})")
+    print("=" * 70)
+
+    store = SearchConsoleStore(db_path)
+    try:
+        for path in export_paths:
+            result = store.ingest(path)
+            if result['unchanged']:
+                print(f"  • {result['file']}: unchanged, {result['rows']} rows already stored")
+                continue
+            skipped = ', '.join(f"{count} {reason}" for reason, count in result['skipped'].items())
+            print(f"  • {result['file']}: {result['rows']} rows "
+                  f"({result['first_date']} to {result['last_date']})" + (f", skipped {skipped}" if skipped else ""))
+        first, last = store.date_range()
+        if last:
+            print(f"  Store covers {first} to {last}")
+    finally:
+        store.close()
+
+
+def analysis_steps(days=30, detector=None, sketch_store=None, property_id=GA4_PROPERTY_ID, search_console_db=None):
+    """The GA4-backed bot analyses in report order, each called as step(client)."""
+    steps = [
+        partial(analyze_bot_traffic_by_user_agent, days=days, property_id=property_id),
+        partial(analyze_json_content_access, days=days, property_id=property_id),
+        partial(analyze_crawl_patterns, days=days, detector=detector, property_id=property_id),
+    ]
+    if sketch_store is not None:
+        steps.append(lambda client: analyze_bot_path_sketches(client, sketch_store, days=days,
+                                                              property_id=property_id))
+    steps.append(partial(analyze_search_console_queries, days=days, property_id=property_id,
+                         search_console_db=search_console_db))
+    steps.append(partial(generate_ai_discoverability_report, days=days))
+    return steps
+
+
+def run_analyses(client, days=30, detector=None, sketch_store=None, property_id=GA4_PROPERTY_ID,
+                 search_console_db=None):
+    """Every GA4-backed bot analysis with one client (main and analysis-daemon.py)."""
+    for step in analysis_steps(days=days, detector=detector, sketch_store=sketch_store, property_id=property_id,
+                               search_console_db=search_console_db):
+        step(client)
+
+
+def run_portfolio_analyses(properties, pool_size, days=30, shard=None):
+    """The bot analyses for every property of a portfolio concurrently, then the rollups.
+
+    Crawl anomaly state, sketches and Search Console stores are per
+    property, from its crawl_state, sketch_dir and search_console_db keys
+    in the config.
+    """
+    from ga4_properties import print_rollup, run_portfolio
+
+    detectors = {}
+
+    def steps_for(prop):
+        detector = None
+        if prop.get('crawl_state'):
+            detector = detectors[prop['crawl_state']] = CrawlAnomalyDetector.load(prop['crawl_state'])
+        sketch_store = DailySketchStore(prop['sketch_dir']) if prop.get('sketch_dir') else None
+        return analysis_steps(days=days, detector=detector, sketch_store=sketch_store, property_id=prop['id'],
+                              search_console_db=prop.get('search_console_db'))
+
+    results = run_portfolio(properties, steps_for, lambda: profiled_client(get_ga4_client()), pool_size,
+                            shard=shard)
+    for path, detector in detectors.items():
+        detector.save(path)
+    print_rollup(results)
+
+
 def main():
     """Run complete AI bot traffic analysis."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze AI bot and structured content traffic')
+    parser.add_argument('--days', type=int, default=30, help='Number of days to analyze')
+    parser.add_argument('--crawl-state', help='JSON file for crawl anomaly state (resumed across runs)')
+    parser.add_argument('--sketch-dir', help='Directory of daily traffic sketches for long-horizon stats')
+    parser.add_argument('--search-console-db', metavar='SQLITE',
+                        help=f'Search Console store for query analysis (default with exports: {DEFAULT_SEARCH_CONSOLE_DB})')
+    parser.add_argument('--search-console-export', nargs='+', metavar='EXPORT',
+                        help='Search Console export files (CSV or JSON lines, .gz ok) to ingest into the store first')
+    parser.add_argument('--access-log', nargs='+', metavar='LOG',
+                        help='Request log files (JSON lines or combined format, .gz ok); runs bandwidth accounting only')
+    parser.add_argument('--cost-per-gb', type=float, default=DEFAULT_COST_PER_GB,
+                        help='Egress price in USD per GB for bandwidth accounting')
+    parser.add_argument('--profile', metavar='TRACE_JSON',
+                        help='Write a Chrome trace of phases and GA4 requests and print a timing summary')
+    parser.add_argument('--metrics', metavar='PROM_FILE',
+                        help='Also write key aggregates and run health to an OpenMetrics textfile')
+    parser.add_argument('--shard', choices=['week', 'month'],
+                        help='Fetch long date ranges as weekly or monthly requests in parallel, merged into one report')
+    parser.add_argument('--properties', metavar='CONFIG',
+                        help='JSON config of GA4 properties to analyze concurrently, with per-property and combined rollups')
+    args = parser.parse_args()
+    start_profiling(args.profile)
+    start_metrics(args.metrics)
+
+    if args.access_log:
+        analyze_endpoint_bandwidth(args.access_log, cost_per_gb=args.cost_per_gb)
+        print("\n")
+        return
+
+    if args.search_console_export:
+        import sqlite3
+
+        args.search_console_db = args.search_console_db or DEFAULT_SEARCH_CONSOLE_DB
+        try:
+            ingest_search_console(args.search_console_db, args.search_console_export)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            parser.error(f"Search Console ingest failed: {e}")
+
+    if args.properties:
+        from ga4_properties import load_properties
+
+        try:
+            properties, pool_size = load_properties(args.properties)
+        except ValueError as e:
+            parser.error(str(e))
+
+        print("\n" + "=" * 70)
+        print("  AI BOT & STRUCTURED CONTENT ANALYSIS - Portfolio")
+        print(f"  {len(properties)} properties from {args.properties}")
+        print("=" * 70)
+
+        run_portfolio_analyses(properties, pool_size, days=args.days, shard=args.shard)
+        print("\n")
+        return
+
     print("\n" + "=" * 70)
     print("  AI BOT & STRUCTURED CONTENT ANALYSIS")
-    print("  Context is Everything - Property ID: 506980538")
+    print(f"  Context is Everything - Property ID: {GA4_PROPERTY_ID}")
     print("=" * 70)
 
     try:
-        client = get_ga4_client()
+        client = metered_client(profiled_client(get_ga4_client()))
+        if args.shard:
+            from ga4_shards import sharded_client
+
+            client = sharded_client(client, args.shard)
+
+        detector = None
+        if args.crawl_state:
+            detector = CrawlAnomalyDetector.load(args.crawl_state)
 
         # Run analyses
-        analyze_bot_traffic_by_user_agent(client, days=30)
-        analyze_json_content_access(client, days=30)
-        analyze_crawl_patterns(client, days=30)
-        analyze_search_console_queries(client, days=30)
-        generate_ai_discoverability_report(client, days=30)
+        sketch_store = DailySketchStore(args.sketch_dir) if args.sketch_dir else None
+        run_analyses(client, days=args.days, detector=detector, sketch_store=sketch_store,
+                     search_console_db=args.search_console_db)
+
+        if detector is not None:
+            detector.save(args.crawl_state)
 
         print("\n" + "=" * 70)
         print("  📊 ANALYSIS COMPLETE")
@@ -383,6 +873,7 @@ def main():
         print("\n")
 
     except Exception as e:
+        record_failure()
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
@@ -10,55 +10,117 @@ Analyzes how visitors interact with the AI concierge:
 
 Usage:
     python scripts/analyze-concierge-usage.py [--days 30]
+    python scripts/analyze-concierge-usage.py --session-dimension customEvent:ga_session_id --user-dimension customUser:client_id
+    python scripts/analyze-concierge-usage.py --article-dimension customEvent:article_title
+    python scripts/analyze-concierge-usage.py --events events.jsonl  # offline funnels, no GA4
+    python scripts/analyze-concierge-usage.py --profile trace.json  # phase and GA4 request timings
+    python scripts/analyze-concierge-usage.py --metrics /var/lib/node_exporter/textfile/cie.prom  # OpenMetrics export
+    python scripts/analyze-concierge-usage.py --properties ga4-properties.json  # several sites concurrently, with rollups
+    python scripts/analyze-concierge-usage.py --days 365 --shard month  # long ranges as parallel monthly requests
+
+Session funnels need a session ID in GA4: register the `ga_session_id`
+event parameter as an event-scoped custom dimension, and a per-browser
+user ID (e.g. the gtag client_id, set as a `client_id` user property) as a
+user-scoped one, since ga_session_id is only unique per user (or pass
+exported events with --events).
 """
 
 import json
 import base64
 import os
+import re
 import sys
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import (
-    DateRange,
-    Dimension,
-    Metric,
-    RunReportRequest,
-    FilterExpression,
-    Filter,
-)
+from functools import partial
+from article_index import BASE_DIR, get_article_index
+from funnels import FUNNELS, STEP_NAMES, FunnelEngine, build_sequences, read_event_file
+from ga4_pivot import TOTAL, fetch_pivot, top_labels
+from ga4_rows import EventRow, intern
+from metrics_export import metered_client, record, record_failure, start_metrics
+from profiling import profiled_client, start_profiling, traced
 
 # GA4 Property ID
 GA4_PROPERTY_ID = "506980538"
 
-# Articles mentioned in AI system prompt
-SYSTEM_PROMPT_ARTICLES = [
-    "Why AI Projects Fail",
-    "Worthless Technology Stack",
-    "Hidden Vendor Costs",
-    "Complete Cost of AI",
-    "Signs You Need AI",
-    "Faster, Cheaper, Better AI",
-    "Where to Start with AI"
+# Event-scoped custom dimension carrying GA4's ga_session_id parameter
+DEFAULT_SESSION_DIMENSION = "customEvent:ga_session_id"
+
+# User-scoped custom dimension identifying the browser; ga_session_id is a
+# session start timestamp, so it only identifies a session per user
+DEFAULT_USER_DIMENSION = "customUser:client_id"
+
+# Events shown per article in the article × event matrix
+ARTICLE_EVENTS = [
+    'page_view',
+    'article_mentioned',
+    'article_clicked',
+    'chat_query',
+    'contact_form_opened',
+    'contact_form_submitted',
 ]
 
-# All articles from sitemap (search-only visibility)
-ALL_ARTICLES = [
-    "why-ai-projects-fail",
-    "worthless-technology-stack",
-    "hidden-vendor-costs",
-    "complete-cost-of-ai",
-    "signs-you-need-ai",
-    "faster-cheaper-better-ai",
-    "where-to-start-with-ai",
-    "8-ai-mistakes-costing-uk-businesses",
-    "information-asymmetry-buying-ia-vs-ai",
-    "ai-native-buyers-marketing-gap"
-]
+# Rows per page when paging through large reports
+REPORT_PAGE_SIZE = 100000
+
+AI_CONSULTANT_ROUTE = BASE_DIR / "src" / "app" / "api" / "ai-consultant" / "route.ts"
+
+
+# Share of a prompt entry's words an article's title and slug must contain to match it
+PROMPT_MATCH_THRESHOLD = 0.6
 
 
+def system_prompt_entries():
+    """Names in the system prompt's THOUGHT LEADERSHIP ARTICLES list, or None if it can't be read."""
+    try:
+        content = AI_CONSULTANT_ROUTE.read_text(encoding='utf-8')
+    except OSError:
+        return None
+    match = re.search(
+        r'THOUGHT LEADERSHIP ARTICLES \(Reference conversationally when relevant\):\n(.*?)\n\n',
+        content, re.DOTALL)
+    if not match:
+        return None
+    return re.findall(r'^\d+\. \*\*(.+?)\*\*', match.group(1), re.MULTILINE)
+
+
+def count_system_prompt_articles():
+    """Count entries in the system prompt's THOUGHT LEADERSHIP ARTICLES list."""
+    entries = system_prompt_entries()
+    return None if entries is None else len(entries)
+
+
+def system_prompt_slugs():
+    """Slugs of the articles the system prompt lists, or None if it can't be read.
+
+    Entries are shortened titles ("Why AI Projects Fail"), so each is
+    matched to the article whose title and slug contain most of its words.
+    """
+    entries = system_prompt_entries()
+    if entries is None:
+        return None
+
+    def words(text):
+        return set(re.findall(r'[a-z0-9]+', text.lower()))
+
+    articles = [(article['slug'], words(article['title']) | words(article['slug']))
+                for article in get_article_index().articles]
+    slugs = set()
+    for entry in entries:
+        wanted = words(entry)
+        if not wanted:
+            continue
+        score, slug = max(((len(wanted & have) / len(wanted), slug) for slug, have in articles), default=(0, None))
+        if score >= PROMPT_MATCH_THRESHOLD:
+            slugs.add(slug)
+    return slugs
+
+
+@traced
 def get_ga4_client():
     """Initialize GA4 client with credentials from environment or file."""
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+
     credentials_b64 = os.getenv('GA4_SERVICE_ACCOUNT_KEY')
 
     if credentials_b64:
@@ -70,13 +132,16 @@ def get_ga4_client():
     return BetaAnalyticsDataClient.from_service_account_info(credentials_json)
 
 
-def analyze_page_engagement(client, days=30):
+@traced
+def analyze_page_engagement(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze which pages visitors engage with."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n📄 PAGE ENGAGEMENT ANALYSIS (Last {days} days)")
     print("=" * 70)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -95,6 +160,8 @@ def analyze_page_engagement(client, days=30):
 
     response = client.run_report(request)
 
+    index = get_article_index()
+
     # Categorize pages
     homepage_visits = []
     article_visits = []
@@ -120,8 +187,17 @@ def analyze_page_engagement(client, days=30):
         # Categorize
         if path == '/' or path == '':
             homepage_visits.append(entry)
-        elif '/insights/' in path:
-            article_visits.append(entry)
+        else:
+            article = index.resolve(path)
+            if article:
+                entry['article'] = article
+                article_visits.append(entry)
+
+    article_views = defaultdict(int)
+    for entry in article_visits:
+        article_views[f"/insights/{entry['article']['slug']}"] += entry['views']
+    for path, views in article_views.items():
+        record('article_views', views, path=path)
 
     # Report homepage engagement (where chat is)
     if homepage_visits:
@@ -134,14 +210,22 @@ def analyze_page_engagement(client, days=30):
 
     # Report article access
     if article_visits:
+        prompt_slugs = system_prompt_slugs()
         print(f"\n📰 ARTICLE ACCESS (Search-Only Content):")
-        print(f"Total articles accessed: {len(article_visits)}")
+        print(f"Total articles accessed: {len({entry['article']['slug'] for entry in article_visits})}"
+              f" ({len(article_visits)} paths)")
         for entry in sorted(article_visits, key=lambda x: x['views'], reverse=True):
-            article_slug = entry['path'].replace('/insights/', '').strip('/')
-            is_in_prompt = any(slug for slug in ALL_ARTICLES if slug in entry['path'])
-            marker = "✓ In AI Prompt" if is_in_prompt else ""
-
-            print(f"\n  • {entry['title'] or entry['path']} {marker}")
+            article = entry['article']
+            if prompt_slugs is None:
+                marker = ""
+            elif article['slug'] in prompt_slugs:
+                marker = "✓ In AI Prompt"
+            else:
+                marker = "⚠️  Not in AI Prompt"
+
+            print(f"\n  • {article['title']} {marker}")
+            if entry['path'] != f"/insights/{article['slug']}":
+                print(f"    Path: {entry['path']}")
             print(f"    Views: {entry['views']}, Users: {entry['users']}")
             print(f"    Duration: {entry['duration']:.1f}s, Engagement: {entry['engagement']*100:.1f}%")
     else:
@@ -150,66 +234,78 @@ def analyze_page_engagement(client, days=30):
     return homepage_visits, article_visits
 
 
-def analyze_traffic_sources_to_articles(client, days=30):
-    """Analyze how visitors are finding the hidden articles."""
-    print(f"\n🔍 ARTICLE DISCOVERY ANALYSIS")
+def article_row_key(article_dimension):
+    """Map a row label of the article dimension to an article slug."""
+    index = get_article_index()
+    if article_dimension == 'pagePath':
+        def key(path):
+            article = index.resolve(path)
+            return article['slug'] if article else None
+        return key
+
+    # Custom event parameters (article_title / article_slug) name the article directly
+    by_title = {a['title'].lower(): a['slug'] for a in index.articles if a.get('title')}
+
+    def key(value):
+        if not value or value == '(not set)':
+            return None
+        article = index.by_slug(value)
+        if article:
+            return article['slug']
+        return by_title.get(value.lower(), value)
+    return key
+
+
+@traced
+def analyze_article_event_matrix(client, days=30, article_dimension='pagePath',
+                                 property_id=GA4_PROPERTY_ID):
+    """Article × event counts, and their top source / medium splits, from two pivot reports.
+
+    Per-article totals come from an unsliced report: the sliced one only
+    holds the top source / medium values, so its totals would drop the rest.
+    """
+    print(f"\n🔍 ARTICLE EVENTS & DISCOVERY ANALYSIS")
     print("=" * 70)
 
-    # Get article pages with source information
-    request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
-        date_ranges=[DateRange(
-            start_date=f"{days}daysAgo",
-            end_date="today"
-        )],
-        dimensions=[
-            Dimension(name="pagePath"),
-            Dimension(name="sessionSource"),
-            Dimension(name="sessionMedium"),
-        ],
-        metrics=[
-            Metric(name="screenPageViews"),
-            Metric(name="activeUsers"),
-        ],
-    )
-
-    response = client.run_report(request)
-
-    article_sources = defaultdict(list)
-
-    for row in response.rows:
-        path = row.dimension_values[0].value
-        source = row.dimension_values[1].value
-        medium = row.dimension_values[2].value
-        views = int(row.metric_values[0].value)
-        users = int(row.metric_values[1].value)
+    pivot = partial(fetch_pivot, client, property_id, days,
+                    rows=article_dimension, columns="eventName", metric="eventCount")
+    key = article_row_key(article_dimension)
+    events = pivot()[TOTAL].group_rows(key)
+    matrices = pivot(slices="sessionSourceMedium")
+    matrices.pop(TOTAL)
+    sources = {source: matrix.group_rows(key) for source, matrix in matrices.items()}
 
-        if '/insights/' in path:
-            article_sources[path].append({
-                'source': source,
-                'medium': medium,
-                'views': views,
-                'users': users
-            })
-
-    if article_sources:
-        print(f"\n📊 HOW VISITORS FIND ARTICLES:")
-        for path, sources in article_sources.items():
-            print(f"\n  Article: {path}")
-            for source_data in sources:
-                print(f"    {source_data['source']} / {source_data['medium']}: {source_data['views']} views, {source_data['users']} users")
-    else:
-        print(f"\n⚠️  No article discovery data available")
+    if not events.row_labels:
+        print(f"\n⚠️  No article event data available")
         print(f"  This suggests articles aren't being accessed yet via search engines or AI")
-
-
-def analyze_event_tracking(client, days=30):
+        return events, sources
+
+    index = get_article_index()
+    columns = [e for e in ARTICLE_EVENTS if e in events.column_labels]
+    print(f"\n📊 EVENTS PER ARTICLE ({article_dimension}):")
+    for slug, total in sorted(events.row_totals().items(), key=lambda x: x[1], reverse=True):
+        label = f"/insights/{slug}" if index.by_slug(slug) else slug
+        print(f"\n  Article: {label} ({total:.0f} events)")
+        counts = ", ".join(f"{e}: {events.get(slug, e):.0f}" for e in columns if events.get(slug, e))
+        if counts:
+            print(f"    {counts}")
+        by_source = {source: sum(matrix.row(slug)) for source, matrix in sources.items()}
+        for source in top_labels(by_source, 3):
+            print(f"    via {source}: {by_source[source]:.0f} events")
+
+    return events, sources
+
+
+@traced
+def analyze_event_tracking(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze custom events that might track concierge interactions."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n📊 EVENT TRACKING ANALYSIS")
     print("=" * 70)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -225,62 +321,143 @@ def analyze_event_tracking(client, days=30):
 
     response = client.run_report(request)
 
-    events = []
-    for row in response.rows:
-        event_name = row.dimension_values[0].value
-        count = int(row.metric_values[0].value)
-        users = int(row.metric_values[1].value)
-
-        events.append({
-            'name': event_name,
-            'count': count,
-            'users': users
-        })
+    events = [EventRow.from_row(row) for row in response.rows]
 
     if events:
         print(f"\n🎯 TRACKED EVENTS:")
-        for event in sorted(events, key=lambda x: x['count'], reverse=True):
-            print(f"  • {event['name']}: {event['count']} events, {event['users']} users")
+        for event in sorted(events, key=lambda x: x.count, reverse=True):
+            print(f"  • {event.name}: {event.count} events, {event.users} users")
     else:
         print(f"\n⚠️  No custom events detected")
 
     # Check for chat/concierge related events
-    chat_events = [e for e in events if 'chat' in e['name'].lower() or 'concierge' in e['name'].lower() or 'ai' in e['name'].lower()]
+    chat_events = [e for e in events if 'chat' in e.name.lower() or 'concierge' in e.name.lower() or 'ai' in e.name.lower()]
     if chat_events:
         print(f"\n💬 CHAT/CONCIERGE EVENTS:")
         for event in chat_events:
-            print(f"  • {event['name']}: {event['count']} events, {event['users']} users")
+            print(f"  • {event.name}: {event.count} events, {event.users} users")
     else:
         print(f"\n💬 CHAT/CONCIERGE EVENTS: None detected")
         print(f"  Recommendation: Add custom event tracking for chat interactions")
 
 
-def analyze_user_journeys(client, days=30):
-    """Analyze user flow from homepage (chat) to articles."""
+@traced
+def fetch_session_events(client, days=30, session_dimension=DEFAULT_SESSION_DIMENSION,
+                         user_dimension=DEFAULT_USER_DIMENSION, property_id=GA4_PROPERTY_ID):
+    """Page through user × session × minute × event × page rows from GA4.
+
+    Sessions are keyed by user and session ID together. dateHourMinute is
+    the finest time dimension the Data API offers, so events within the
+    same minute keep report order; use --events (exported event
+    timestamps) where exact ordering matters.
+    """
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
+    offset = 0
+    while True:
+        request = RunReportRequest(
+            property=f"properties/{property_id}",
+            date_ranges=[DateRange(
+                start_date=f"{days}daysAgo",
+                end_date="today"
+            )],
+            dimensions=[
+                Dimension(name=user_dimension),
+                Dimension(name=session_dimension),
+                Dimension(name="dateHourMinute"),
+                Dimension(name="eventName"),
+                Dimension(name="pagePath"),
+            ],
+            metrics=[
+                Metric(name="eventCount"),
+            ],
+            limit=REPORT_PAGE_SIZE,
+            offset=offset,
+        )
+
+        response = client.run_report(request)
+
+        for row in response.rows:
+            user_id = row.dimension_values[0].value
+            session_id = row.dimension_values[1].value
+            if user_id and session_id and '(not set)' not in (user_id, session_id):
+                # Minutes, event names and paths repeat across sessions; session keys don't
+                yield (
+                    f"{user_id}.{session_id}",
+                    intern(row.dimension_values[2].value),
+                    intern(row.dimension_values[3].value),
+                    intern(row.dimension_values[4].value),
+                )
+
+        offset += len(response.rows)
+        if not response.rows or offset >= response.row_count:
+            break
+
+
+@traced
+def analyze_user_journeys(client, days=30, session_dimension=DEFAULT_SESSION_DIMENSION,
+                          user_dimension=DEFAULT_USER_DIMENSION, events_file=None, property_id=GA4_PROPERTY_ID):
+    """Count ordered chat → article → contact funnels over session sequences."""
     print(f"\n🛤️  USER JOURNEY ANALYSIS")
     print("=" * 70)
 
-    # This would require more advanced GA4 exploration reports
-    # For now, we can infer patterns from engagement metrics
-
-    print(f"\n💡 ANALYSIS INSIGHTS:")
-    print(f"  • Articles are 'search-only' - hidden from navigation")
-    print(f"  • AI concierge can reference them conversationally")
-    print(f"  • Need to track: Does concierge mention articles? Do visitors click through?")
-    print(f"\n  📝 RECOMMENDATION: Add event tracking for:")
-    print(f"     1. When concierge mentions an article in response")
-    print(f"     2. When visitor clicks article link from chat")
-    print(f"     3. When visitor reaches article via organic search")
+    index = get_article_index()
+    is_article = lambda path: index.resolve(path) is not None
 
+    if events_file:
+        events = read_event_file(events_file)
+    else:
+        events = fetch_session_events(client, days=days, session_dimension=session_dimension,
+                                      user_dimension=user_dimension, property_id=property_id)
 
+    try:
+        sequences = build_sequences(events, is_article)
+    except Exception as e:
+        # Most often the session or user ID custom dimension isn't registered
+        print(f"\n⚠️  Could not load session events: {e}")
+        sequences = {}
+
+    if not sequences:
+        print(f"\n⚠️  No session-scoped events available")
+        print(f"  Register ga_session_id as an event-scoped custom dimension ({session_dimension})")
+        print(f"  and a browser ID as a user-scoped custom dimension ({user_dimension})")
+        print(f"  or pass exported events with --events")
+        return {}
+
+    engine = FunnelEngine(sequences.values())
+    print(f"\n📊 Sessions analyzed: {engine.sessions}")
+
+    results = {}
+    for name, steps in FUNNELS.items():
+        progress = engine.funnel(steps)
+        results[name] = progress
+        print(f"\n  🔻 {name}")
+        previous = engine.sessions
+        for step, reached in progress:
+            record('funnel_sessions', reached, funnel=name, step=STEP_NAMES[step])
+            step_rate = reached / previous * 100 if previous else 0
+            overall_rate = reached / engine.sessions * 100
+            print(f"    {STEP_NAMES[step]}: {reached} sessions "
+                  f"({step_rate:.1f}% of previous step, {overall_rate:.1f}% of all)")
+            previous = reached
+
+    return results
+
+
+@traced
 def generate_concierge_content_recommendations(client, days=30):
     """Generate recommendations for improving concierge content serving."""
     print(f"\n💡 CONCIERGE CONTENT RECOMMENDATIONS")
     print("=" * 70)
 
+    total_articles = len(get_article_index())
+    prompt_articles = count_system_prompt_articles()
+
     print(f"\n📋 CURRENT STATE:")
-    print(f"  • System prompt includes 7 articles (out of 10 total)")
-    print(f"  • Missing from prompt: 8 AI Mistakes, Information Asymmetry, AI-Native Buyers")
+    if prompt_articles is None:
+        print(f"  • System prompt article list not found in {AI_CONSULTANT_ROUTE.relative_to(BASE_DIR)}")
+    else:
+        print(f"  • System prompt includes {prompt_articles} articles (out of {total_articles} total)")
     print(f"  • Content matching system: DISABLED (too aggressive)")
     print(f"  • AI handles all responses naturally")
 
@@ -291,11 +468,10 @@ def generate_concierge_content_recommendations(client, days=30):
     print(f"  • Value escalation framework")
 
     print(f"\n🎯 RECOMMENDATIONS:")
-    print(f"\n  1. UPDATE SYSTEM PROMPT:")
-    print(f"     Add missing articles:")
-    print(f"     - 8 AI Mistakes Costing UK Small Businesses £50K+")
-    print(f"     - Information Asymmetry: Buying IA vs AI")
-    print(f"     - The AI-Native Buyers Marketing Gap")
+    print(f"\n  1. KEEP SYSTEM PROMPT IN SYNC:")
+    if prompt_articles is not None and prompt_articles < total_articles:
+        print(f"     {total_articles - prompt_articles} articles missing from the prompt")
+    print(f"     Run: python scripts/sync-new-article.py")
 
     print(f"\n  2. ADD EVENT TRACKING:")
     print(f"     Track when concierge:")
@@ -314,35 +490,115 @@ def generate_concierge_content_recommendations(client, days=30):
     print(f"     - Measure click-through rates")
 
 
+def analysis_steps(days=30, session_dimension=DEFAULT_SESSION_DIMENSION, user_dimension=DEFAULT_USER_DIMENSION,
+                   article_dimension='pagePath', property_id=GA4_PROPERTY_ID):
+    """The concierge analyses in report order, each called as step(client)."""
+    return [
+        partial(analyze_page_engagement, days=days, property_id=property_id),
+        partial(analyze_article_event_matrix, days=days, article_dimension=article_dimension,
+                property_id=property_id),
+        partial(analyze_event_tracking, days=days, property_id=property_id),
+        partial(analyze_user_journeys, days=days, session_dimension=session_dimension,
+                user_dimension=user_dimension, property_id=property_id),
+        partial(generate_concierge_content_recommendations, days=days),
+    ]
+
+
+def run_analyses(client, days=30, session_dimension=DEFAULT_SESSION_DIMENSION, user_dimension=DEFAULT_USER_DIMENSION,
+                 article_dimension='pagePath', property_id=GA4_PROPERTY_ID):
+    """Every concierge analysis with one client (main and analysis-daemon.py)."""
+    for step in analysis_steps(days=days, session_dimension=session_dimension, user_dimension=user_dimension,
+                               article_dimension=article_dimension, property_id=property_id):
+        step(client)
+
+
 def main():
     """Run complete concierge usage analysis."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze AI concierge usage')
+    parser.add_argument('--days', type=int, default=30, help='Number of days to analyze')
+    parser.add_argument('--session-dimension', default=DEFAULT_SESSION_DIMENSION,
+                        help='GA4 dimension holding the session ID for funnels')
+    parser.add_argument('--user-dimension', default=DEFAULT_USER_DIMENSION,
+                        help='GA4 user-scoped dimension identifying the browser, paired with the session ID')
+    parser.add_argument('--article-dimension', default='pagePath',
+                        help='Article dimension for the event matrix, e.g. customEvent:article_title')
+    parser.add_argument('--events', help='Exported events JSONL; runs journey funnels offline only')
+    parser.add_argument('--profile', metavar='TRACE_JSON',
+                        help='Write a Chrome trace of phases and GA4 requests and print a timing summary')
+    parser.add_argument('--metrics', metavar='PROM_FILE',
+                        help='Also write key aggregates and run health to an OpenMetrics textfile')
+    parser.add_argument('--shard', choices=['week', 'month'],
+                        help='Fetch long date ranges as weekly or monthly requests in parallel, merged into one report')
+    parser.add_argument('--properties', metavar='CONFIG',
+                        help='JSON config of GA4 properties to analyze concurrently, with per-property and combined rollups')
+    args = parser.parse_args()
+    start_profiling(args.profile)
+    start_metrics(args.metrics)
+
+    if args.events:
+        analyze_user_journeys(None, events_file=args.events)
+        print("\n")
+        return
+
+    if args.properties:
+        from ga4_properties import load_properties, print_rollup, run_portfolio
+
+        try:
+            properties, pool_size = load_properties(args.properties)
+        except ValueError as e:
+            parser.error(str(e))
+
+        print("\n" + "=" * 70)
+        print("  AI CONCIERGE USAGE ANALYSIS - Portfolio")
+        print(f"  {len(properties)} properties from {args.properties}")
+        print("=" * 70)
+
+        # Custom dimensions are registered per property, so the session and user dimensions can be too
+        def steps_for(prop):
+            return analysis_steps(days=args.days,
+                                  session_dimension=prop.get('session_dimension', args.session_dimension),
+                                  user_dimension=prop.get('user_dimension', args.user_dimension),
+                                  article_dimension=args.article_dimension, property_id=prop['id'])
+
+        results = run_portfolio(properties, steps_for, lambda: profiled_client(get_ga4_client()), pool_size,
+                                shard=args.shard)
+        print_rollup(results)
+        print("\n")
+        return
+
     print("\n" + "=" * 70)
     print("  AI CONCIERGE USAGE ANALYSIS")
-    print("  Context is Everything - Property ID: 506980538")
+    print(f"  Context is Everything - Property ID: {GA4_PROPERTY_ID}")
     print("=" * 70)
 
     try:
-        client = get_ga4_client()
+        client = metered_client(profiled_client(get_ga4_client()))
+        if args.shard:
+            from ga4_shards import sharded_client
+
+            client = sharded_client(client, args.shard)
 
         # Run analyses
-        analyze_page_engagement(client, days=30)
-        analyze_traffic_sources_to_articles(client, days=30)
-        analyze_event_tracking(client, days=30)
-        analyze_user_journeys(client, days=30)
-        generate_concierge_content_recommendations(client, days=30)
+        run_analyses(client, days=args.days, session_dimension=args.session_dimension,
+                     user_dimension=args.user_dimension, article_dimension=args.article_dimension)
 
         print("\n" + "=" * 70)
         print("  📊 ANALYSIS COMPLETE")
         print("=" * 70)
 
         print("\n🎯 EXECUTIVE SUMMARY:")
-        print("  • Concierge system prompt includes 7/10 articles")
+        prompt_articles = count_system_prompt_articles()
+        if prompt_articles is not None:
+            print(f"  • Concierge system prompt includes {prompt_articles}/{len(get_article_index())} articles")
         print("  • Content matching disabled - AI handles naturally")
         print("  • Need event tracking to measure article recommendations")
         print("  • Monitor AI bot traffic to measure discoverability")
         print("\n")
 
     except Exception as e:
+        record_failure()
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
@@ -11,6 +11,10 @@ Answers questions like:
 
 Usage:
     python scripts/analyze-ga4-traffic.py [--days 30] [--output report.txt]
+    python scripts/analyze-ga4-traffic.py --profile trace.json  # phase and GA4 request timings
+    python scripts/analyze-ga4-traffic.py --metrics /var/lib/node_exporter/textfile/cie.prom  # OpenMetrics export
+    python scripts/analyze-ga4-traffic.py --properties ga4-properties.json  # several sites concurrently, with rollups
+    python scripts/analyze-ga4-traffic.py --days 365 --shard month  # long ranges as parallel monthly requests
 """
 
 import json
@@ -18,20 +22,21 @@ import base64
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import (
-    DateRange,
-    Dimension,
-    Metric,
-    RunReportRequest,
-)
+from functools import partial
+from article_index import get_article_index
+from ga4_rows import TrafficSourceRow
+from metrics_export import metered_client, record, record_failure, start_metrics
+from profiling import profiled_client, start_profiling, traced
 
 # GA4 Property ID
 GA4_PROPERTY_ID = "506980538"
 
 
+@traced
 def get_ga4_client():
     """Initialize GA4 client with credentials from environment or file."""
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+
     # Try environment variable first (production)
     credentials_b64 = os.getenv('GA4_SERVICE_ACCOUNT_KEY')
 
@@ -45,13 +50,16 @@ def get_ga4_client():
     return BetaAnalyticsDataClient.from_service_account_info(credentials_json)
 
 
-def analyze_traffic_sources(client, days=30):
+@traced
+def analyze_traffic_sources(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze where traffic is coming from."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n📊 TRAFFIC SOURCES ANALYSIS (Last {days} days)")
     print("=" * 60)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -72,31 +80,10 @@ def analyze_traffic_sources(client, days=30):
 
     response = client.run_report(request)
 
-    traffic_sources = []
-    for row in response.rows:
-        source = row.dimension_values[0].value
-        medium = row.dimension_values[1].value
-        campaign = row.dimension_values[2].value
-
-        sessions = int(row.metric_values[0].value)
-        users = int(row.metric_values[1].value)
-        pageviews = int(row.metric_values[2].value)
-        avg_duration = float(row.metric_values[3].value)
-        bounce_rate = float(row.metric_values[4].value)
-
-        traffic_sources.append({
-            'source': source,
-            'medium': medium,
-            'campaign': campaign,
-            'sessions': sessions,
-            'users': users,
-            'pageviews': pageviews,
-            'avg_duration': avg_duration,
-            'bounce_rate': bounce_rate
-        })
+    traffic_sources = [TrafficSourceRow.from_row(row) for row in response.rows]
 
     # Sort by sessions
-    traffic_sources.sort(key=lambda x: x['sessions'], reverse=True)
+    traffic_sources.sort(key=lambda x: x.sessions, reverse=True)
 
     # Categorize traffic
     organic_traffic = []
@@ -105,18 +92,24 @@ def analyze_traffic_sources(client, days=30):
     other_traffic = []
 
     for item in traffic_sources:
-        if item['medium'] == 'organic':
+        if item.medium == 'organic':
             organic_traffic.append(item)
-        elif item['medium'] == 'referral':
+        elif item.medium == 'referral':
             referral_traffic.append(item)
-        elif item['source'] == '(direct)':
+        elif item.source == '(direct)':
             direct_traffic.append(item)
         else:
             other_traffic.append(item)
 
+    sessions_by_medium = defaultdict(int)
+    for item in traffic_sources:
+        sessions_by_medium[item.medium] += item.sessions
+    for medium, sessions in sessions_by_medium.items():
+        record('sessions', sessions, medium=medium)
+
     # Print summary
-    total_sessions = sum(item['sessions'] for item in traffic_sources)
-    total_users = sum(item['users'] for item in traffic_sources)
+    total_sessions = sum(item.sessions for item in traffic_sources)
+    total_users = sum(item.users for item in traffic_sources)
 
     print(f"\n📈 OVERVIEW:")
     print(f"Total Sessions: {total_sessions}")
@@ -125,46 +118,49 @@ def analyze_traffic_sources(client, days=30):
 
     # Organic Traffic
     if organic_traffic:
-        organic_sessions = sum(item['sessions'] for item in organic_traffic)
+        organic_sessions = sum(item.sessions for item in organic_traffic)
         print(f"\n🌱 ORGANIC TRAFFIC: {organic_sessions} sessions ({organic_sessions/total_sessions*100:.1f}%)")
         for item in organic_traffic:
-            print(f"  • {item['source']}: {item['sessions']} sessions, {item['users']} users")
-            print(f"    Avg Duration: {item['avg_duration']:.1f}s, Bounce: {item['bounce_rate']*100:.1f}%")
+            print(f"  • {item.source}: {item.sessions} sessions, {item.users} users")
+            print(f"    Avg Duration: {item.avg_duration:.1f}s, Bounce: {item.bounce_rate*100:.1f}%")
     else:
         print("\n🌱 ORGANIC TRAFFIC: None detected")
 
     # Referral Traffic (LinkedIn, etc.)
     if referral_traffic:
-        referral_sessions = sum(item['sessions'] for item in referral_traffic)
+        referral_sessions = sum(item.sessions for item in referral_traffic)
         print(f"\n🔗 REFERRAL TRAFFIC: {referral_sessions} sessions ({referral_sessions/total_sessions*100:.1f}%)")
         for item in referral_traffic:
-            print(f"  • {item['source']}: {item['sessions']} sessions, {item['users']} users")
-            print(f"    Avg Duration: {item['avg_duration']:.1f}s, Bounce: {item['bounce_rate']*100:.1f}%")
+            print(f"  • {item.source}: {item.sessions} sessions, {item.users} users")
+            print(f"    Avg Duration: {item.avg_duration:.1f}s, Bounce: {item.bounce_rate*100:.1f}%")
     else:
         print("\n🔗 REFERRAL TRAFFIC: None detected")
 
     # Direct Traffic (could be you, bookmarks, or typed URL)
     if direct_traffic:
-        direct_sessions = sum(item['sessions'] for item in direct_traffic)
+        direct_sessions = sum(item.sessions for item in direct_traffic)
         print(f"\n📌 DIRECT TRAFFIC: {direct_sessions} sessions ({direct_sessions/total_sessions*100:.1f}%)")
         print(f"  ⚠️  Note: This could include:")
         print(f"      - Your own visits")
         print(f"      - Bookmarked users")
         print(f"      - Direct URL entry")
         for item in direct_traffic:
-            print(f"  • Sessions: {item['sessions']}, Users: {item['users']}")
-            print(f"    Avg Duration: {item['avg_duration']:.1f}s, Bounce: {item['bounce_rate']*100:.1f}%")
+            print(f"  • Sessions: {item.sessions}, Users: {item.users}")
+            print(f"    Avg Duration: {item.avg_duration:.1f}s, Bounce: {item.bounce_rate*100:.1f}%")
 
     return traffic_sources
 
 
-def analyze_user_behavior(client, days=30):
+@traced
+def analyze_user_behavior(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze user behavior patterns to identify real vs bot traffic."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n👥 USER BEHAVIOR ANALYSIS")
     print("=" * 60)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -207,13 +203,16 @@ def analyze_user_behavior(client, days=30):
             print(f"    ⚠️  Low engagement (possible bot or bounce)")
 
 
-def analyze_top_pages(client, days=30):
+@traced
+def analyze_top_pages(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze which pages are getting traffic."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n📄 TOP PAGES ANALYSIS")
     print("=" * 60)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -235,6 +234,7 @@ def analyze_top_pages(client, days=30):
     )
 
     response = client.run_report(request)
+    index = get_article_index()
 
     print("\n🏆 TOP 10 PAGES:")
     for i, row in enumerate(response.rows, 1):
@@ -244,17 +244,24 @@ def analyze_top_pages(client, days=30):
         users = int(row.metric_values[1].value)
         duration = float(row.metric_values[2].value)
 
+        article = index.resolve(path)
+        if article:
+            title = f"📰 {article['title']}"
+
         print(f"\n  {i}. {title or path}")
         print(f"     Views: {views}, Unique Users: {users}, Avg Time: {duration:.1f}s")
 
 
-def analyze_geographic_distribution(client, days=30):
+@traced
+def analyze_geographic_distribution(client, days=30, property_id=GA4_PROPERTY_ID):
     """Analyze where users are located."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+
     print(f"\n🌍 GEOGRAPHIC DISTRIBUTION")
     print("=" * 60)
 
     request = RunReportRequest(
-        property=f"properties/{GA4_PROPERTY_ID}",
+        property=f"properties/{property_id}",
         date_ranges=[DateRange(
             start_date=f"{days}daysAgo",
             end_date="today"
@@ -286,21 +293,74 @@ def analyze_geographic_distribution(client, days=30):
         print(f"  • {city}, {country}: {users} users, {sessions} sessions")
 
 
+def analysis_steps(days=30, property_id=GA4_PROPERTY_ID):
+    """The traffic analyses in report order, each called as step(client)."""
+    return [
+        partial(analyze_traffic_sources, days=days, property_id=property_id),
+        partial(analyze_user_behavior, days=days, property_id=property_id),
+        partial(analyze_top_pages, days=days, property_id=property_id),
+        partial(analyze_geographic_distribution, days=days, property_id=property_id),
+    ]
+
+
+def run_analyses(client, days=30, property_id=GA4_PROPERTY_ID):
+    """Every traffic analysis with one client (main and analysis-daemon.py)."""
+    for step in analysis_steps(days=days, property_id=property_id):
+        step(client)
+
+
 def main():
     """Run complete traffic analysis."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze GA4 traffic sources, behaviour, pages and geography')
+    parser.add_argument('--days', type=int, default=30, help='Number of days to analyze')
+    parser.add_argument('--profile', metavar='TRACE_JSON',
+                        help='Write a Chrome trace of phases and GA4 requests and print a timing summary')
+    parser.add_argument('--metrics', metavar='PROM_FILE',
+                        help='Also write key aggregates and run health to an OpenMetrics textfile')
+    parser.add_argument('--shard', choices=['week', 'month'],
+                        help='Fetch long date ranges as weekly or monthly requests in parallel, merged into one report')
+    parser.add_argument('--properties', metavar='CONFIG',
+                        help='JSON config of GA4 properties to analyze concurrently, with per-property and combined rollups')
+    args = parser.parse_args()
+    start_profiling(args.profile)
+    start_metrics(args.metrics)
+
+    if args.properties:
+        from ga4_properties import load_properties, print_rollup, run_portfolio
+
+        try:
+            properties, pool_size = load_properties(args.properties)
+        except ValueError as e:
+            parser.error(str(e))
+
+        print("\n" + "=" * 60)
+        print("  GA4 TRAFFIC ANALYSIS - Portfolio")
+        print(f"  {len(properties)} properties from {args.properties}")
+        print("=" * 60)
+
+        results = run_portfolio(properties, lambda prop: analysis_steps(days=args.days, property_id=prop['id']),
+                                lambda: profiled_client(get_ga4_client()), pool_size,
+                                shard=args.shard)
+        print_rollup(results)
+        print("\n")
+        return
+
     print("\n" + "=" * 60)
     print("  GA4 TRAFFIC ANALYSIS - Context is Everything")
-    print("  Property ID: 506980538")
+    print(f"  Property ID: {GA4_PROPERTY_ID}")
     print("=" * 60)
 
     try:
-        client = get_ga4_client()
+        client = metered_client(profiled_client(get_ga4_client()))
+        if args.shard:
+            from ga4_shards import sharded_client
+
+            client = sharded_client(client, args.shard)
 
         # Run analyses
-        analyze_traffic_sources(client, days=30)
-        analyze_user_behavior(client, days=30)
-        analyze_top_pages(client, days=30)
-        analyze_geographic_distribution(client, days=30)
+        run_analyses(client, days=args.days)
 
         print("\n" + "=" * 60)
         print("  📊 ANALYSIS COMPLETE")
@@ -314,6 +374,7 @@ def main():
         print("\n")
 
     except Exception as e:
+        record_failure()
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+AI Consultant Token Usage & Latency Analysis Script
+
+Streams saved `vercel logs` output (any amount) and parses the
+`📊 Token Usage:` entries logged by the AI consultant route:
+- Token counts (input, output, total) and cost per request
+- API latency per request (latency_ms, where logged)
+- Per-route and per-model breakdowns
+
+Quantiles (p50/p95/p99) come from t-digest sketches, so memory stays
+constant however many log lines are read. --since/--until select any
+window, and --by-day adds a per-day breakdown.
+
+Usage:
+    python scripts/analyze-token-usage.py vercel-logs.txt [more.txt.gz ...]
+    vercel logs <deployment> | python scripts/analyze-token-usage.py -
+    python scripts/analyze-token-usage.py logs.txt --since 2026-10-01 --until 2026-10-15 --by-day
+    python scripts/analyze-token-usage.py logs.txt --profile trace.json
+    python scripts/analyze-token-usage.py logs.txt --metrics /var/lib/node_exporter/textfile/cie.prom
+"""
+
+import gzip
+import re
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from metrics_export import record, start_metrics
+from profiling import span, start_profiling
+from tdigest import TDigest
+
+LOG_MARKER = '📊 Token Usage:'
+
+# USD per token (input, output); unknown models fall back to DEFAULT_MODEL
+MODEL_PRICES = {
+    'claude-3-haiku-20240307': (0.00000025, 0.00000125),
+    'claude-3-5-haiku-20241022': (0.0000008, 0.000004),
+    'claude-3-5-sonnet-20241022': (0.000003, 0.000015),
+}
+DEFAULT_MODEL = 'claude-3-haiku-20240307'
+DEFAULT_ROUTE = '/api/ai-consultant'
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Matches key: value pairs in both JSON ("key": 1) and Node inspect (key: 'x') output
+FIELD_PATTERN = re.compile(
+    r"""["']?(\w+)["']?\s*:\s*(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|(-?\d+(?:\.\d+)?))"""
+)
+
+
+def _open(path: str):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_usage_blocks(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the `{...}` text of each token usage entry.
+
+    Node pretty-prints long objects across several lines, so lines are
+    accumulated until the braces balance.
+    """
+    for path in paths:
+        stream = _open(path)
+        try:
+            block = None
+            depth = 0
+            for line in stream:
+                if block is None:
+                    marker = line.find(LOG_MARKER)
+                    if marker == -1:
+                        continue
+                    line = line[marker + len(LOG_MARKER):]
+                    start = line.find('{')
+                    if start == -1:
+                        continue
+                    block, depth = '', 0
+                    line = line[start:]
+                block += line
+                depth += line.count('{') - line.count('}')
+                if depth <= 0:
+                    yield block
+                    block = None
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def parse_usage(block: str) -> Dict:
+    """Extract fields from one usage block; numbers become floats."""
+    fields = {}
+    for key, single, double, number in FIELD_PATTERN.findall(block):
+        if number:
+            fields[key] = float(number)
+        else:
+            fields[key] = single or double
+    return fields
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def request_cost(model: str, input_tokens: float, output_tokens: float) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODEL])
+    return input_tokens * input_price + output_tokens * output_price
+
+
+class UsageGroup:
+    """Running totals plus t-digests for one route, model or day."""
+
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0.0
+        self.output_tokens = 0.0
+        self.cost = 0.0
+        self.tokens = TDigest()
+        self.latency = TDigest()
+        self.request_cost = TDigest()
+
+    def add(self, input_tokens: float, output_tokens: float, cost: float, latency_ms: Optional[float]):
+        self.requests += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cost += cost
+        self.tokens.add(input_tokens + output_tokens)
+        self.request_cost.add(cost)
+        if latency_ms is not None:
+            self.latency.add(latency_ms)
+
+
+class UsageAnalyzer:
+    """Groups parsed usage entries by overall, route, model and (optionally) day."""
+
+    def __init__(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 by_day: bool = False):
+        self.since = since
+        self.until = until
+        self.by_day = by_day
+        self.groups: Dict[Tuple[str, str], UsageGroup] = OrderedDict()
+        self.skipped = 0
+
+    def _group(self, kind: str, name: str) -> UsageGroup:
+        key = (kind, name)
+        if key not in self.groups:
+            self.groups[key] = UsageGroup()
+        return self.groups[key]
+
+    def add(self, fields: Dict):
+        timestamp = _parse_time(fields.get('timestamp'))
+        if (self.since or self.until) and timestamp is None:
+            self.skipped += 1
+            return
+        if self.since and timestamp < self.since:
+            self.skipped += 1
+            return
+        if self.until and timestamp >= self.until:
+            self.skipped += 1
+            return
+
+        input_tokens = fields.get('input_tokens', 0.0)
+        output_tokens = fields.get('output_tokens', 0.0)
+        model = fields.get('model') or DEFAULT_MODEL
+        route = fields.get('route') or DEFAULT_ROUTE
+        latency = fields.get('latency_ms')
+        cost = request_cost(model, input_tokens, output_tokens)
+
+        groups = [self._group('all', 'All requests'), self._group('route', route), self._group('model', model)]
+        if self.by_day and timestamp is not None:
+            groups.append(self._group('day', timestamp.strftime('%Y-%m-%d')))
+        for group in groups:
+            group.add(input_tokens, output_tokens, cost, latency)
+
+
+def _quantiles(digest: TDigest, fmt: str) -> str:
+    if not digest.count:
+        return "n/a"
+    return " / ".join(fmt.format(digest.quantile(q)) for q in QUANTILES)
+
+
+def print_group(name: str, group: UsageGroup):
+    print(f"\n  {name}")
+    print(f"    Requests: {group.requests}, Tokens: {group.input_tokens:.0f} in / {group.output_tokens:.0f} out, "
+          f"Cost: ${group.cost:.4f}")
+    print(f"    Tokens/request p50/p95/p99:  {_quantiles(group.tokens, '{:.0f}')}")
+    print(f"    Latency ms p50/p95/p99:      {_quantiles(group.latency, '{:.0f}')}")
+    print(f"    Cost/request p50/p95/p99:    {_quantiles(group.request_cost, '${:.5f}')}")
+
+
+def record_usage_metrics(analyzer: UsageAnalyzer):
+    """Export overall, per-route and per-model totals (days would grow without bound)."""
+    for (kind, name), group in analyzer.groups.items():
+        if kind == 'day':
+            continue
+        labels = {'group': kind, 'name': name}
+        record('llm_requests', group.requests, **labels)
+        record('llm_tokens', group.input_tokens, direction='input', **labels)
+        record('llm_tokens', group.output_tokens, direction='output', **labels)
+        record('llm_cost_usd', round(group.cost, 6), **labels)
+        latency = group.latency.quantile(0.95)
+        if latency is not None:
+            record('llm_latency_p95_milliseconds', round(latency, 1), **labels)
+
+
+def print_report(analyzer: UsageAnalyzer):
+    print(f"\n📊 TOKEN USAGE & LATENCY ANALYSIS")
+    print("=" * 70)
+
+    overall = analyzer.groups.get(('all', 'All requests'))
+    if overall is None:
+        print("\nNo token usage data found in the given logs")
+        return
+
+    print_group('📈 ALL REQUESTS', overall)
+
+    for kind, title in (('route', '🛣️  BY ROUTE'), ('model', '🤖 BY MODEL'), ('day', '📅 BY DAY')):
+        groups = [(name, g) for (k, name), g in analyzer.groups.items() if k == kind]
+        if not groups:
+            continue
+        print(f"\n{title}:")
+        for name, group in sorted(groups):
+            print_group(name, group)
+
+    if analyzer.skipped:
+        print(f"\n  ({analyzer.skipped} entries outside the selected window)")
+
+
+def main():
+    """Analyze token usage from saved Vercel logs."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze AI consultant token usage and latency')
+    parser.add_argument('logs', nargs='+', help="Saved log files (.gz ok) or '-' for stdin")
+    parser.add_argument('--since', help='Only include entries at or after this ISO date/time')
+    parser.add_argument('--until', help='Only include entries before this ISO date/time')
+    parser.add_argument('--by-day', action='store_true', help='Add a per-day breakdown')
+    parser.add_argument('--profile', metavar='TRACE_JSON',
+                        help='Write a Chrome trace of parsing and reporting and print a timing summary')
+    parser.add_argument('--metrics', metavar='PROM_FILE',
+                        help='Also write token, cost and latency totals to an OpenMetrics textfile')
+    args = parser.parse_args()
+    start_profiling(args.profile)
+    start_metrics(args.metrics)
+
+    since = _parse_time(args.since)
+    until = _parse_time(args.until)
+    if (args.since and since is None) or (args.until and until is None):
+        print("❌ --since/--until must be ISO dates, e.g. 2026-10-01 or 2026-10-01T09:00:00Z")
+        sys.exit(1)
+
+    analyzer = UsageAnalyzer(since=since, until=until, by_day=args.by_day)
+    with span('parse_logs') as stats:
+        stats['entries'] = 0
+        for block in iter_usage_blocks(args.logs):
+            analyzer.add(parse_usage(block))
+            stats['entries'] += 1
+
+    record_usage_metrics(analyzer)
+    with span('print_report'):
+        print_report(analyzer)
+    print("\nNote: For complete monthly usage, check Anthropic Console:")
+    print("https://console.anthropic.com/settings/usage\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Article Path Resolver
+
+Maps GA4 page paths to canonical thought leadership articles, built from the
+article JSON files in thought_leadership/articles/ at startup instead of
+hardcoded slug lists.
+
+Paths are normalized once per distinct value (memoized) before lookup:
+- Full URLs are reduced to their path
+- Query strings and fragments are dropped
+- Case is folded and repeated/trailing slashes removed
+- Locale prefixes such as /en/ or /en-gb/ before an article prefix are stripped
+
+The normalized path is then resolved with a single dict lookup on its first
+two segments (e.g. /insights/<slug>), so each row costs O(path length)
+regardless of how many articles exist.
+
+Page titles (for reports without a path dimension) resolve the same way,
+once the site's title suffix is removed.
+
+Shared by analyze-ga4-traffic.py, analyze-ai-bot-traffic.py,
+analyze-concierge-usage.py and realtime-monitor.py.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from article_metadata import load_article_metadata
+
+BASE_DIR = Path(__file__).parent.parent
+ARTICLES_DIR = BASE_DIR / "thought_leadership" / "articles"
+
+# URL prefixes under which articles are served
+ARTICLE_PREFIXES = ['/insights/', '/articles/']
+
+# Only strip a locale segment when an article prefix follows, so short
+# top-level paths like /ai/... are left alone
+LOCALE_PREFIX_PATTERN = re.compile(
+    r'^/[a-z]{2}(?:-[a-z]{2})?(?=' + '|'.join(re.escape(p) for p in ARTICLE_PREFIXES) + ')')
+REPEATED_SLASH_PATTERN = re.compile(r'/{2,}')
+
+# Article pages are titled "<article title> | Context is Everything"
+TITLE_SUFFIX = ' | context is everything'
+
+
+@lru_cache(maxsize=65536)
+def normalize_path(path: str) -> str:
+    """Normalize a GA4 pagePath (or full URL) for lookup."""
+    if '://' in path:
+        path = urlsplit(path).path
+    path = path.split('?', 1)[0].split('#', 1)[0].lower()
+    path = REPEATED_SLASH_PATTERN.sub('/', path)
+    if not path.startswith('/'):
+        path = '/' + path
+    path = LOCALE_PREFIX_PATTERN.sub('', path, count=1)
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return path
+
+
+def _article_record(data: Dict, file_path: Path) -> Optional[Dict]:
+    """Extract the fields the resolver needs from either article schema."""
+    article = data.get('article', data)
+    slug = article.get('slug')
+    if not slug:
+        return None
+    metadata = article.get('metadata', {})
+    return {
+        'id': article.get('id', file_path.stem),
+        'slug': slug,
+        'title': article.get('title', slug),
+        'file': file_path.name,
+        'keywords': (metadata.get('tags', []) + metadata.get('seoKeywords', [])
+                     + article.get('keywords_for_matching', [])),
+        # Files without the {"article": ...} wrapper predate the current schema
+        'legacy': 'article' not in data,
+    }
+
+
+class ArticleIndex:
+    """Dict index from normalized article paths to article records."""
+
+    def __init__(self, articles: List[Dict]):
+        self.articles: List[Dict] = []
+        self._by_path: Dict[str, Dict] = {}
+        self._by_slug: Dict[str, Dict] = {}
+        self._by_title: Dict[str, Dict] = {}
+
+        # Current-schema articles win over legacy files claiming the same slug
+        for record in sorted(articles, key=lambda r: (not r['legacy'], r['file'])):
+            slug = record['slug'].lower()
+            if slug in self._by_slug and self._by_slug[slug] in self.articles:
+                self.articles.remove(self._by_slug[slug])
+            self._by_slug[slug] = record
+            self.articles.append(record)
+            for prefix in ARTICLE_PREFIXES:
+                self._by_path[prefix + slug] = record
+            self._by_title[record['title'].strip().lower()] = record
+
+        self.articles.sort(key=lambda r: r['id'])
+
+    @classmethod
+    def load(cls, articles_dir: Path = ARTICLES_DIR) -> 'ArticleIndex':
+        # Metadata only: article bodies are never read for path resolution
+        records = []
+        for file_path, entry in load_article_metadata("*.json", articles_dir):
+            record = _article_record(entry, file_path)
+            if record:
+                record['legacy'] = entry['legacy']
+                records.append(record)
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def resolve(self, path: str) -> Optional[Dict]:
+        """Return the article record for a page path, or None."""
+        normalized = normalize_path(path)
+        # '/insights/<slug>/anything' -> '/insights/<slug>'
+        end = normalized.find('/', normalized.find('/', 1) + 1)
+        key = normalized if end == -1 else normalized[:end]
+        return self._by_path.get(key)
+
+    def by_slug(self, slug: str) -> Optional[Dict]:
+        return self._by_slug.get(slug.lower())
+
+    def resolve_title(self, title: str) -> Optional[Dict]:
+        """Return the article record for a page title, or None.
+
+        For reports with no page path dimension, such as GA4 realtime
+        reports, whose unifiedScreenName is the document title.
+        """
+        title = title.strip().lower()
+        return self._by_title.get(title.removesuffix(TITLE_SUFFIX))
+
+
+@lru_cache(maxsize=1)
+def get_article_index() -> ArticleIndex:
+    """Load the article index once per process."""
+    return ArticleIndex.load()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Article Metadata Index
+
+Metadata-only article loading backed by a sidecar index
+(.cache/article-metadata.json):
+- For each article file the index keeps id, title, slug, metadata,
+  keywords, the bot excerpt and structured data, a SHA-256 of the bot
+  content, plus the file's size and mtime
+- Listing articles only stats the files and reads the index; a file is
+  fully decoded only when it is new or has changed since it was indexed
+- Full article bodies (human/bot content) are read only by callers that
+  ask for them, e.g. scan_articles(full=True) in sync-new-article.py
+
+The excerpt follows the multi-KB content strings in the article schema,
+so an incremental reader could not stop early; the sidecar avoids reading
+the bodies at all.
+
+Returned records keep the {"article": {...}} shape of the source files with
+the bodies left out, so code reading titles, slugs, tags or excerpts works
+on either.
+
+Used by sync-new-article.py and article_index.py.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent
+ARTICLES_DIR = BASE_DIR / "thought_leadership" / "articles"
+METADATA_INDEX = BASE_DIR / ".cache" / "article-metadata.json"
+
+# Bump when the extracted fields change so stale indexes are rebuilt
+INDEX_VERSION = 2
+
+
+def extract_metadata(data: Dict) -> Dict:
+    """Metadata-only copy of an article file in either schema."""
+    article = data.get('article', data)
+    bot = article.get('versions', {}).get('bot', {})
+    summary = {
+        'id': article.get('id'),
+        'title': article.get('title'),
+        'slug': article.get('slug'),
+        'metadata': article.get('metadata', {}),
+        'versions': {'bot': {'excerpt': bot.get('excerpt', '')}},
+    }
+    if 'structuredData' in bot:
+        summary['versions']['bot']['structuredData'] = bot['structuredData']
+    if 'keywords_for_matching' in article:
+        summary['keywords_for_matching'] = article['keywords_for_matching']
+    # Lets callers tell whether a body changed without reading it
+    body_sha256 = hashlib.sha256(bot.get('content', '').encode('utf-8')).hexdigest()
+    # Files without the {"article": ...} wrapper predate the current schema
+    return {'article': summary, 'legacy': 'article' not in data, 'body_sha256': body_sha256}
+
+
+class MetadataIndex:
+    """Sidecar index of article metadata, refreshed per file on size/mtime change."""
+
+    def __init__(self, articles_dir: Path = ARTICLES_DIR, index_path: Path = METADATA_INDEX):
+        self.articles_dir = Path(articles_dir)
+        self.index_path = Path(index_path)
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == INDEX_VERSION:
+                self._entries = stored.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def _entry(self, file_path: Path) -> Optional[Dict]:
+        stat = file_path.stat()
+        key = [stat.st_size, stat.st_mtime_ns]
+        name = self._name(file_path)
+        entry = self._entries.get(name)
+        if entry is not None and entry['stat'] == key:
+            return entry
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Error reading {file_path.name}: {e}")
+            return None
+        entry = {'stat': key, **extract_metadata(data)}
+        self._entries[name] = entry
+        self._dirty = True
+        return entry
+
+    @staticmethod
+    def _name(file_path: Path) -> str:
+        return os.path.relpath(file_path, BASE_DIR)
+
+    def list(self, pattern: str = "article-*.json") -> List[Tuple[Path, Dict]]:
+        """(file path, metadata entry) for each matching file, sorted by name."""
+        results = []
+        seen = set()
+        for file_path in sorted(self.articles_dir.glob(pattern)):
+            entry = self._entry(file_path)
+            if entry is not None:
+                results.append((file_path, entry))
+                seen.add(self._name(file_path))
+        if pattern == "*.json":
+            prefix = self._name(self.articles_dir) + os.sep
+            for name in {n for n in self._entries if n.startswith(prefix)} - seen:
+                del self._entries[name]
+                self._dirty = True
+        return results
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=f".{self.index_path.name}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'files': self._entries}, f, ensure_ascii=False)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
+
+
+def load_article_metadata(pattern: str = "article-*.json", articles_dir: Path = ARTICLES_DIR,
+                          index_path: Path = METADATA_INDEX, save: bool = True) -> List[Tuple[Path, Dict]]:
+    """Metadata for matching article files, updating the sidecar index as needed.
+
+    With save=False (e.g. sync-new-article.py --check) the index is read
+    but never written.
+    """
+    index = MetadataIndex(articles_dir, index_path)
+    results = index.list(pattern)
+    if not save:
+        return results
+    try:
+        index.save()
+    except OSError as e:
+        # A read-only checkout still works, just without the cache
+        print(f"⚠️  Could not save article metadata index: {e}")
+    return results
+
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Report Row Memory Benchmark
+
+Compares the memory and conversion time of keeping GA4 report rows as
+dicts of strings against the compact rows in ga4_rows.py:
+- dict:            {'source': ..., 'medium': ..., 'sessions': ...} per row
+- slots:           TrafficSourceRow with __slots__, dimension values not interned
+- slots + intern:  TrafficSourceRow.from_row(), as the analyses use it
+
+Rows are synthetic traffic-source rows (source × medium × campaign with
+five metrics) with realistic repetition of dimension values. As with the
+GA4 client, every value read from a response row is a freshly decoded
+string, so only interning lets rows share them. Memory is what the row
+list retains, measured with tracemalloc; time is measured untraced.
+
+Usage:
+    python scripts/bench-rows.py
+    python scripts/bench-rows.py --rows 100000 1000000 --sources 500
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from ga4_rows import TrafficSourceRow
+
+MEDIA = ['organic', 'referral', '(none)', 'email', 'social', 'cpc']
+
+
+class _Value:
+    """Stands in for a GA4 DimensionValue/MetricValue: decodes on every read."""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, text: str):
+        self._data = text.encode('utf-8')
+
+    @property
+    def value(self) -> str:
+        return self._data.decode('utf-8')
+
+
+class _Row:
+    __slots__ = ('dimension_values', 'metric_values')
+
+    def __init__(self, dimensions: List[str], metrics: List[str]):
+        self.dimension_values = [_Value(value) for value in dimensions]
+        self.metric_values = [_Value(value) for value in metrics]
+
+
+def make_rows(count: int, sources: int, seed: int = 7) -> List[_Row]:
+    """Distinct response rows to convert; built once and reused by every variant."""
+    rng = random.Random(seed)
+    source_names = [f"source-{i}.example.com" for i in range(sources)]
+    campaigns = ['(not set)'] + [f"campaign-{i}" for i in range(20)]
+    return [
+        _Row(
+            [rng.choice(source_names), rng.choice(MEDIA), rng.choice(campaigns)],
+            [str(rng.randint(1, 500)), str(rng.randint(1, 400)), str(rng.randint(1, 2000)),
+             f"{rng.uniform(0, 600):.6f}", f"{rng.random():.6f}"],
+        )
+        for _ in range(count)
+    ]
+
+
+def as_dicts(rows: List[_Row]) -> List[Dict]:
+    """The previous approach in analyze_traffic_sources."""
+    result = []
+    for row in rows:
+        result.append({
+            'source': row.dimension_values[0].value,
+            'medium': row.dimension_values[1].value,
+            'campaign': row.dimension_values[2].value,
+            'sessions': int(row.metric_values[0].value),
+            'users': int(row.metric_values[1].value),
+            'pageviews': int(row.metric_values[2].value),
+            'avg_duration': float(row.metric_values[3].value),
+            'bounce_rate': float(row.metric_values[4].value),
+        })
+    return result
+
+
+def as_slots(rows: List[_Row]) -> List[TrafficSourceRow]:
+    return [
+        TrafficSourceRow(
+            row.dimension_values[0].value,
+            row.dimension_values[1].value,
+            row.dimension_values[2].value,
+            int(row.metric_values[0].value),
+            int(row.metric_values[1].value),
+            int(row.metric_values[2].value),
+            float(row.metric_values[3].value),
+            float(row.metric_values[4].value),
+        )
+        for row in rows
+    ]
+
+
+def as_interned(rows: List[_Row]) -> List[TrafficSourceRow]:
+    return [TrafficSourceRow.from_row(row) for row in rows]
+
+
+VARIANTS = {
+    'dict': as_dicts,
+    'slots': as_slots,
+    'slots + intern': as_interned,
+}
+
+
+def retained_bytes(convert: Callable, rows: List[_Row]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = convert(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def conversion_seconds(convert: Callable, rows: List[_Row]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    result = convert(rows)
+    elapsed = time.perf_counter() - start
+    del result
+    return elapsed
+
+
+def format_mb(size: int) -> str:
+    return f"{size / 1024 ** 2:.1f}MB"
+
+
+def main():
+    """Measure each row representation at each row count."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark memory of dict rows vs compact report rows')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help='Row counts to measure (default: 100000 1000000)')
+    parser.add_argument('--sources', type=int, default=300, help='Distinct traffic sources in the rows')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("  REPORT ROW MEMORY BENCHMARK")
+    print(f"  Python {sys.version.split()[0]}, traffic-source rows, {args.sources} sources")
+    print("=" * 70)
+
+    for count in args.rows:
+        rows = make_rows(count, args.sources)
+        print(f"\n📦 {count:,} ROWS")
+        print(f"  {'Representation':<18}{'Retained':>12}{'Per row':>10}{'vs dict':>10}{'Convert':>10}")
+        baseline = None
+        for name, convert in VARIANTS.items():
+            size = retained_bytes(convert, rows)
+            seconds = conversion_seconds(convert, rows)
+            baseline = baseline or size
+            print(f"  {name:<18}{format_mb(size):>12}{size / count:>9.0f}B"
+                  f"{size / baseline:>9.0%} {seconds:>8.2f}s")
+        del rows
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
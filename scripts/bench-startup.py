@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+
+Measures how quickly each cie.py subcommand starts, with
+python -X importtime:
+- Runs `cie.py <command> --help` in a fresh interpreter, best of N runs
+- Breaks import time down by top-level module, leaving out the modules a
+  bare interpreter imports anyway
+- Fails (exit 1) when a command's imports exceed its budget, or when it
+  imports a module that should only load once a report runs (the GA4
+  client library, gRPC, protobuf)
+
+Run it after changing imports in any script cie.py dispatches to.
+
+Usage:
+    python scripts/bench-startup.py
+    python scripts/bench-startup.py sync tokens --runs 10
+    python scripts/bench-startup.py --top 15 --budget-scale 2
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from cie import COMMANDS
+
+CLI = Path(__file__).parent / "cie.py"
+
+# Import budget per command in milliseconds (imports beyond a bare interpreter)
+DEFAULT_BUDGET_MS = 60
+BUDGET_MS = {
+    'sync': 90,
+    'tokens': 40,
+}
+
+# Heavy modules no command may import just to start up
+DEFERRED_MODULES = ('google', 'grpc', 'proto', 'numpy')
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """(module, cumulative µs) for each top-level import in -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        if name.startswith(' '):
+            continue  # nested import, already counted in its parent's cumulative time
+        imports.append((name, int(fields[1])))
+    return imports
+
+
+def all_imported(stderr: str) -> Set[str]:
+    return {line.rsplit('|', 1)[1].strip() for line in stderr.splitlines()
+            if line.startswith('import time:') and '|' in line}
+
+
+def run_importtime(args: List[str]) -> Tuple[str, float]:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                            capture_output=True, text=True, cwd=CLI.parent)
+    return result.stderr, (time.perf_counter() - start) * 1000
+
+
+def measure(command: str, runs: int, baseline: Set[str]) -> Dict:
+    """Best-of-runs import breakdown and wall time for one subcommand."""
+    best = None
+    for _ in range(runs):
+        stderr, wall_ms = run_importtime([str(CLI), command, '--help'])
+        imports = [(name, us) for name, us in parse_importtime(stderr) if name not in baseline]
+        total_ms = sum(us for _, us in imports) / 1000
+        if best is None or total_ms < best['import_ms']:
+            best = {
+                'import_ms': total_ms,
+                'wall_ms': wall_ms,
+                'imports': sorted(imports, key=lambda item: -item[1]),
+                'deferred': sorted(name for name in all_imported(stderr)
+                                   if name.split('.')[0] in DEFERRED_MODULES),
+            }
+    return best
+
+
+def main():
+    """Benchmark subcommand startup and exit non-zero on a regression."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark and gate cie.py subcommand startup time')
+    parser.add_argument('commands', nargs='*', metavar='command',
+                        help=f"Subcommands to measure (default: all of {', '.join(COMMANDS)})")
+    parser.add_argument('--runs', type=int, default=5, help='Runs per command (best is kept)')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest imports to list per command')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply every budget (e.g. 2 on a slow CI runner)')
+    args = parser.parse_args()
+
+    unknown = [command for command in args.commands if command not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    commands = args.commands or list(COMMANDS)
+    baseline = all_imported(run_importtime(['-c', 'pass'])[0])
+
+    print("\n" + "=" * 70)
+    print("  CLI STARTUP BENCHMARK")
+    print(f"  {sys.executable} -X importtime cie.py <command> --help (best of {args.runs})")
+    print("=" * 70)
+
+    failures = []
+    for command in commands:
+        result = measure(command, args.runs, baseline)
+        budget = BUDGET_MS.get(command, DEFAULT_BUDGET_MS) * args.budget_scale
+        over_budget = result['import_ms'] > budget
+
+        status = "✓" if not over_budget and not result['deferred'] else "❌"
+        print(f"\n{status} {command:<10} imports {result['import_ms']:6.1f}ms (budget {budget:.0f}ms), "
+              f"wall {result['wall_ms']:6.1f}ms")
+        for name, us in result['imports'][:args.top]:
+            print(f"    {us / 1000:6.1f}ms  {name}")
+
+        if over_budget:
+            failures.append(f"{command}: imports took {result['import_ms']:.1f}ms, budget {budget:.0f}ms")
+        if result['deferred']:
+            failures.append(f"{command}: imports {', '.join(result['deferred'][:3])} at startup")
+
+    print("\n" + "=" * 70)
+    if failures:
+        print("  ❌ STARTUP REGRESSIONS")
+        print("=" * 70)
+        for failure in failures:
+            print(f"  • {failure}")
+        print()
+        sys.exit(1)
+
+    print("  ✅ ALL COMMANDS WITHIN BUDGET")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Case Study Versions
+
+Reads and edits the case studies in Case_studies/version-store.json, which
+is their only copy (see version_store.py):
+- list      Case studies with their revision count and latest revision
+- log       Revision history of one case study
+- show      Print a revision as JSON
+- checkout  Write a revision to a JSON file for editing
+- commit    Record an edited JSON file as the next revision
+
+Usage:
+    python scripts/case-study-versions.py list
+    python scripts/case-study-versions.py log lsa_case_study_versions
+    python scripts/case-study-versions.py show lsa_case_study_versions --revision 1
+    python scripts/case-study-versions.py checkout lsa_case_study_versions -o /tmp/lsa.json
+    python scripts/case-study-versions.py commit /tmp/lsa.json --key lsa_case_study_versions
+
+Checked-out files are working copies: commit them back and delete them
+rather than adding them to Case_studies/. After a commit, run
+sync-new-article.py so the knowledge base picks up the change.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from version_store import VERSION_STORE, VersionStore
+
+
+def open_store(path: Path) -> VersionStore:
+    try:
+        return VersionStore.open(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not open {path}: {e}")
+        sys.exit(1)
+
+
+def get_revision(store: VersionStore, key: str, revision: int):
+    document = store.get(key, revision)
+    if document is None:
+        known = ', '.join(store.keys()) or 'none'
+        print(f"❌ No revision {revision} of {key} (case studies: {known})")
+        sys.exit(1)
+    return document
+
+
+def main():
+    """Run one version store command."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Read and edit the case study version store')
+    parser.add_argument('--store', type=Path, default=VERSION_STORE, help='Version store file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help='Case studies with their revision count')
+
+    log = commands.add_parser('log', help='Revision history of a case study')
+    log.add_argument('key')
+
+    for name, summary in (('show', 'Print a revision as JSON'), ('checkout', 'Write a revision to a file')):
+        command = commands.add_parser(name, help=summary)
+        command.add_argument('key')
+        command.add_argument('--revision', '-r', type=int, default=-1,
+                             help='1-based revision, or negative to count back from the latest (default -1)')
+        if name == 'checkout':
+            command.add_argument('--output', '-o', type=Path, help='Output file (default <key>.json)')
+
+    commit = commands.add_parser('commit', help='Record an edited file as the next revision')
+    commit.add_argument('file', type=Path)
+    commit.add_argument('--key', help='Case study key (default: the file name without .json)')
+
+    args = parser.parse_args()
+    store = open_store(args.store)
+
+    if args.command == 'list':
+        for key in store.keys():
+            history = store.history(key)
+            latest = history[-1]
+            print(f"  • {key}: {len(history)} revision(s), latest {latest['recorded']} "
+                  f"({latest['length'] / 1024:.1f}KB)")
+        stats = store.stats()
+        print(f"\n{stats['revisions']} revisions of {stats['documents']} case studies: "
+              f"{stats['history_bytes'] / 1024:.0f}KB of history in {args.store.stat().st_size / 1024:.0f}KB")
+
+    elif args.command == 'log':
+        history = store.history(args.key)
+        if not history:
+            print(f"❌ No case study {args.key}")
+            sys.exit(1)
+        for revision in reversed(history):
+            print(f"  r{revision['revision']}  {revision['recorded']}  {revision['sha256'][:12]}  "
+                  f"{revision['length'] / 1024:.1f}KB")
+
+    elif args.command == 'show':
+        document = get_revision(store, args.key, args.revision)
+        json.dump(document, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    elif args.command == 'checkout':
+        document = get_revision(store, args.key, args.revision)
+        output = args.output or Path(f"{args.key}.json")
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"✓ Wrote {args.key} to {output}")
+
+    elif args.command == 'commit':
+        key = args.key or args.file.stem
+        try:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error reading {args.file}: {e}")
+            sys.exit(1)
+        if 'case_study' not in document:
+            print(f"❌ {args.file} has no case_study object")
+            sys.exit(1)
+        revision = store.record(key, document)
+        if revision is None:
+            print(f"✓ {key} unchanged")
+            return
+        store.save()
+        print(f"✓ Recorded {key} revision {revision}")
+
+
+if __name__ == "__main__":
+    main()
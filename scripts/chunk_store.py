@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Article Chunk Store
+
+Splits each article's versions.bot.content into retrieval-sized passages so
+offline tooling can work with the few passages that matter instead of
+whole articles:
+- Chunks follow the markdown heading structure: a heading always starts a
+  new chunk, and sections longer than the token budget are split at
+  paragraph (then sentence) boundaries
+- Chunk IDs are <slug>/<heading-anchor>/<n>, so editing one section does
+  not renumber chunks in the others
+- Each chunk records its heading path and character offsets into the
+  article content
+
+All chunks live in one binary file: a small header, a JSON offset table,
+then the UTF-8 text of every chunk back to back. Readers load the table
+once and seek straight to a chunk's bytes.
+
+    b'CHNK' | version (1 byte) | table length (4 bytes, big-endian) | table JSON | text
+
+The store (.cache/chunk-store.bin) is an offline artifact for Python
+tooling: it is not committed or deployed, and the site has no reader for
+it. Open it with ChunkStore.
+
+Called by sync-new-article.py; rebuilt only when article sources change.
+"""
+
+import json
+import os
+import re
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from llms_txt import ARTICLES_DIR, BYTES_PER_TOKEN, article_files, iter_articles, sources_hash
+
+BASE_DIR = Path(__file__).parent.parent
+CHUNK_STORE = BASE_DIR / ".cache" / "chunk-store.bin"
+
+MAGIC = b'CHNK'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('>4sBI')
+
+DEFAULT_MAX_TOKENS = 400
+
+HEADING_PATTERN = re.compile(r'(#{1,6})\s+(.+?)\s*#*\s*$')
+BLOCK_PATTERN = re.compile(r'\S(?:.|\n(?![ \t]*\n))*', re.MULTILINE)
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text.encode('utf-8')) // BYTES_PER_TOKEN)
+
+
+def heading_anchor(heading: str) -> str:
+    anchor = re.sub(r'[^\w\s-]', '', heading.lower())
+    return re.sub(r'[\s_]+', '-', anchor).strip('-') or 'section'
+
+
+def _split_block(content: str, start: int, end: int, max_tokens: int) -> List[Tuple[int, int]]:
+    """Split an oversized paragraph at sentence boundaries (hard cut as a last resort)."""
+    pieces = []
+    piece_start = start
+    last_break = None
+    for match in SENTENCE_END_PATTERN.finditer(content, start, end):
+        if estimate_tokens(content[piece_start:match.start()]) > max_tokens and last_break:
+            pieces.append((piece_start, last_break[0]))
+            piece_start = last_break[1]
+        last_break = (match.start(), match.end())
+    max_chars = max_tokens * BYTES_PER_TOKEN
+    while estimate_tokens(content[piece_start:end]) > max_tokens:
+        cut = content.rfind(' ', piece_start, piece_start + max_chars)
+        cut = cut if cut > piece_start else piece_start + max_chars
+        pieces.append((piece_start, cut))
+        piece_start = cut + 1 if content[cut:cut + 1] == ' ' else cut
+    pieces.append((piece_start, end))
+    return pieces
+
+
+def _blocks(content: str) -> Iterator[Tuple[int, int, Optional['re.Match']]]:
+    """(start, end, heading match or None) for each paragraph or heading line."""
+    for match in BLOCK_PATTERN.finditer(content):
+        start, end = match.span()
+        position = start
+        while position < end:
+            line_end = content.find('\n', position, end)
+            line_end = end if line_end == -1 else line_end
+            heading = HEADING_PATTERN.match(content, position, line_end)
+            if heading:
+                if position > start:
+                    yield start, position - 1, None
+                yield position, line_end, heading
+                start = line_end + 1
+            position = line_end + 1
+        if start < end:
+            yield start, end, None
+
+
+def split_chunks(content: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[Dict]:
+    """Heading-aware chunks of content as {anchor, headings, start, end} dicts."""
+    chunks = []
+    headings: List[Tuple[int, str]] = []
+    chunk_start = None
+    chunk_end = None
+    has_body = False
+
+    def flush():
+        nonlocal chunk_start, has_body
+        if chunk_start is not None:
+            chunks.append({
+                'headings': [text for _, text in headings],
+                'start': chunk_start,
+                'end': chunk_end,
+            })
+        chunk_start, has_body = None, False
+
+    for start, end, heading in _blocks(content):
+        if heading:
+            # Consecutive headings stay together with the text that follows them
+            if has_body:
+                flush()
+            level = len(heading.group(1))
+            headings = [h for h in headings if h[0] < level] + [(level, heading.group(2))]
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+            continue
+
+        for piece_start, piece_end in _split_block(content, start, end, max_tokens):
+            if (has_body and chunk_start is not None
+                    and estimate_tokens(content[chunk_start:piece_end]) > max_tokens):
+                flush()
+            if chunk_start is None:
+                chunk_start = piece_start
+            chunk_end = piece_end
+            has_body = True
+
+    flush()
+
+    # Stable IDs: deepest heading anchor plus position within that section
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        anchor = heading_anchor(chunk['headings'][-1]) if chunk['headings'] else 'intro'
+        chunk['anchor'] = anchor
+        chunk['n'] = seen.get(anchor, 0)
+        seen[anchor] = chunk['n'] + 1
+    return chunks
+
+
+def build_chunk_store(max_tokens: int = DEFAULT_MAX_TOKENS, force: bool = False,
+                      articles_dir: Path = ARTICLES_DIR, store_path: Path = CHUNK_STORE) -> bool:
+    """Rebuild the chunk store when article sources or the chunk size change."""
+    files = article_files(articles_dir)
+    source_hash = sources_hash(files, {'chunk_max_tokens': max_tokens, 'format': FORMAT_VERSION})
+
+    if not force and store_path.exists():
+        try:
+            if ChunkStore.open(store_path).source_hash == source_hash:
+                print("✓ Chunk store already up to date")
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+
+    table = []
+    articles: List[List[str]] = []
+    headings: Dict[str, int] = {}
+    blobs = []
+    offset = 0
+    for article in iter_articles(files):
+        articles.append([article['id'], article['slug']])
+        content = article['versions']['bot']['content']
+        for chunk in split_chunks(content, max_tokens):
+            text = content[chunk['start']:chunk['end']]
+            data = text.encode('utf-8')
+            heading = ' > '.join(chunk['headings'])
+            table.append([
+                f"{article['slug']}/{chunk['anchor']}/{chunk['n']}",
+                len(articles) - 1,
+                headings.setdefault(heading, len(headings)),
+                chunk['start'],
+                chunk['end'],
+                offset,
+                len(data),
+                estimate_tokens(text),
+            ])
+            blobs.append(data)
+            offset += len(data)
+
+    # Article and heading strings are stored once and referenced by index
+    header_table = json.dumps({
+        'source_hash': source_hash,
+        'max_tokens': max_tokens,
+        'articles': articles,
+        'headings': list(headings),
+        'chunks': table,
+    }, separators=(',', ':')).encode('utf-8')
+
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=store_path.parent, prefix=f".{store_path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(header_table)))
+            f.write(header_table)
+            for data in blobs:
+                f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    print(f"✓ Built {store_path.relative_to(BASE_DIR)} ({len(table)} chunks from {len(articles)} articles, "
+          f"{store_path.stat().st_size / 1024:.0f}KB)")
+    return True
+
+
+class ChunkStore:
+    """Reads chunk metadata from the offset table and chunk text on demand."""
+
+    def __init__(self, path: Path, table: Dict, data_start: int):
+        self.path = Path(path)
+        self.source_hash = table['source_hash']
+        self.max_tokens = table['max_tokens']
+        articles = table['articles']
+        headings = table['headings']
+        self.chunks = [
+            {
+                'id': chunk_id,
+                'article_id': articles[article][0],
+                'slug': articles[article][1],
+                'heading': headings[heading],
+                'start': start,
+                'end': end,
+                'offset': offset,
+                'length': length,
+                'tokens': tokens,
+            }
+            for chunk_id, article, heading, start, end, offset, length, tokens in table['chunks']
+        ]
+        self._by_id = {chunk['id']: chunk for chunk in self.chunks}
+        self._data_start = data_start
+
+    @classmethod
+    def open(cls, path: Path = CHUNK_STORE) -> 'ChunkStore':
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a chunk store")
+            magic, version, table_length = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} chunk store")
+            table = json.loads(f.read(table_length))
+        return cls(path, table, HEADER.size + table_length)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def get(self, chunk_id: str) -> Optional[Dict]:
+        return self._by_id.get(chunk_id)
+
+    def for_article(self, slug: str) -> List[Dict]:
+        return [chunk for chunk in self.chunks if chunk['slug'] == slug]
+
+    def read(self, chunk_ids: List[str]) -> Iterator[Tuple[Dict, str]]:
+        """(chunk, text) for each known ID, reading only those bytes."""
+        with open(self.path, 'rb') as f:
+            for chunk_id in chunk_ids:
+                chunk = self._by_id.get(chunk_id)
+                if chunk is None:
+                    continue
+                f.seek(self._data_start + chunk['offset'])
+                yield chunk, f.read(chunk['length']).decode('utf-8')
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Context is Everything - Site Tools
+
+One entry point for the content and analytics scripts:
+- sync       Sync new articles across pages, routes and generated files
+- traffic    GA4 traffic sources, behaviour, top pages and geography
+- bots       AI bot and structured content traffic
+- concierge  AI concierge usage, funnels and article events
+- tokens     Token usage and latency from saved Vercel logs
+- queries    Cluster concierge queries to find content gaps
+- cache      Replay concierge queries against answer cache policies
+- daemon     Run the traffic, bot and concierge analyses on a schedule
+- realtime   Watch AI crawler and concierge activity as it happens
+- versions   List, show, check out and commit case study revisions
+
+Only the chosen subcommand's script is loaded, and the analytics scripts
+import the GA4 client library (and with it gRPC and protobuf) only once a
+report actually runs, so checks and offline modes start quickly.
+scripts/bench-startup.py measures and gates this.
+
+Usage:
+    python scripts/cie.py sync --check
+    python scripts/cie.py bots --access-log logs/*.jsonl.gz
+    python scripts/cie.py concierge --events events.jsonl
+    python scripts/cie.py <command> --help
+"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+
+# Subcommand → (script, summary)
+COMMANDS = {
+    'sync': ('sync-new-article.py', 'Sync new articles across pages, routes and generated files'),
+    'traffic': ('analyze-ga4-traffic.py', 'GA4 traffic sources, behaviour, top pages and geography'),
+    'bots': ('analyze-ai-bot-traffic.py', 'AI bot and structured content traffic'),
+    'concierge': ('analyze-concierge-usage.py', 'AI concierge usage, funnels and article events'),
+    'tokens': ('analyze-token-usage.py', 'Token usage and latency from saved Vercel logs'),
+    'queries': ('cluster-concierge-queries.py', 'Cluster concierge queries to find content gaps'),
+    'cache': ('simulate-query-cache.py', 'Replay concierge queries against answer cache policies'),
+    'daemon': ('analysis-daemon.py', 'Run the traffic, bot and concierge analyses on a schedule'),
+    'realtime': ('realtime-monitor.py', 'Watch AI crawler and concierge activity as it happens'),
+    'versions': ('case-study-versions.py', 'List, show, check out and commit case study revisions'),
+}
+
+
+def print_usage(file=sys.stdout):
+    print("usage: cie.py <command> [options]\n", file=file)
+    print("commands:", file=file)
+    for command, (_, summary) in COMMANDS.items():
+        print(f"  {command:<11}{summary}", file=file)
+    print("\nRun 'cie.py <command> --help' for a command's options.", file=file)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage(file=sys.stdout if argv else sys.stderr)
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        import difflib
+
+        print(f"cie.py: unknown command '{command}'", file=sys.stderr)
+        suggestions = difflib.get_close_matches(command, COMMANDS, n=1)
+        if suggestions:
+            print(f"  Did you mean '{suggestions[0]}'?", file=sys.stderr)
+        print_usage(file=sys.stderr)
+        return 2
+
+    import runpy
+
+    script = SCRIPTS_DIR / COMMANDS[command][0]
+    # The script parses sys.argv itself, as if it had been run directly
+    sys.argv = [str(script)] + args
+    runpy.run_path(str(script), run_name='__main__')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
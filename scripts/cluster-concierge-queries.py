@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Concierge Query Clustering Script
+
+Finds content gaps in AI consultant query logs at volume:
+- Streams query-log JSONL (AI_HANDLING / CONTENT_MATCH log lines or plain JSON)
+- Normalizes queries and collapses exact duplicates
+- Clusters near-duplicates with MinHash + LSH banding (roughly linear time,
+  no pairwise comparison)
+- Reports cluster sizes, representative queries and the best-matching
+  article per cluster, flagging clusters no article covers
+
+Usage:
+    python scripts/cluster-concierge-queries.py queries.jsonl [more.jsonl.gz ...]
+    vercel logs <deployment> | python scripts/cluster-concierge-queries.py -
+    python scripts/cluster-concierge-queries.py queries.jsonl --threshold 0.6 --json clusters.json
+"""
+
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from article_index import get_article_index
+from minhash import LSHIndex, MinHasher, UnionFind, estimate_jaccard
+from query_logs import normalize_query, query_shingles, read_query_records, tokenize
+
+# Clusters whose best article covers less than this share of their terms are gaps
+GAP_THRESHOLD = 0.3
+
+# Cap on LSH candidates verified per query, to bound work on huge buckets
+MAX_CANDIDATES = 50
+
+
+class ArticleMatcher:
+    """IDF-weighted term overlap between queries and article keywords."""
+
+    def __init__(self, articles: List[Dict]):
+        self.articles = {a['id']: a for a in articles}
+        self._postings: Dict[str, List[str]] = defaultdict(list)
+        for article in articles:
+            terms = set(tokenize(article['title'] + ' ' + ' '.join(article.get('keywords', []))))
+            for term in terms:
+                self._postings[term].append(article['id'])
+        total = max(len(articles), 1)
+        self._idf = {term: math.log(1 + total / len(ids)) for term, ids in self._postings.items()}
+        self._unknown_idf = math.log(1 + total)
+
+    def best_match(self, terms: Iterable[str]) -> Tuple[Optional[Dict], float]:
+        """Return (article, coverage) where coverage is the IDF share of terms matched."""
+        terms = set(terms)
+        if not terms:
+            return None, 0.0
+        total_weight = sum(self._idf.get(t, self._unknown_idf) for t in terms)
+        scores: Dict[str, float] = defaultdict(float)
+        for term in terms:
+            for article_id in self._postings.get(term, ()):
+                scores[article_id] += self._idf[term]
+        if not scores:
+            return None, 0.0
+        article_id = max(scores, key=scores.get)
+        return self.articles[article_id], scores[article_id] / total_weight
+
+
+def cluster_queries(records: Iterable[Dict], threshold: float = 0.5,
+                    hasher: Optional[MinHasher] = None) -> List[Dict]:
+    """Cluster query records; returns clusters sorted by size (largest first)."""
+    hasher = hasher or MinHasher()
+
+    # Stage 1: exact duplicates collapse to one entry per normalized query
+    counts: Counter = Counter()
+    unmatched: Counter = Counter()
+    examples: Dict[str, Counter] = {}
+    for record in records:
+        normalized = normalize_query(record['query'])
+        if not normalized:
+            continue
+        counts[normalized] += 1
+        if not record.get('matchedContent'):
+            unmatched[normalized] += 1
+        raw = examples.setdefault(normalized, Counter())
+        query = record['query'].strip()
+        # Keep a handful of raw spellings per normalized form
+        if query in raw or len(raw) < 5:
+            raw[query] += 1
+
+    # Stage 2: MinHash + LSH over distinct normalized queries
+    lsh = LSHIndex(hasher)
+    signatures: Dict[str, List[int]] = {}
+    groups = UnionFind()
+    for normalized in counts:
+        signature = hasher.signature(query_shingles(normalized))
+        signatures[normalized] = signature
+        groups.find(normalized)
+        for candidate in list(lsh.query(signature))[:MAX_CANDIDATES]:
+            if estimate_jaccard(signature, signatures[candidate]) >= threshold:
+                groups.union(normalized, candidate)
+        lsh.insert(normalized, signature)
+
+    # Stage 3: assemble clusters
+    members: Dict[str, List[str]] = defaultdict(list)
+    for normalized in counts:
+        members[groups.find(normalized)].append(normalized)
+
+    clusters = []
+    for variants in members.values():
+        variants.sort(key=lambda v: counts[v], reverse=True)
+        top = variants[0]
+        clusters.append({
+            'size': sum(counts[v] for v in variants),
+            'unmatched': sum(unmatched[v] for v in variants),
+            'distinct': len(variants),
+            'representative': examples[top].most_common(1)[0][0],
+            'variants': [(examples[v].most_common(1)[0][0], counts[v]) for v in variants[:10]],
+            'terms': Counter(t for v in variants for t in v.split()),
+        })
+    clusters.sort(key=lambda c: c['size'], reverse=True)
+    return clusters
+
+
+def attach_articles(clusters: List[Dict], matcher: ArticleMatcher):
+    """Add the best-matching article and gap flag to each cluster."""
+    for cluster in clusters:
+        top_terms = [t for t, _ in cluster['terms'].most_common(8)]
+        article, coverage = matcher.best_match(top_terms)
+        cluster['article'] = article
+        cluster['coverage'] = coverage
+        cluster['gap'] = article is None or coverage < GAP_THRESHOLD
+
+
+def print_report(clusters: List[Dict], top: int = 20):
+    total = sum(c['size'] for c in clusters)
+    print(f"\n🧩 CONCIERGE QUERY CLUSTERS")
+    print("=" * 70)
+    print(f"\n📈 OVERVIEW:")
+    print(f"  Total queries: {total}")
+    print(f"  Distinct normalized queries: {sum(c['distinct'] for c in clusters)}")
+    print(f"  Clusters: {len(clusters)}")
+
+    print(f"\n🔥 LARGEST CLUSTERS:")
+    for i, cluster in enumerate(clusters[:top], 1):
+        article = cluster['article']
+        match = f"{article['title']} ({cluster['coverage']*100:.0f}% term coverage)" if article else "No matching article"
+        marker = "❌ GAP" if cluster['gap'] else "✓"
+        print(f"\n  {i}. \"{cluster['representative']}\" - {cluster['size']} queries, {cluster['distinct']} variants")
+        print(f"     {marker} {match}")
+        for variant, count in cluster['variants'][1:4]:
+            print(f"       ~ \"{variant}\" ({count})")
+
+    gaps = [c for c in clusters if c['gap']]
+    if gaps:
+        print(f"\n❌ CONTENT GAPS ({len(gaps)} clusters, {sum(c['size'] for c in gaps)} queries):")
+        for cluster in gaps[:top]:
+            print(f"  • \"{cluster['representative']}\" - {cluster['size']} queries")
+
+
+def write_json(clusters: List[Dict], path: str):
+    report = []
+    for cluster in clusters:
+        article = cluster['article']
+        report.append({
+            'size': cluster['size'],
+            'unmatched': cluster['unmatched'],
+            'distinct': cluster['distinct'],
+            'representative': cluster['representative'],
+            'variants': [{'query': q, 'count': n} for q, n in cluster['variants']],
+            'article': {'id': article['id'], 'slug': article['slug'], 'title': article['title']} if article else None,
+            'coverage': round(cluster['coverage'], 3),
+            'gap': cluster['gap'],
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Wrote {len(report)} clusters to {path}")
+
+
+def main():
+    """Cluster concierge queries and report content gaps."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate concierge queries')
+    parser.add_argument('logs', nargs='+', help="Query log files (JSONL, .gz ok) or '-' for stdin")
+    parser.add_argument('--threshold', type=float, default=0.5, help='Minimum estimated Jaccard similarity to merge')
+    parser.add_argument('--top', type=int, default=20, help='Number of clusters to print')
+    parser.add_argument('--json', help='Write the full cluster report to this file')
+    args = parser.parse_args()
+
+    clusters = cluster_queries(read_query_records(args.logs), threshold=args.threshold)
+    if not clusters:
+        print("❌ No queries found in the given logs")
+        sys.exit(1)
+
+    attach_articles(clusters, ArticleMatcher(get_article_index().articles))
+    print_report(clusters, top=args.top)
+    if args.json:
+        write_json(clusters, args.json)
+    print("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Streaming Crawl Anomaly Detection
+
+Incremental change-point detection on daily crawl activity per traffic source.
+Each source keeps a constant amount of state (an exponentially weighted mean
+and variance), updated as each daily value arrives, so:
+- Sudden crawler surges are flagged the day they happen
+- Drop-offs (e.g. a bot that stops fetching articles) are flagged when the
+  source goes quiet, because missing days are fed in as zero activity
+- State is saved as JSON, so daily runs resume where the last run stopped
+  instead of recomputing history
+
+Used by analyze-ai-bot-traffic.py (see --crawl-state).
+"""
+
+import json
+import math
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Smoothing factor: ~2/(N+1) for an N-day window (0.1 ≈ 19 days)
+DEFAULT_ALPHA = 0.1
+# Flag days more than this many standard deviations from the running mean
+DEFAULT_THRESHOLD = 3.0
+# Days of history a source needs before it can raise alerts
+DEFAULT_MIN_PERIODS = 7
+# Floor on the standard deviation so low-volume sources don't alert on noise
+DEFAULT_MIN_STD = 1.0
+# Forget sources that have been silent for this long
+DEFAULT_RETENTION_DAYS = 90
+
+STATE_VERSION = 1
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse a GA4 `date` dimension value (YYYYMMDD)."""
+    return datetime.strptime(value, "%Y%m%d")
+
+
+def _format_date(value: datetime) -> str:
+    return value.strftime("%Y%m%d")
+
+
+class CrawlAnomalyDetector:
+    """EWMA mean/variance detector with O(1) state per source."""
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, threshold: float = DEFAULT_THRESHOLD,
+                 min_periods: int = DEFAULT_MIN_PERIODS, min_std: float = DEFAULT_MIN_STD,
+                 retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_periods = min_periods
+        self.min_std = min_std
+        self.retention_days = retention_days
+        # source -> {'mean', 'var', 'count', 'last_seen'}
+        self.sources: Dict[str, Dict] = {}
+        # Last date fully processed (YYYYMMDD); earlier dates are skipped on resume
+        self.last_date: Optional[str] = None
+
+    def update(self, source: str, date: str, value: float) -> Optional[Dict]:
+        """Feed one daily value for a source. Returns an alert dict or None."""
+        state = self.sources.get(source)
+        if state is None:
+            state = {'mean': float(value), 'var': 0.0, 'count': 1, 'last_seen': date}
+            self.sources[source] = state
+            return None
+
+        mean = state['mean']
+        std = max(math.sqrt(state['var']), self.min_std)
+        z = (value - mean) / std
+
+        alert = None
+        if state['count'] >= self.min_periods and abs(z) >= self.threshold:
+            alert = {
+                'date': date,
+                'source': source,
+                'kind': 'surge' if z > 0 else 'drop',
+                'value': value,
+                'expected': mean,
+                'z': z,
+            }
+
+        # Incremental EWMA mean/variance update
+        diff = value - mean
+        incr = self.alpha * diff
+        state['mean'] = mean + incr
+        state['var'] = (1 - self.alpha) * (state['var'] + diff * incr)
+        state['count'] += 1
+        if value > 0:
+            state['last_seen'] = date
+
+        return alert
+
+    def process_day(self, date: str, values: Dict[str, float]) -> List[Dict]:
+        """Process every source for one day.
+
+        Known sources with no row for the day are fed a zero, which is what
+        lets the detector notice a crawler going quiet.
+        """
+        if self.last_date is not None and date <= self.last_date:
+            return []
+
+        alerts = []
+        for source in sorted(set(self.sources) | set(values)):
+            alert = self.update(source, date, float(values.get(source, 0)))
+            if alert:
+                alerts.append(alert)
+
+        self.last_date = date
+        self._prune(date)
+        return alerts
+
+    def process_rows(self, rows: Iterable[Tuple[str, str, float]]) -> List[Dict]:
+        """Process (date, source, value) rows in any order.
+
+        Rows are grouped by day and replayed chronologically. Gaps between
+        days are filled so silent days still count against each source.
+        """
+        by_date: Dict[str, Dict[str, float]] = {}
+        for date, source, value in rows:
+            day = by_date.setdefault(date, {})
+            day[source] = day.get(source, 0) + value
+
+        if not by_date:
+            return []
+
+        dates = sorted(by_date)
+        start = _parse_date(dates[0])
+        if self.last_date is not None:
+            start = max(start, _parse_date(self.last_date) + timedelta(days=1))
+        end = _parse_date(dates[-1])
+
+        alerts = []
+        day = start
+        while day <= end:
+            key = _format_date(day)
+            alerts.extend(self.process_day(key, by_date.get(key, {})))
+            day += timedelta(days=1)
+        return alerts
+
+    def _prune(self, date: str):
+        """Drop sources that have been silent longer than the retention window."""
+        cutoff = _format_date(_parse_date(date) - timedelta(days=self.retention_days))
+        stale = [
+            source for source, state in self.sources.items()
+            if state['last_seen'] < cutoff
+        ]
+        for source in stale:
+            del self.sources[source]
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': STATE_VERSION,
+            'params': {
+                'alpha': self.alpha,
+                'threshold': self.threshold,
+                'min_periods': self.min_periods,
+                'min_std': self.min_std,
+                'retention_days': self.retention_days,
+            },
+            'last_date': self.last_date,
+            'sources': self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CrawlAnomalyDetector':
+        detector = cls(**data.get('params', {}))
+        detector.last_date = data.get('last_date')
+        detector.sources = data.get('sources', {})
+        return detector
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, **params) -> 'CrawlAnomalyDetector':
+        """Load saved state, or start fresh if the file doesn't exist yet."""
+        path = Path(path)
+        if not path.exists():
+            return cls(**params)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != STATE_VERSION:
+            print(f"⚠️  Ignoring crawl state with unknown version in {path}")
+            return cls(**params)
+        return cls.from_dict(data)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Machine-Readable Endpoint Bandwidth Accounting
+
+Reads request logs with response sizes and cache status and attributes
+traffic on our crawler-facing endpoints to each bot and endpoint:
+- Bytes served and estimated egress cost
+- Cache hit ratio (edge cache status)
+- Conditional request effectiveness (304 Not Modified vs full 200 responses)
+- Repeat-fetch frequency: full downloads of the same endpoint by the same
+  bot within the repeat window, i.e. re-downloads a conditional request
+  could have avoided. Unrecognised clients ("Other bot", "Browser/other")
+  are told apart by IP address, or user agent when the log has no IP
+
+Supported log formats (one request per line, optionally gzipped):
+- Vercel log drain JSON (fields under "proxy": path, userAgent, statusCode,
+  vercelCache, responseByteSize, clientIp)
+- Generic JSON lines with path/userAgent/status/bytes/cache/ip fields
+- Combined log format (nginx/Apache), optionally followed by a quoted
+  cache status field, e.g. `... "Mozilla/5.0 ..." "HIT"`
+
+Used by analyze-ai-bot-traffic.py (see --access-log).
+"""
+
+import gzip
+import json
+import re
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Endpoints published for crawlers and LLM agents
+MACHINE_ENDPOINTS = [
+    '/llms.txt',
+    '/llms-full.txt',
+    '/ai-sitemap.json',
+    '/api/ai/sitemap',
+    '/api/ai/knowledge-base',
+    '/manifest.json',
+    '/robots.txt',
+    '/sitemap.xml',
+]
+
+# Full re-downloads within this many seconds count as repeat fetches
+DEFAULT_REPEAT_WINDOW = 24 * 3600
+
+# Catch-all bot names that cover many unrelated clients
+UNIDENTIFIED_BOTS = {'Other bot', 'Browser/other'}
+
+# Vercel Fast Data Transfer list price, USD per GB
+DEFAULT_COST_PER_GB = 0.15
+
+CACHE_HIT_STATUSES = {'HIT', 'STALE', 'PRERENDER', 'REVALIDATED'}
+
+COMBINED_LOG_PATTERN = re.compile(
+    r'^(?P<ip>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>\S+) (?P<path>\S+)[^"]*" (?P<status>\d{3}) (?P<bytes>\d+|-)'
+    r'(?: "(?P<referer>[^"]*)" "(?P<agent>[^"]*)")?'
+    r'(?: "?(?P<cache>[A-Za-z_]+)"?)?'
+)
+
+GENERIC_BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|fetch', re.IGNORECASE)
+
+
+def _first(record: Dict, *keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    """Parse epoch seconds/milliseconds, ISO 8601 or CLF timestamps."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    for fmt in ("%d/%b/%Y:%H:%M:%S %z", "%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value.replace('Z', '+0000'), fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_log_line(line: str) -> Optional[Dict]:
+    """Parse one log line into {path, agent, status, bytes, cache, ip, timestamp}.
+
+    Returns None for lines that aren't request records; raises ValueError
+    for JSON records whose status or size isn't a number.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        proxy = record.get('proxy') or {}
+        merged = {**record, **proxy}
+        path = _first(merged, 'path', 'requestPath', 'url')
+        if path is None:
+            return None
+        agent = _first(merged, 'userAgent', 'user_agent', 'agent') or ''
+        if isinstance(agent, list):
+            agent = ' '.join(agent)
+        status = _first(merged, 'statusCode', 'status', 'status_code')
+        size = _first(merged, 'responseByteSize', 'bytes', 'body_bytes_sent', 'size')
+        cache = _first(merged, 'vercelCache', 'cacheStatus', 'cache')
+        try:
+            status = int(status) if status is not None else 0
+            size = int(size) if size is not None else 0
+        except (TypeError, ValueError):
+            raise ValueError(f"non-numeric status {status!r} or size {size!r}") from None
+        return {
+            'path': path,
+            'agent': agent,
+            'status': status,
+            'bytes': size,
+            'cache': str(cache).upper() if cache else None,
+            'ip': _first(merged, 'clientIp', 'ip', 'client_ip', 'remote_addr'),
+            'timestamp': _parse_timestamp(_first(merged, 'timestamp', 'time')),
+        }
+
+    match = COMBINED_LOG_PATTERN.match(line)
+    if not match:
+        return None
+    size = match.group('bytes')
+    return {
+        'path': match.group('path'),
+        'agent': match.group('agent') or '',
+        'status': int(match.group('status')),
+        'bytes': 0 if size == '-' else int(size),
+        'cache': match.group('cache').upper() if match.group('cache') else None,
+        'ip': match.group('ip'),
+        'timestamp': _parse_timestamp(match.group('time')),
+    }
+
+
+def read_log_records(paths: Iterable[str], skipped: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+    """Stream parsed records from plain or gzipped log files.
+
+    Records with a non-numeric status or size are counted in
+    skipped['invalid'] (when given) and left out.
+    """
+    for path in paths:
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    record = parse_log_line(line)
+                except ValueError:
+                    if skipped is not None:
+                        skipped['invalid'] = skipped.get('invalid', 0) + 1
+                    continue
+                if record is not None:
+                    yield record
+
+
+def normalize_endpoint(path: str) -> str:
+    """Strip query string and trailing slash from a request path."""
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return path
+
+
+class EndpointAccounting:
+    """Accumulates bytes, cache and refetch statistics per (bot, endpoint)."""
+
+    def __init__(self, classify: Callable[[str], Optional[str]],
+                 endpoints: Optional[Iterable[str]] = None,
+                 repeat_window: int = DEFAULT_REPEAT_WINDOW):
+        self.classify = classify
+        self.endpoints = set(endpoints if endpoints is not None else MACHINE_ENDPOINTS)
+        self.repeat_window = repeat_window
+        self.stats: Dict[Tuple[str, str], Dict] = {}
+        # (client, endpoint) -> timestamp of latest full (200) download
+        self._last_full_fetch: Dict[Tuple[str, str], float] = {}
+        self.skipped = 0
+
+    def bot_name(self, agent: str) -> str:
+        name = self.classify(agent)
+        if name:
+            return name
+        if GENERIC_BOT_PATTERN.search(agent):
+            return 'Other bot'
+        return 'Browser/other'
+
+    @staticmethod
+    def client_key(bot: str, record: Dict) -> str:
+        """Client a repeat fetch is counted against.
+
+        Named bots are one client each; catch-all names are split by IP
+        address, or by user agent when the log has no IP.
+        """
+        if bot not in UNIDENTIFIED_BOTS:
+            return bot
+        return f"{bot}|{record.get('ip') or record['agent']}"
+
+    def add(self, record: Dict):
+        endpoint = normalize_endpoint(record['path'])
+        if endpoint not in self.endpoints:
+            self.skipped += 1
+            return
+
+        bot = self.bot_name(record['agent'])
+        key = (bot, endpoint)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = {
+                'requests': 0,
+                'bytes': 0,
+                'cache_hits': 0,
+                'cache_known': 0,
+                'full': 0,
+                'not_modified': 0,
+                'repeat_full': 0,
+            }
+
+        stats['requests'] += 1
+        stats['bytes'] += record['bytes']
+        if record['cache']:
+            stats['cache_known'] += 1
+            if record['cache'] in CACHE_HIT_STATUSES:
+                stats['cache_hits'] += 1
+
+        status = record['status']
+        if status == 304:
+            stats['not_modified'] += 1
+        elif status == 200:
+            stats['full'] += 1
+            timestamp = record['timestamp']
+            if timestamp is not None:
+                client = (self.client_key(bot, record), endpoint)
+                last = self._last_full_fetch.get(client)
+                # Logs can arrive out of order: compare either way, but an
+                # older line never moves the latest fetch back
+                if last is not None and abs(timestamp - last) <= self.repeat_window:
+                    stats['repeat_full'] += 1
+                self._last_full_fetch[client] = timestamp if last is None else max(last, timestamp)
+
+    def add_all(self, records: Iterable[Dict]):
+        for record in records:
+            self.add(record)
+
+    def rollup(self, by: str) -> Dict[str, Dict]:
+        """Sum stats by 'bot' or 'endpoint'."""
+        index = 0 if by == 'bot' else 1
+        totals: Dict[str, Dict] = {}
+        for key, stats in self.stats.items():
+            total = totals.setdefault(key[index], dict.fromkeys(stats, 0))
+            for field, value in stats.items():
+                total[field] += value
+        return totals
+
+
+def cache_hit_ratio(stats: Dict) -> Optional[float]:
+    return stats['cache_hits'] / stats['cache_known'] if stats['cache_known'] else None
+
+
+def conditional_ratio(stats: Dict) -> Optional[float]:
+    """Share of successful fetches answered with 304 Not Modified."""
+    answered = stats['full'] + stats['not_modified']
+    return stats['not_modified'] / answered if answered else None
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Session Funnel Engine
+
+Counts ordered multi-step funnels (e.g. homepage chat → article → contact
+submit) over session-scoped event sequences:
+- Each event is encoded as a one-byte step code, so a session becomes a
+  short bytes string (consecutive repeats collapsed)
+- All sessions are joined into one buffer, separated by a marker byte
+- Each funnel prefix compiles to a single regex matched over the whole
+  buffer in C, counting sessions that reach step k in order (other steps
+  may occur in between)
+
+Sessions come from a GA4 report keyed by user and session ID custom
+dimensions, or from an exported events JSONL file.
+
+Used by analyze-concierge-usage.py.
+"""
+
+import json
+import re
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Step codes (one byte each; SEPARATOR never appears inside a session)
+HOME_VIEW = 1
+CHAT_QUERY = 2
+ARTICLE_MENTIONED = 3
+ARTICLE_CLICKED = 4
+ARTICLE_VIEW = 5
+CONTACT_OPENED = 6
+CONTACT_SUBMITTED = 7
+OTHER_VIEW = 8
+SEPARATOR = 0xFF
+
+STEP_NAMES = {
+    HOME_VIEW: 'Homepage view',
+    CHAT_QUERY: 'Chat query',
+    ARTICLE_MENTIONED: 'Article mentioned',
+    ARTICLE_CLICKED: 'Article clicked',
+    ARTICLE_VIEW: 'Article view (/insights/*)',
+    CONTACT_OPENED: 'Contact form opened',
+    CONTACT_SUBMITTED: 'Contact form submitted',
+    OTHER_VIEW: 'Other page view',
+}
+
+# Event names from src/lib/analytics.ts
+EVENT_STEPS = {
+    'chat_query': CHAT_QUERY,
+    'article_mentioned': ARTICLE_MENTIONED,
+    'article_clicked': ARTICLE_CLICKED,
+    'contact_form_opened': CONTACT_OPENED,
+    'contact_form_submitted': CONTACT_SUBMITTED,
+}
+
+FUNNELS = {
+    'Chat → Article → Contact submit': [CHAT_QUERY, ARTICLE_VIEW, CONTACT_SUBMITTED],
+    'Homepage → Chat → Contact submit': [HOME_VIEW, CHAT_QUERY, CONTACT_SUBMITTED],
+    'Chat → Article mentioned → Article clicked → Article view':
+        [CHAT_QUERY, ARTICLE_MENTIONED, ARTICLE_CLICKED, ARTICLE_VIEW],
+    'Article → Contact opened → Contact submit': [ARTICLE_VIEW, CONTACT_OPENED, CONTACT_SUBMITTED],
+}
+
+
+def encode_event(event_name: str, page_path: str, is_article: Callable[[str], bool]) -> Optional[int]:
+    """Map an event to its step code, or None for events funnels ignore."""
+    if event_name == 'page_view':
+        if page_path in ('/', ''):
+            return HOME_VIEW
+        if is_article(page_path):
+            return ARTICLE_VIEW
+        return OTHER_VIEW
+    return EVENT_STEPS.get(event_name)
+
+
+def build_sequences(events: Iterable[Tuple[str, str, str, str]],
+                    is_article: Callable[[str], bool]) -> Dict[str, bytes]:
+    """Group (session_id, sort_key, event_name, page_path) rows into step sequences."""
+    sessions: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for session_id, sort_key, event_name, page_path in events:
+        code = encode_event(event_name, page_path, is_article)
+        if code is not None:
+            sessions[session_id].append((sort_key, code))
+
+    sequences = {}
+    for session_id, steps in sessions.items():
+        # Stable sort keeps report order for events within the same time bucket
+        steps.sort(key=lambda s: s[0])
+        encoded = bytearray()
+        for _, code in steps:
+            if not encoded or encoded[-1] != code:
+                encoded.append(code)
+        sequences[session_id] = bytes(encoded)
+    return sequences
+
+
+class FunnelEngine:
+    """Counts ordered funnel progress across all sessions at once."""
+
+    def __init__(self, sequences: Iterable[bytes]):
+        parts = []
+        self.sessions = 0
+        for sequence in sequences:
+            parts.append(bytes([SEPARATOR]) + sequence)
+            self.sessions += 1
+        self._buffer = b''.join(parts)
+
+    @staticmethod
+    def _prefix_pattern(steps: List[int]) -> 're.Pattern':
+        # Each match starts at a session boundary and cannot cross into the next session
+        gap = b'[^\\xff]*?'
+        body = gap.join(re.escape(bytes([step])) for step in steps)
+        return re.compile(b'\\xff' + gap + body)
+
+    def count(self, steps: List[int]) -> int:
+        """Sessions containing the steps in order."""
+        return len(self._prefix_pattern(steps).findall(self._buffer))
+
+    def funnel(self, steps: List[int]) -> List[Tuple[int, int]]:
+        """(step, sessions reaching it) for each prefix of the funnel."""
+        return [(step, self.count(steps[:i + 1])) for i, step in enumerate(steps)]
+
+
+def read_event_file(path: str) -> Iterator[Tuple[str, str, str, str]]:
+    """Stream events from JSONL (e.g. a BigQuery export).
+
+    Accepts session_id/ga_session_id, timestamp/event_timestamp,
+    event_name and page_path/page_location fields; ga_session_id is only
+    unique per user, so user_pseudo_id/user_id is prefixed when present.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            session_id = record.get('session_id', record.get('ga_session_id'))
+            event_name = record.get('event_name')
+            if session_id in (None, '') or not event_name:
+                continue
+            user_id = record.get('user_pseudo_id', record.get('user_id'))
+            if user_id not in (None, ''):
+                session_id = f"{user_id}.{session_id}"
+            timestamp = record.get('timestamp') or record.get('event_timestamp') or ''
+            page = record.get('page_path') or record.get('page_location') or ''
+            if '://' in page:
+                page = urlsplit(page).path or '/'
+            # Zero-pad so numeric (microsecond) timestamps sort as strings
+            yield str(session_id), str(timestamp).zfill(20), event_name, page
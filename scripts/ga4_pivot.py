@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+GA4 Pivot Reports → Dense Matrices
+
+Fetches two- or three-way breakdowns (e.g. pagePath × eventName ×
+sessionSource) in a single RunPivotReport call instead of a flat report
+per combination, and decodes the response straight into dense matrices:
+- Row and column labels come from the pivot headers, so every matrix has
+  a fixed shape and a zero for combinations with no data
+- An optional third "slice" dimension yields one matrix per slice value
+- Values live in a flat row-major array('d'); rows can be regrouped
+  (e.g. several paths → one article) without re-fetching
+
+Each pivot keeps its top-N values by the metric; the product of the
+limits must stay within GA4's 100,000 row cap. fetch_pivot pages through
+the row pivot with its offset, so every row value is fetched however
+many there are; columns and slices stay top-N.
+
+Used by analyze-concierge-usage.py.
+"""
+
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from profiling import traced
+
+# All slices combined
+TOTAL = 'All'
+
+MAX_PIVOT_ROWS = 100000
+
+
+class PivotMatrix:
+    """Dense rows × columns matrix of one metric with labelled axes."""
+
+    def __init__(self, row_labels: List[str], column_labels: List[str], values: Optional[array] = None):
+        self.row_labels = list(row_labels)
+        self.column_labels = list(column_labels)
+        self._row_index = {label: i for i, label in enumerate(self.row_labels)}
+        self._column_index = {label: i for i, label in enumerate(self.column_labels)}
+        size = len(self.row_labels) * len(self.column_labels)
+        self.values = values if values is not None else array('d', bytes(8 * size))
+
+    @property
+    def shape(self):
+        return len(self.row_labels), len(self.column_labels)
+
+    def _offset(self, row: str, column: str) -> Optional[int]:
+        r = self._row_index.get(row)
+        c = self._column_index.get(column)
+        if r is None or c is None:
+            return None
+        return r * len(self.column_labels) + c
+
+    def get(self, row: str, column: str) -> float:
+        offset = self._offset(row, column)
+        return self.values[offset] if offset is not None else 0.0
+
+    def add(self, row: str, column: str, value: float):
+        offset = self._offset(row, column)
+        if offset is not None:
+            self.values[offset] += value
+
+    def row(self, label: str) -> List[float]:
+        r = self._row_index.get(label)
+        if r is None:
+            return [0.0] * len(self.column_labels)
+        width = len(self.column_labels)
+        return self.values[r * width:(r + 1) * width].tolist()
+
+    def row_totals(self) -> Dict[str, float]:
+        width = len(self.column_labels)
+        return {label: sum(self.values[r * width:(r + 1) * width])
+                for r, label in enumerate(self.row_labels)}
+
+    def column_totals(self) -> Dict[str, float]:
+        width = len(self.column_labels)
+        return {label: sum(self.values[c::width]) for c, label in enumerate(self.column_labels)}
+
+    def group_rows(self, key: Callable[[str], Optional[str]]) -> 'PivotMatrix':
+        """Sum rows sharing key(label); rows whose key is None are dropped."""
+        mapping = [key(label) for label in self.row_labels]
+        labels = list(dict.fromkeys(k for k in mapping if k is not None))
+        grouped = PivotMatrix(labels, self.column_labels)
+        width = len(self.column_labels)
+        for r, target in enumerate(mapping):
+            if target is None:
+                continue
+            base = grouped._row_index[target] * width
+            for c in range(width):
+                grouped.values[base + c] += self.values[r * width + c]
+        return grouped
+
+
+def _pivot(field: str, metric: str, limit: int, offset: int = 0) -> 'Pivot':
+    from google.analytics.data_v1beta.types import OrderBy, Pivot
+
+    return Pivot(
+        field_names=[field],
+        offset=offset,
+        limit=limit,
+        order_bys=[OrderBy(metric=OrderBy.MetricOrderBy(metric_name=metric), desc=True)],
+    )
+
+
+def build_pivot_request(property_id: str, days: int, rows: str, columns: str, metric: str,
+                        slices: Optional[str] = None, row_limit: int = 250,
+                        column_limit: int = 40, slice_limit: int = 10,
+                        dimension_filter=None, row_offset: int = 0) -> 'RunPivotReportRequest':
+    """One pivot report of metric by rows × columns (× slices), from row_offset."""
+    from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunPivotReportRequest
+
+    fields = [rows, columns] + ([slices] if slices else [])
+    limits = [row_limit, column_limit] + ([slice_limit] if slices else [])
+    product = 1
+    for limit in limits:
+        product *= limit
+    if product > MAX_PIVOT_ROWS:
+        raise ValueError(f"Pivot limits {limits} exceed GA4's {MAX_PIVOT_ROWS} row cap")
+
+    request = RunPivotReportRequest(
+        property=f"properties/{property_id}",
+        date_ranges=[DateRange(
+            start_date=f"{days}daysAgo",
+            end_date="today"
+        )],
+        dimensions=[Dimension(name=field) for field in fields],
+        metrics=[Metric(name=metric)],
+        pivots=[_pivot(field, metric, limit, row_offset if i == 0 else 0)
+                for i, (field, limit) in enumerate(zip(fields, limits))],
+    )
+    if dimension_filter is not None:
+        request.dimension_filter = dimension_filter
+    return request
+
+
+def _header_labels(header) -> List[str]:
+    return [h.dimension_values[0].value for h in header.pivot_dimension_headers]
+
+
+@traced
+def decode_pivot(response, sliced: bool = False) -> Dict[str, PivotMatrix]:
+    """Decode a pivot response into {slice: matrix}, plus TOTAL across slices.
+
+    Without slices the result holds just TOTAL. With slices, TOTAL only
+    sums the top slice_limit slices the response holds, so true totals
+    need an unsliced request. A response without pivot headers (no data)
+    decodes to an empty TOTAL.
+    """
+    headers = list(response.pivot_headers)
+    if len(headers) < (3 if sliced else 2):
+        return {TOTAL: PivotMatrix([], [])}
+    row_labels = _header_labels(headers[0])
+    column_labels = _header_labels(headers[1])
+    slice_labels = _header_labels(headers[2]) if sliced else []
+
+    total = PivotMatrix(row_labels, column_labels)
+    matrices = {label: PivotMatrix(row_labels, column_labels) for label in slice_labels}
+
+    for row in response.rows:
+        dims = row.dimension_values
+        value = float(row.metric_values[0].value or 0)
+        total.add(dims[0].value, dims[1].value, value)
+        if sliced:
+            matrix = matrices.get(dims[2].value)
+            if matrix is not None:
+                matrix.add(dims[0].value, dims[1].value, value)
+
+    matrices[TOTAL] = total
+    return matrices
+
+
+def merge_pivots(pages: List[Dict[str, PivotMatrix]]) -> Dict[str, PivotMatrix]:
+    """Combine decoded pages into one {slice: matrix}, over the union of their labels."""
+    if len(pages) == 1:
+        return pages[0]
+    merged = {}
+    for name in dict.fromkeys(name for page in pages for name in page):
+        parts = [page[name] for page in pages if name in page]
+        matrix = PivotMatrix(dict.fromkeys(label for part in parts for label in part.row_labels),
+                             dict.fromkeys(label for part in parts for label in part.column_labels))
+        for part in parts:
+            for row in part.row_labels:
+                for column, value in zip(part.column_labels, part.row(row)):
+                    if value:
+                        matrix.add(row, column, value)
+        merged[name] = matrix
+    return merged
+
+
+def fetch_pivot(client, property_id: str, days: int, rows: str, columns: str, metric: str,
+                slices: Optional[str] = None, **limits) -> Dict[str, PivotMatrix]:
+    """Run a pivot report and decode it, paging through all row values.
+
+    See build_pivot_request for limits; row_limit is the page size.
+    """
+    pages = []
+    offset = 0
+    while True:
+        request = build_pivot_request(property_id, days, rows, columns, metric, slices=slices,
+                                      row_offset=offset, **limits)
+        response = client.run_pivot_report(request)
+        pages.append(decode_pivot(response, sliced=slices is not None))
+
+        if not response.pivot_headers:
+            break
+        header = response.pivot_headers[0]
+        offset += len(header.pivot_dimension_headers)
+        if not header.pivot_dimension_headers or offset >= header.row_count:
+            break
+    return merge_pivots(pages)
+
+
+def top_labels(totals: Dict[str, float], n: int) -> List[str]:
+    return [label for label, value in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:n] if value]
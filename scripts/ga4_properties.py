@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+GA4 Property Portfolio
+
+Runs an analysis script's reports for several GA4 properties at once
+(enabled with --properties <config.json>):
+- Every (property, analysis) pair is a task on a thread pool, so a
+  portfolio takes about as long as the slowest single analysis rather
+  than N properties × M analyses in turn
+- Requests go through a shared pool of GA4 clients, each with its own
+  gRPC channel and serving one request at a time (pool_size in all)
+- Each property has at most max_concurrent requests in flight; GA4
+  allows 10 concurrent requests per standard property, and other
+  consumers (the daemon, dashboards) share that quota
+- Each task's output is captured and printed grouped by property, in
+  config order, as soon as that property's tasks finish
+- Each task's metrics are collected separately and rolled up per
+  property and across the portfolio
+
+Config format (property keys other than id are optional; scripts read
+extra keys they understand, e.g. crawl_state, sketch_dir,
+search_console_db, session_dimension, user_dimension):
+
+    {
+      "pool_size": 4,
+      "max_concurrent": 4,
+      "properties": [
+        {"id": "506980538", "name": "Context is Everything"},
+        {"id": "123456789", "name": "Other site", "max_concurrent": 2}
+      ]
+    }
+
+Used by the analyze-*.py scripts.
+"""
+
+import io
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import metrics_export
+from profiling import span
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_CONCURRENT = 4
+GA4_CONCURRENT_LIMIT = 10  # concurrent requests per standard GA4 property
+
+GA4_METHODS = ('run_report', 'run_pivot_report', 'run_realtime_report', 'batch_run_reports')
+
+
+def load_properties(path: str) -> Tuple[List[Dict], int]:
+    """(properties, pool size) from a portfolio config; raises ValueError if it is invalid."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"could not read {path}: {e}")
+
+    if isinstance(config, list):
+        config = {'properties': config}
+    entries = config.get('properties') if isinstance(config, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} lists no properties")
+
+    default_limit = config.get('max_concurrent', DEFAULT_MAX_CONCURRENT)
+    properties = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            entry = {'id': entry}
+        property_id = str(entry.get('id', '')).removeprefix('properties/')
+        if not property_id.isdigit():
+            raise ValueError(f"{path}: property id {entry.get('id')!r} is not numeric")
+        limit = int(entry.get('max_concurrent', default_limit))
+        if not 1 <= limit <= GA4_CONCURRENT_LIMIT:
+            raise ValueError(f"{path}: max_concurrent for {property_id} must be 1-{GA4_CONCURRENT_LIMIT}")
+        properties.append({**entry, 'id': property_id, 'name': entry.get('name') or property_id,
+                           'max_concurrent': limit})
+
+    names = [prop['name'] for prop in properties]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: duplicate property names {', '.join(duplicates)}")
+
+    return properties, max(1, int(config.get('pool_size', DEFAULT_POOL_SIZE)))
+
+
+class ClientPool:
+    """GA4 clients shared by every property, created on first use; each serves one request at a time."""
+
+    def __init__(self, factory: Callable, size: int):
+        self._factory = factory
+        self._size = size
+        self.created = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self):
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self.created < self._size
+                if create:
+                    self.created += 1
+            if not create:
+                client = self._idle.get()
+            else:
+                try:
+                    client = self._factory()
+                except BaseException:
+                    with self._lock:
+                        self.created -= 1
+                    raise
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+
+class PropertyClient:
+    """GA4 client proxy for one property: requests are limited per property and served by the pool."""
+
+    def __init__(self, pool: ClientPool, max_concurrent: int):
+        self._pool = pool
+        self._limit = threading.BoundedSemaphore(max_concurrent)
+
+    def __getattr__(self, name):
+        if name not in GA4_METHODS:
+            with self._pool.client() as client:
+                return getattr(client, name)
+
+        def call(*args, **kwargs):
+            with self._limit, self._pool.client() as client:
+                return getattr(client, name)(*args, **kwargs)
+        return call
+
+
+class _ThreadOutput:
+    """sys.stdout stand-in sending each thread's writes to its own buffer, if it has one."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        buffer = self._local.buffer = io.StringIO()
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+    def _target(self):
+        buffer = getattr(self._local, 'buffer', None)
+        return buffer if buffer is not None else self._stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _run_task(prop: Dict, step: Callable, client, output: _ThreadOutput, script: str) -> Dict:
+    started = time.perf_counter()
+    error = None
+    with output.capture() as buffer:
+        try:
+            with metrics_export.collecting(None, script) as collected, span(prop['name'], 'property'):
+                step(client)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"\n❌ Error: {e}")
+            traceback.print_exc(file=buffer)
+    return {
+        'output': buffer.getvalue(),
+        'metrics': collected,
+        'error': error,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_portfolio(properties: List[Dict], steps_for: Callable[[Dict], List[Callable]],
+                  client_factory: Callable, pool_size: int = DEFAULT_POOL_SIZE,
+                  script: str = None, shard: str = None) -> Dict[str, Dict]:
+    """Run steps_for(property) for every property concurrently and print each property's output.
+
+    Each step is called as step(client), with a client bound to its
+    property's request limit; steps_for binds the property ID. With
+    shard ('week' or 'month'), long date ranges are sharded and each
+    shard request counts towards the limit. Returns per-property results:
+    name, merged metrics, errors, and the summed task time.
+    """
+    script = script or Path(sys.argv[0]).stem
+    # Metered here so each task's requests count towards that task's metrics
+    pool = ClientPool(lambda: metrics_export.MeteredClient(client_factory()), pool_size)
+    clients = {prop['id']: PropertyClient(pool, prop['max_concurrent']) for prop in properties}
+    if shard:
+        from ga4_shards import sharded_client
+
+        clients = {property_id: sharded_client(client, shard) for property_id, client in clients.items()}
+    tasks = [(prop, step) for prop in properties for step in steps_for(prop)]
+    workers = min(len(tasks), sum(prop['max_concurrent'] for prop in properties)) or 1
+
+    output = _ThreadOutput(sys.stdout)
+    stdout = sys.stdout
+    sys.stdout = output
+    results = {}
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ga4') as executor:
+            futures = [(prop, executor.submit(_run_task, prop, step, clients[prop['id']], output, script))
+                       for prop, step in tasks]
+            for prop in properties:
+                totals = metrics_export.MetricsFile(None, script)
+                result = results[prop['id']] = {'name': prop['name'], 'metrics': totals,
+                                                'errors': [], 'seconds': 0.0}
+                print(f"\n{'#' * 70}\n#  {prop['name']} (property {prop['id']})\n{'#' * 70}", file=stdout)
+                for task_prop, future in futures:
+                    if task_prop is not prop:
+                        continue
+                    task = future.result()
+                    stdout.write(task['output'])
+                    totals.merge(task['metrics'])
+                    result['seconds'] += task['seconds']
+                    if task['error']:
+                        result['errors'].append(task['error'])
+    finally:
+        sys.stdout = stdout
+
+    wall = time.perf_counter() - started
+    sequential = sum(result['seconds'] for result in results.values())
+    print(f"\n⏱️  {len(tasks)} analyses across {len(properties)} properties in {wall:.1f}s "
+          f"({sequential:.1f}s if run one at a time), {pool.created} GA4 clients")
+
+    # Per-property samples carry a property label in the process-wide metrics file
+    for result in results.values():
+        metrics_export.merge_run(result['metrics'], property=result['name'])
+    return results
+
+
+def rollup(results: Dict[str, Dict]) -> Dict[Tuple, Dict[str, float]]:
+    """{(metric, labels...): {property name: value}} with page paths summed away."""
+    table: Dict[Tuple, Dict[str, float]] = {}
+    for result in results.values():
+        for sample in result['metrics'].sample_list():
+            labels = tuple((key, value) for key, value in sample['labels'].items() if key != 'path')
+            row = table.setdefault((sample['metric'],) + labels, {})
+            row[result['name']] = row.get(result['name'], 0) + sample['value']
+    return table
+
+
+def print_rollup(results: Dict[str, Dict]):
+    """Per-property and combined totals of the aggregates each property's run recorded."""
+    names = [result['name'] for result in results.values()]
+    width = max([10] + [len(name[:16]) + 2 for name in names])
+
+    # Labelled samples are listed under their metric, in the order the
+    # analyses recorded them (e.g. funnel steps in funnel order)
+    by_metric: Dict[str, List[Tuple[Tuple, Dict[str, float]]]] = {}
+    for key, values in rollup(results).items():
+        by_metric.setdefault(key[0], []).append((key[1:], values))
+    rows = []
+    for metric, samples in by_metric.items():
+        if len(samples) == 1 and not samples[0][0]:
+            rows.append((metric, samples[0][1]))
+            continue
+        rows.append((metric, None))
+        rows.extend(('  ' + ' / '.join(value for _, value in labels), values) for labels, values in samples)
+    rows.append(('GA4 requests', {r['name']: r['metrics'].ga4_requests for r in results.values()}))
+    rows.append(('GA4 rows fetched', {r['name']: r['metrics'].rows_fetched for r in results.values()}))
+    label_width = max(len(label) for label, _ in rows) + 2
+
+    print("\n" + "=" * 70)
+    print(f"  📊 PORTFOLIO ROLLUP ({len(names)} properties)")
+    print("=" * 70)
+    header = ''.join(f"{name[:16]:>{width}}" for name in names)
+    print(f"  {'Metric':<{label_width}}{header}{'All':>{width}}")
+    for label, values in rows:
+        if values is None:
+            print(f"  {label}")
+            continue
+        cells = ''.join(f"{values.get(name, 0):>{width},.0f}" for name in names)
+        print(f"  {label:<{label_width}}{cells}{sum(values.values()):>{width},.0f}")
+
+    failed = [(result['name'], error) for result in results.values() for error in result['errors']]
+    if failed:
+        print(f"\n❌ {len(failed)} analyses failed:")
+        for name, error in failed:
+            print(f"  • {name}: {error}")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compact GA4 Report Rows
+
+Typed rows for the report shapes the analyses keep in lists, instead of a
+dict of strings per row:
+- Each shape is a ReportRow subclass with __slots__, so a row carries no
+  per-instance dict, only its field values
+- Dimension values (sources, media, browsers, paths, event names) repeat
+  across rows, so they are interned: rows share one string per distinct
+  value instead of holding a fresh copy decoded from each response row
+- Metric values are converted once, with the type each field declares
+
+Fields are read as attributes (row.sessions). scripts/bench-rows.py
+measures the memory saved against dict rows at 100k and 1M rows.
+
+Used by the analyze-*.py scripts.
+"""
+
+import sys
+from typing import Callable, Dict, Tuple
+
+intern = sys.intern
+
+
+class ReportRow:
+    """One row of a report shape: DIMENSIONS then METRICS, in request order."""
+
+    __slots__ = ()
+    DIMENSIONS: Tuple[str, ...] = ()
+    METRICS: Tuple[Tuple[str, Callable], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Slot descriptors' setters, looked up once rather than by name per field per row
+        cls._dimension_setters = tuple(getattr(cls, name).__set__ for name in cls.DIMENSIONS)
+        cls._metric_setters = tuple((getattr(cls, name).__set__, convert) for name, convert in cls.METRICS)
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row) -> 'ReportRow':
+        """Convert a GA4 response row, interning its dimension values."""
+        entry = cls.__new__(cls)
+        for set_field, value in zip(cls._dimension_setters, row.dimension_values):
+            set_field(entry, intern(value.value))
+        for (set_field, convert), value in zip(cls._metric_setters, row.metric_values):
+            set_field(entry, convert(value.value))
+        return entry
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _fields(dimensions: Tuple[str, ...], metrics: Tuple[Tuple[str, Callable], ...]) -> Tuple[str, ...]:
+    return dimensions + tuple(name for name, _ in metrics)
+
+
+class TrafficSourceRow(ReportRow):
+    """sessionSource × sessionMedium × sessionCampaignName."""
+    DIMENSIONS = ('source', 'medium', 'campaign')
+    METRICS = (('sessions', int), ('users', int), ('pageviews', int),
+               ('avg_duration', float), ('bounce_rate', float))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+
+class TechnologyRow(ReportRow):
+    """operatingSystem × browser × deviceCategory."""
+    DIMENSIONS = ('os', 'browser', 'device')
+    METRICS = (('sessions', int), ('pageviews', int), ('duration', float))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+
+class PathRow(ReportRow):
+    """pagePath with views and users."""
+    DIMENSIONS = ('path',)
+    METRICS = (('views', int), ('users', int))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+
+class DailySourceRow(ReportRow):
+    """date × sessionSource."""
+    DIMENSIONS = ('date', 'source')
+    METRICS = (('sessions', int), ('pageviews', int), ('duration', float))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+    @property
+    def pages_per_session(self) -> float:
+        return self.pageviews / self.sessions if self.sessions else 0.0
+
+
+class SearchQueryRow(ReportRow):
+    """sessionGoogleAdsQuery × sessionSource."""
+    DIMENSIONS = ('query', 'source')
+    METRICS = (('sessions', int), ('users', int))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+
+class EventRow(ReportRow):
+    """eventName with event count and users."""
+    DIMENSIONS = ('name',)
+    METRICS = (('count', int), ('users', int))
+    __slots__ = _fields(DIMENSIONS, METRICS)
+
+
+class LandingPageRow(ReportRow):
+    """landingPage (filtered to one source and medium)."""
+    DIMENSIONS = ('path',)
+    METRICS = (('sessions', int), ('engaged_sessions', int))
+    __slots__ = _fields(DIMENSIONS, METRICS)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Date-Sharded GA4 Reports
+
+Splits a long report (e.g. 365 days of pagePath × source) into weekly or
+monthly sub-requests fetched in parallel (enabled with --shard week|month),
+then merges them into one result that reads like a single response:
+- Each shard is smaller, so it stays under row limits and sampling
+  thresholds and comes back faster; shards are paged to completion
+- Rows with the same dimension values are merged across shards: additive
+  metrics (sessions, views, event counts) are summed
+- Ratio metrics (averageSessionDuration, bounceRate, engagementRate, ...)
+  are not additive: they are recomputed as averages weighted by their
+  base metric, which is fetched alongside if the request lacks it
+- Unique-user counts (activeUsers, totalUsers) cannot be merged exactly;
+  the sum is an upper bound and is flagged on the result and in the output
+- order_bys and limit are applied to the merged rows, so a top-10 over the
+  whole range is the real top 10
+
+Relative dates (30daysAgo, yesterday, today) are resolved in local time.
+Requests that page (an offset, or a limit without order_bys), compare
+several date ranges, or fit in one shard go through unchanged, as do
+pivot and realtime reports.
+
+Used by the analyze-*.py scripts.
+"""
+
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import metrics_export
+from profiling import span
+
+SHARD_SIZES = ('week', 'month')
+DEFAULT_SHARD_WORKERS = 4
+SHARD_PAGE_SIZE = 100_000
+
+# Ratio metric → the metric it is an average over
+WEIGHTED_METRICS = {
+    'averageSessionDuration': 'sessions',
+    'bounceRate': 'sessions',
+    'engagementRate': 'sessions',
+    'screenPageViewsPerSession': 'sessions',
+    'eventsPerSession': 'sessions',
+    'sessionsPerUser': 'activeUsers',
+    'screenPageViewsPerUser': 'activeUsers',
+    'eventCountPerUser': 'activeUsers',
+    'userEngagementDurationPerUser': 'activeUsers',
+}
+
+# Distinct-user counts: a user active in several shards is counted in each
+UNIQUE_METRICS = {'activeUsers', 'totalUsers', 'active1DayUsers', 'active7DayUsers', 'active28DayUsers'}
+
+RATIO_NAME_PATTERN = re.compile(r'^average|Rate$|Per[A-Z]')
+
+REQUEST_FIELDS = ('property', 'dimensions', 'dimension_filter', 'metric_filter', 'currency_code', 'keep_empty_rows')
+
+RELATIVE_DATE_PATTERN = re.compile(r'^(\d+)daysAgo$')
+
+
+def resolve_date(value: str, today: Optional[date] = None) -> date:
+    """A GA4 date string (YYYY-MM-DD, NdaysAgo, yesterday, today) as a date."""
+    today = today or date.today()
+    if value == 'today':
+        return today
+    if value == 'yesterday':
+        return today - timedelta(days=1)
+    match = RELATIVE_DATE_PATTERN.match(value)
+    if match:
+        return today - timedelta(days=int(match.group(1)))
+    return date.fromisoformat(value)
+
+
+def split_range(start: date, end: date, size: str) -> List[Tuple[date, date]]:
+    """Inclusive (start, end) shards on calendar week (Mon-Sun) or month boundaries."""
+    shards = []
+    current = start
+    while current <= end:
+        if size == 'week':
+            boundary = current + timedelta(days=6 - current.weekday())
+        else:
+            next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+            boundary = next_month - timedelta(days=1)
+        shard_end = min(boundary, end)
+        shards.append((current, shard_end))
+        current = shard_end + timedelta(days=1)
+    return shards
+
+
+def metric_kind(name: str) -> str:
+    """'weighted', 'unique', 'ratio' (non-additive with no known base) or 'additive'."""
+    if name in WEIGHTED_METRICS:
+        return 'weighted'
+    if name in UNIQUE_METRICS:
+        return 'unique'
+    if RATIO_NAME_PATTERN.search(name):
+        return 'ratio'
+    return 'additive'
+
+
+def _is_set(request, field: str) -> bool:
+    """Whether a request field was given (an empty filter message must not be sent)."""
+    try:
+        return field in request
+    except TypeError:
+        return getattr(request, field, None) is not None
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self, value: str):
+        self.value = value
+
+
+class _Row:
+    __slots__ = ('dimension_values', 'metric_values')
+
+    def __init__(self, dimensions, metrics):
+        self.dimension_values = [_Value(value) for value in dimensions]
+        self.metric_values = [_Value(value) for value in metrics]
+
+
+class ShardedReport:
+    """Merged rows of a sharded report, read like a RunReportResponse (rows, row_count)."""
+
+    def __init__(self, rows: List[_Row], row_count: int, shards: List[Tuple[date, date]],
+                 non_additive: Dict[str, str], dimension_headers=None, metric_headers=None):
+        self.rows = rows
+        self.row_count = row_count  # merged rows before limit, as GA4 reports it
+        self.shards = shards
+        self.non_additive = non_additive
+        self.dimension_headers = dimension_headers
+        self.metric_headers = metric_headers
+
+
+def _format_metric(value: float, kind: str) -> str:
+    if kind in ('additive', 'unique') and float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _order_value(order_by, dimension_names: List[str], metric_names: List[str]):
+    """(kind, index, descending) for a GA4 OrderBy (message or dict form), or None."""
+    def field(obj, name):
+        return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+    descending = bool(field(order_by, 'desc'))
+    metric = field(order_by, 'metric')
+    metric_name = field(metric, 'metric_name') if metric else None
+    if metric_name in metric_names:
+        return 'metric', metric_names.index(metric_name), descending
+    dimension = field(order_by, 'dimension')
+    dimension_name = field(dimension, 'dimension_name') if dimension else None
+    if dimension_name in dimension_names:
+        return 'dimension', dimension_names.index(dimension_name), descending
+    return None
+
+
+def merge_reports(responses, dimension_names: List[str], metric_names: List[str],
+                  hidden: List[str] = ()) -> Tuple[List[Tuple[Tuple[str, ...], List[float]]], Dict[str, str]]:
+    """Merge shard rows by dimension values: ([(dimensions, metric values)], non-additive flags).
+
+    metric_names includes any weight metrics added for the merge; those
+    listed in hidden are dropped from the result.
+    """
+    kinds = [metric_kind(name) for name in metric_names]
+    weights = []
+    for name, kind in zip(metric_names, kinds):
+        base = WEIGHTED_METRICS.get(name, 'sessions' if kind == 'ratio' else None)
+        weights.append(metric_names.index(base) if base in metric_names else None)
+
+    totals: Dict[Tuple[str, ...], List[float]] = {}
+    weighted: Dict[Tuple[str, ...], List[float]] = {}
+    for response in responses:
+        for row in response.rows:
+            key = tuple(sys.intern(value.value) for value in row.dimension_values)
+            values = [float(value.value or 0) for value in row.metric_values]
+            sums = totals.setdefault(key, [0.0] * len(metric_names))
+            products = weighted.setdefault(key, [0.0] * len(metric_names))
+            for i, value in enumerate(values):
+                if weights[i] is not None and kinds[i] in ('weighted', 'ratio'):
+                    products[i] += value * values[weights[i]]
+                else:
+                    sums[i] += value
+
+    flags = {}
+    for i, (name, kind) in enumerate(zip(metric_names, kinds)):
+        if name in hidden:
+            continue
+        base = metric_names[weights[i]] if weights[i] is not None else None
+        if kind in ('weighted', 'ratio') and base in UNIQUE_METRICS:
+            flags[name] = f"approximate: a {base}-weighted average across shards, and {base} spans shards"
+        elif kind in ('weighted', 'ratio') and base:
+            flags[name] = f"recomputed as a {base}-weighted average across shards"
+        elif kind in ('weighted', 'ratio'):
+            flags[name] = "non-additive with no base metric; summed across shards (not meaningful)"
+        elif kind == 'unique':
+            flags[name] = "distinct users summed across shards; an upper bound"
+
+    keep = [i for i, name in enumerate(metric_names) if name not in hidden]
+    merged = []
+    for key, sums in totals.items():
+        products = weighted[key]
+        values = []
+        for i in keep:
+            if weights[i] is not None and kinds[i] in ('weighted', 'ratio'):
+                base = sums[weights[i]]
+                values.append(products[i] / base if base else 0.0)
+            else:
+                values.append(sums[i])
+        merged.append((key, values))
+    return merged, flags
+
+
+class ShardedClient:
+    """GA4 client proxy fetching long run_report date ranges as parallel per-week or per-month shards."""
+
+    def __init__(self, client, size: str = 'month', workers: int = DEFAULT_SHARD_WORKERS):
+        if size not in SHARD_SIZES:
+            raise ValueError(f"shard size must be one of {', '.join(SHARD_SIZES)}")
+        self._client = client
+        self._size = size
+        self._workers = workers
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name != 'run_report' or not callable(attribute):
+            return attribute
+        return self.run_report
+
+    def _shards_for(self, request) -> Optional[List[Tuple[date, date]]]:
+        date_ranges = list(getattr(request, 'date_ranges', None) or [])
+        if len(date_ranges) != 1 or getattr(request, 'offset', 0):
+            return None
+        if getattr(request, 'limit', 0) and not getattr(request, 'order_bys', None):
+            return None  # a page of a paged report; later pages couldn't follow a merged first page
+        try:
+            start = resolve_date(date_ranges[0].start_date)
+            end = resolve_date(date_ranges[0].end_date)
+        except ValueError:
+            return None
+        shards = split_range(start, end, self._size)
+        return shards if len(shards) > 1 else None
+
+    def _sub_request(self, request, metrics, start: date, end: date, offset: int):
+        range_type = type(request.date_ranges[0])
+        fields = {field: getattr(request, field) for field in REQUEST_FIELDS if _is_set(request, field)}
+        return type(request)(
+            **fields,
+            metrics=metrics,
+            date_ranges=[range_type(start_date=start.isoformat(), end_date=end.isoformat())],
+            limit=SHARD_PAGE_SIZE,
+            offset=offset,
+        )
+
+    def _fetch_shard(self, request, metrics, start: date, end: date) -> List:
+        """Every page of one shard."""
+        pages = []
+        offset = 0
+        while True:
+            response = self._client.run_report(self._sub_request(request, metrics, start, end, offset))
+            pages.append(response)
+            offset += len(response.rows)
+            if not response.rows or offset >= response.row_count:
+                return pages
+
+    def run_report(self, request=None, *args, **kwargs):
+        shards = self._shards_for(request) if request is not None and not args and not kwargs else None
+        if shards is None:
+            return self._client.run_report(request, *args, **kwargs)
+
+        dimension_names = [dimension.name for dimension in request.dimensions]
+        metric_names = [metric.name for metric in request.metrics]
+        # Ratio metrics are averaged over their base metric, so fetch it if it wasn't asked for
+        hidden = []
+        for name in metric_names:
+            base = WEIGHTED_METRICS.get(name, 'sessions' if metric_kind(name) == 'ratio' else None)
+            if base and base not in metric_names and base not in hidden:
+                hidden.append(base)
+        metric_type = type(request.metrics[0])
+        metrics = list(request.metrics) + [metric_type(name=name) for name in hidden]
+
+        with span('sharded_report', 'phase', shards=len(shards), shard_size=self._size) as details:
+            fetch = metrics_export.propagate(self._fetch_shard)
+            with ThreadPoolExecutor(max_workers=min(self._workers, len(shards)),
+                                    thread_name_prefix='ga4-shard') as executor:
+                futures = [executor.submit(fetch, request, metrics, start, end) for start, end in shards]
+                responses = [page for future in futures for page in future.result()]
+
+            merged, flags = merge_reports(responses, dimension_names, metric_names + hidden, hidden=hidden)
+            kinds = [metric_kind(name) for name in metric_names]
+            row_count = len(merged)
+            merged = self._order(request, merged, dimension_names, metric_names)
+            rows = [_Row(key, [_format_metric(value, kind) for value, kind in zip(values, kinds)])
+                    for key, values in merged]
+            details['rows'] = len(rows)
+
+        self._warn(flags, len(shards))
+        first = responses[0] if responses else None
+        return ShardedReport(rows, row_count, shards, flags,
+                             dimension_headers=getattr(first, 'dimension_headers', None),
+                             metric_headers=getattr(first, 'metric_headers', None))
+
+    @staticmethod
+    def _order(request, merged, dimension_names, metric_names):
+        for order_by in reversed(list(getattr(request, 'order_bys', None) or [])):
+            order = _order_value(order_by, dimension_names, metric_names)
+            if order is None:
+                continue
+            kind, index, descending = order
+            position = 0 if kind == 'dimension' else 1
+            merged.sort(key=lambda item: item[position][index], reverse=descending)
+        limit = getattr(request, 'limit', 0) or 0
+        return merged[:limit] if limit else merged
+
+    def _warn(self, flags: Dict[str, str], shards: int):
+        with self._lock:
+            new = [name for name, note in flags.items()
+                   if not note.startswith('recomputed') and name not in self._warned]
+            self._warned.update(new)
+        for name in new:
+            print(f"  ⚠️  {name}: {flags[name]} ({shards} {self._size}ly shards)")
+
+
+def sharded_client(client, size: Optional[str]):
+    """client wrapped to shard long date ranges by size ('week' or 'month'), or unchanged if size is None."""
+    if not size or isinstance(client, ShardedClient):
+        return client
+    return ShardedClient(client, size)
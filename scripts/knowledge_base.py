@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Knowledge Base Compiler
+
+Builds the complete /api/ai/knowledge-base payload in one pass from:
+- thought_leadership/content/knowledge-base-profile.json: hand-maintained
+  sections (meta, team, philosophy, services, contact, curated FAQs and
+  per-article key insights)
+- thought_leadership/articles/article-*.json: one thought leadership entry
+  per article
+- Case_studies/version-store.json: one entry per case study (latest
+  revision)
+- thought_leadership/content/{faq,methodology,service-description}.json:
+  concierge Q&A, methodology and service details
+
+The result is written to thought_leadership/knowledge-base.json with a
+SHA-256 content hash in meta.content_hash. The route imports that file and
+serves the prebuilt body with the hash as its ETag. The artifact is only
+rewritten when the compiled content changes.
+
+Called by sync-new-article.py.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from version_store import VERSION_STORE, load_documents
+
+BASE_DIR = Path(__file__).parent.parent
+ARTICLES_DIR = BASE_DIR / "thought_leadership" / "articles"
+CONTENT_DIR = BASE_DIR / "thought_leadership" / "content"
+PROFILE_FILE = CONTENT_DIR / "knowledge-base-profile.json"
+CASE_STUDY_PAGE = BASE_DIR / "src" / "app" / "case-studies" / "[slug]" / "page.tsx"
+KNOWLEDGE_BASE_FILE = BASE_DIR / "thought_leadership" / "knowledge-base.json"
+
+SITE_URL = "https://www.context-is-everything.com"
+
+# Response section order (original sections, with the content modules beside services)
+SECTION_ORDER = [
+    'meta', 'team', 'core_philosophy', 'services', 'service_details', 'methodology',
+    'case_studies', 'thought_leadership', 'faqs', 'contact',
+]
+
+
+def _load(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Error reading {path.name}: {e}")
+        return None
+
+
+def _first_heading(markdown: str) -> Optional[str]:
+    match = re.search(r'^#+\s+(.+)$', markdown or '', re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+def article_entry(article_data: Dict, key_insights: Optional[List[str]] = None) -> Dict:
+    """Knowledge base entry for an article; curated insights fall back to tags."""
+    article = article_data['article']
+    slug = article['slug']
+    return {
+        'title': article['title'],
+        'slug': slug,
+        'summary': article['versions']['bot']['excerpt'],
+        'key_insights': key_insights or article['metadata']['tags'][:3],
+        'url': f"{SITE_URL}/insights/{slug}",
+    }
+
+
+def case_study_slugs(page_tsx: Path = CASE_STUDY_PAGE) -> Dict[str, str]:
+    """File ID → URL slug from the CASE_STUDY_SLUGS map in the case study page."""
+    try:
+        content = page_tsx.read_text(encoding='utf-8')
+    except OSError:
+        return {}
+    section = re.search(r'const CASE_STUDY_SLUGS: Record<string, string> = \{([^}]+)\}', content)
+    if not section:
+        return {}
+    return {file_id: slug for slug, file_id in re.findall(r"'([^']+)':\s*'([^']+)'", section.group(1))}
+
+
+def case_study_entry(data: Dict, file_id: str, slugs: Dict[str, str]) -> Dict:
+    case_study = data['case_study']
+    client = case_study.get('client', {})
+    human = case_study['versions'].get('human', {})
+    chunks = case_study['versions'].get('chat', {}).get('chunks', {})
+    insights = case_study.get('industry_insights', {})
+
+    entry = {
+        'id': case_study['id'],
+        'title': _first_heading(human.get('executive_summary')) or client.get('anonymous_name', case_study['id']),
+        'industry': client.get('industry'),
+        'sub_sector': client.get('sub_sector'),
+        'challenge': chunks.get('challenge'),
+        'solution': chunks.get('solution'),
+        'results': chunks.get('results'),
+        'metrics': case_study.get('metrics', {}),
+        'lessons': case_study.get('lessons', []),
+        'key_insight': insights.get('pattern'),
+        'applies_to': insights.get('application'),
+    }
+    slug = slugs.get(file_id)
+    if slug:
+        entry['url'] = f"{SITE_URL}/case-studies/{slug}"
+    return entry
+
+
+def _content_modules(content_dir: Path) -> Dict[str, Dict]:
+    """Content modules keyed by type (faq, methodology, service, profile)."""
+    modules = {}
+    for path in sorted(content_dir.glob("*.json")):
+        data = _load(path)
+        if not data:
+            continue
+        for key, module in data.items():
+            if key.endswith('_module') and isinstance(module, dict):
+                modules[module.get('type', key[:-len('_module')])] = module
+    return modules
+
+
+def compile_knowledge_base(articles_dir: Path = ARTICLES_DIR, content_dir: Path = CONTENT_DIR,
+                           version_store: Path = VERSION_STORE) -> Dict:
+    """Assemble the knowledge base payload (without hash or timestamp)."""
+    modules = _content_modules(content_dir)
+    profile = modules.get('profile', {})
+    curated_insights = profile.get('article_key_insights', {})
+
+    thought_leadership = []
+    for path in sorted(articles_dir.glob("article-*.json")):
+        data = _load(path)
+        if data and 'article' in data:
+            slug = data['article']['slug']
+            thought_leadership.append(article_entry(data, curated_insights.get(slug)))
+
+    slugs = case_study_slugs()
+    case_studies = []
+    try:
+        documents = load_documents(version_store)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Error reading {version_store.name}: {e}")
+        documents = {}
+    for file_id, data in documents.items():
+        if 'case_study' in data:
+            case_studies.append(case_study_entry(data, file_id, slugs))
+
+    # Curated FAQs first, then concierge Q&As not already covered
+    faqs = list(profile.get('faqs', []))
+    seen = {faq['question'].lower() for faq in faqs}
+    for answer in modules.get('faq', {}).get('versions', {}).get('chat', {}).values():
+        if isinstance(answer, dict) and answer.get('question', '').lower() not in seen:
+            faqs.append({'question': answer['question'], 'answer': answer['answer']})
+            seen.add(answer['question'].lower())
+
+    payload = {
+        'meta': dict(profile.get('meta', {})),
+        'team': profile.get('team', []),
+        'core_philosophy': profile.get('core_philosophy', {}),
+        'services': profile.get('services', []),
+        'case_studies': case_studies,
+        'thought_leadership': thought_leadership,
+        'faqs': faqs,
+        'contact': profile.get('contact', {}),
+    }
+
+    methodology = modules.get('methodology')
+    if methodology:
+        payload['methodology'] = {'title': methodology.get('title'), **methodology['versions'].get('chat', {})}
+    service = modules.get('service')
+    if service:
+        payload['service_details'] = {'title': service.get('title'), **service['versions'].get('chat', {})}
+
+    return {key: payload[key] for key in SECTION_ORDER if key in payload}
+
+
+def content_hash(payload: Dict) -> str:
+    """Hash of the payload excluding the fields this compiler stamps on it."""
+    meta = {k: v for k, v in payload.get('meta', {}).items() if k not in ('content_hash', 'updated')}
+    canonical = json.dumps({**payload, 'meta': meta}, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def build_knowledge_base(output: Path = KNOWLEDGE_BASE_FILE, dry_run: bool = False) -> bool:
+    """Compile the knowledge base and rewrite the artifact if its content changed."""
+    if not PROFILE_FILE.exists():
+        print(f"❌ {PROFILE_FILE} not found")
+        return False
+
+    payload = compile_knowledge_base()
+    digest = content_hash(payload)
+
+    existing = _load(output) if output.exists() else None
+    if existing and existing.get('meta', {}).get('content_hash') == digest:
+        print("✓ Knowledge base already up to date")
+        return True
+
+    if dry_run:
+        print(f"  Would update {output.relative_to(BASE_DIR)}")
+        return True
+
+    payload['meta']['updated'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    payload['meta']['content_hash'] = digest
+
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    print(f"✓ Compiled {output.relative_to(BASE_DIR)} ({len(payload['thought_leadership'])} articles, "
+          f"{len(payload['case_studies'])} case studies, {len(payload['faqs'])} FAQs, "
+          f"{output.stat().st_size / 1024:.0f}KB)")
+    return True
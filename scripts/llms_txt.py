@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+llms.txt / llms-full.txt Generator
+
+Builds the crawler-facing text files in public/ from the article JSON files
+in thought_leadership/articles/:
+- llms-full.txt is streamed article by article to a temporary file (only
+  one article is held in memory) and moved into place when complete
+- llms.txt keeps its hand-written sections; only the Thought Leadership
+  section is rebuilt, reusing the existing entry for each article and
+  generating one from the excerpt for new articles
+- Nothing is rewritten unless the article sources, budgets or outputs have
+  changed since the last build (SHA-256 hashes kept in a state file)
+
+Budgets keep the files small and cheap to fetch as the catalogue grows.
+Each budget is in bytes, with an optional token budget (~4 bytes/token)
+applied on top:
+- Article content over its budget is cut at a paragraph boundary with a
+  link to the full article
+- Once llms-full.txt reaches its budget, remaining articles are listed as
+  summaries, then as links only
+- llms.txt entries beyond the section budget shrink to title and link
+  (regenerated from the excerpt, not the hand-written text, once the
+  budget allows again)
+
+Called by sync-new-article.py.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent
+ARTICLES_DIR = BASE_DIR / "thought_leadership" / "articles"
+LLMS_TXT = BASE_DIR / "public" / "llms.txt"
+LLMS_FULL_TXT = BASE_DIR / "public" / "llms-full.txt"
+STATE_FILE = BASE_DIR / ".cache" / "llms-txt-state.json"
+
+SITE_URL = "https://www.context-is-everything.com"
+
+# Bump when the output format changes so existing files are rebuilt
+GENERATOR_VERSION = 1
+
+BYTES_PER_TOKEN = 4
+
+DEFAULT_BUDGETS = {
+    'article_bytes': 24 * 1024,
+    'article_tokens': None,
+    'full_bytes': 192 * 1024,
+    'full_tokens': None,
+    'index_section_bytes': 12 * 1024,
+    'index_section_tokens': None,
+}
+
+FULL_HEADER = """# Context is Everything - Complete Article Library
+
+This file contains the complete content of our thought leadership library for AI training purposes.
+
+## About Context is Everything
+
+AI consultancy focused on context-first implementation. We analyse how things actually work before suggesting solutions.
+
+**Team**:
+- Lindsay Smith, CTO: 20+ years enterprise software and FinTech experience
+- Robbie MacIntosh, Operations Director: Crisis management and operational transformation
+- Spencer Thursfield, Strategy Director: AI strategy and cross-sector pattern recognition
+
+**Philosophy**: Most AI implementations fail because they apply generic solutions to specific contexts. We start by analysing your actual operational reality.
+
+---
+
+"""
+
+FULL_FOOTER = f"""
+## Contact
+
+Website: {SITE_URL}
+Location: United Kingdom
+
+**Our Honest Approach**: We'll tell you honestly whether AI makes sense for your situation. If it does, we'd love to work with you. If it doesn't, we'll tell you that too.
+"""
+
+TRUNCATED_MARKER = "*[Truncated to fit size budget"
+
+INDEX_SECTION_HEADING = "## Thought Leadership\n"
+INDEX_ENTRY_SLUG_PATTERN = re.compile(r'/insights/([\w-]+)')
+
+
+def byte_limit(max_bytes: Optional[int], max_tokens: Optional[int]) -> Optional[int]:
+    """Tightest of a byte budget and a token budget, in bytes."""
+    limits = [limit for limit in (max_bytes, max_tokens and max_tokens * BYTES_PER_TOKEN) if limit]
+    return min(limits) if limits else None
+
+
+def article_files(articles_dir: Path = ARTICLES_DIR) -> List[Path]:
+    """Current-schema article files in publication order."""
+    return sorted(Path(articles_dir).glob("article-*.json"))
+
+
+def sources_hash(files: List[Path], budgets: Dict) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'version': GENERATOR_VERSION, 'budgets': budgets}, sort_keys=True).encode())
+    for file_path in files:
+        digest.update(file_path.name.encode() + b'\0')
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_hash(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_articles(files: List[Path]) -> Iterator[Dict]:
+    """Load one article at a time."""
+    for file_path in files:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                yield json.load(f)['article']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Error reading {file_path.name}: {e}")
+
+
+def article_url(article: Dict) -> str:
+    return f"{SITE_URL}/insights/{article['slug']}"
+
+
+def truncate_content(content: str, limit: Optional[int], url: str) -> str:
+    """Cut content at the last paragraph that fits within limit bytes."""
+    if limit is None or len(content.encode('utf-8')) <= limit:
+        return content
+    note = f"\n\n{TRUNCATED_MARKER}. Full article: {url}]*"
+    room = limit - len(note.encode('utf-8'))
+    kept, used = [], 0
+    for paragraph in content.split('\n\n'):
+        size = len(paragraph.encode('utf-8')) + 2
+        if used + size > room:
+            break
+        kept.append(paragraph)
+        used += size
+    return '\n\n'.join(kept) + note
+
+
+def render_full_article(article: Dict, number: int, content_limit: Optional[int]) -> str:
+    metadata = article['metadata']
+    bot = article['versions']['bot']
+    return (
+        f"\n## Article {number}: {article['title']}\n\n"
+        f"**Published**: {metadata['publishedDate']}\n"
+        f"**Reading Time**: {metadata['readingTime']} minutes\n"
+        f"**Tags**: {', '.join(metadata['tags'])}\n\n"
+        f"**Summary**: {bot['excerpt']}\n\n"
+        f"**Full Content**:\n\n"
+        f"{truncate_content(bot['content'], content_limit, article_url(article))}"
+        f"\n\n---\n"
+    )
+
+
+def render_summary_article(article: Dict, number: int) -> str:
+    return (
+        f"\n## Article {number}: {article['title']}\n\n"
+        f"**Summary**: {article['versions']['bot']['excerpt']}\n\n"
+        f"Full article: {article_url(article)}\n\n---\n"
+    )
+
+
+def render_link_article(article: Dict, number: int) -> str:
+    return f"\n## Article {number}: {article['title']}\n\nFull article: {article_url(article)}\n"
+
+
+def _write_atomic(path: Path, chunks: Iterator[str]) -> int:
+    """Stream chunks to a temp file beside path, then rename over it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    written = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk.encode('utf-8'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return written
+
+
+def iter_full_chunks(files: List[Path], budgets: Dict, stats: Dict) -> Iterator[str]:
+    """Yield llms-full.txt piece by piece, degrading articles to stay in budget."""
+    total_limit = byte_limit(budgets['full_bytes'], budgets['full_tokens'])
+    content_limit = byte_limit(budgets['article_bytes'], budgets['article_tokens'])
+    reserved = len(FULL_FOOTER.encode('utf-8'))
+    used = len(FULL_HEADER.encode('utf-8'))
+    yield FULL_HEADER
+
+    for number, article in enumerate(iter_articles(files), 1):
+        for kind, render in (('full', lambda: render_full_article(article, number, content_limit)),
+                             ('summary', lambda: render_summary_article(article, number)),
+                             ('link', lambda: render_link_article(article, number))):
+            chunk = render()
+            size = len(chunk.encode('utf-8'))
+            if total_limit is None or used + size + reserved <= total_limit or kind == 'link':
+                break
+        if kind == 'full' and TRUNCATED_MARKER in chunk:
+            stats['truncated'].append(article['slug'])
+        stats[kind] += 1
+        used += size
+        yield chunk
+
+    yield FULL_FOOTER
+
+
+def render_index_entry(article: Dict) -> str:
+    return (
+        f"### {article['title']}\n"
+        f"{article['versions']['bot']['excerpt']}\n\n"
+        f"Full article: {article_url(article)}\n"
+    )
+
+
+def render_index_link(article: Dict) -> str:
+    return f"### {article['title']}\nFull article: {article_url(article)}\n"
+
+
+def split_index_section(text: str) -> Optional[Tuple[str, str, Dict[str, str], str]]:
+    """(before, section intro, {slug: entry}, after) for llms.txt, or None."""
+    start = text.find(INDEX_SECTION_HEADING)
+    if start == -1:
+        return None
+    body_start = start + len(INDEX_SECTION_HEADING)
+    end = text.find('\n## ', body_start)
+    end = len(text) if end == -1 else end + 1
+    body = text[body_start:end]
+
+    parts = body.split('\n### ')
+    intro = parts[0].rstrip('\n') + '\n'
+    entries = {}
+    for part in parts[1:]:
+        match = INDEX_ENTRY_SLUG_PATTERN.search(part)
+        if match:
+            entries[match.group(1)] = '### ' + part.strip('\n') + '\n'
+    return text[:body_start], intro, entries, text[end:]
+
+
+def build_index(text: str, files: List[Path], budgets: Dict, stats: Dict) -> Optional[str]:
+    """Rebuild the Thought Leadership section of llms.txt."""
+    sections = split_index_section(text)
+    if sections is None:
+        return None
+    before, intro, existing, after = sections
+    limit = byte_limit(budgets['index_section_bytes'], budgets['index_section_tokens'])
+
+    entries = []
+    used = len(intro.encode('utf-8'))
+    for article in iter_articles(files):
+        entry = existing.get(article['slug'])
+        # Entries shortened by an earlier, tighter budget are rebuilt from the excerpt
+        if entry is None or entry == render_index_link(article):
+            entry = render_index_entry(article)
+        size = len(entry.encode('utf-8')) + 1
+        if limit is not None and used + size > limit:
+            entry = render_index_link(article)
+            size = len(entry.encode('utf-8')) + 1
+            stats['index_links'] += 1
+        stats['index_entries'] += 1
+        used += size
+        entries.append(entry)
+
+    return before + intro + '\n' + '\n'.join(entries) + '\n' + after
+
+
+def _load_state(state_file: Path) -> Dict:
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_llms_files(budgets: Optional[Dict] = None, force: bool = False, dry_run: bool = False,
+                        articles_dir: Path = ARTICLES_DIR, llms_txt: Path = LLMS_TXT,
+                        llms_full_txt: Path = LLMS_FULL_TXT, state_file: Path = STATE_FILE) -> bool:
+    """Regenerate llms.txt and llms-full.txt when their sources changed."""
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    files = article_files(articles_dir)
+    source_hash = sources_hash(files, budgets)
+
+    state = _load_state(state_file)
+    outputs = {llms_txt.name: file_hash(llms_txt), llms_full_txt.name: file_hash(llms_full_txt)}
+    if not force and state.get('source_hash') == source_hash and state.get('outputs') == outputs:
+        print("✓ llms.txt and llms-full.txt already up to date")
+        return True
+
+    if dry_run:
+        print(f"  Would regenerate {llms_txt.relative_to(BASE_DIR)} and {llms_full_txt.relative_to(BASE_DIR)}")
+        return True
+
+    stats = {'full': 0, 'summary': 0, 'link': 0, 'truncated': [], 'index_entries': 0, 'index_links': 0}
+    size = _write_atomic(llms_full_txt, iter_full_chunks(files, budgets, stats))
+    print(f"✓ Generated {llms_full_txt.relative_to(BASE_DIR)} ({size / 1024:.0f}KB, "
+          f"{stats['full']} full, {stats['summary']} summary, {stats['link']} link only)")
+    if stats['truncated']:
+        print(f"  ✂️  Truncated to article budget: {', '.join(stats['truncated'])}")
+
+    success = True
+    if llms_txt.exists():
+        index = build_index(llms_txt.read_text(encoding='utf-8'), files, budgets, stats)
+        if index is None:
+            print(f"⚠️  No '{INDEX_SECTION_HEADING.strip()}' section in {llms_txt.name}; left unchanged")
+            success = False
+        else:
+            _write_atomic(llms_txt, iter([index]))
+            print(f"✓ Updated {llms_txt.relative_to(BASE_DIR)} ({stats['index_entries']} articles, "
+                  f"{stats['index_links']} shortened to fit budget)")
+    else:
+        print(f"❌ {llms_txt} not found")
+        success = False
+
+    if success:
+        outputs = {llms_txt.name: file_hash(llms_txt), llms_full_txt.name: file_hash(llms_full_txt)}
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_file, 'w', encoding='utf-8') as f:
+            json.dump({'source_hash': source_hash, 'outputs': outputs}, f, indent=2)
+    return success
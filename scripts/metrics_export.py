@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+OpenMetrics Textfile Export
+
+Publishes the key aggregates of an analysis run, plus run health, to an
+OpenMetrics text file (enabled with --metrics <file.prom>) that the
+node_exporter textfile collector or any OpenMetrics scraper can read:
+- Report aggregates: sessions by medium, bot/human sessions, article
+  views, JSON endpoint hits, tokens, cost and latency
+- Run health: duration, success, GA4 requests and rows fetched, and the
+  time of the run
+
+Every sample carries a script="<name>" label. Scripts can share one file:
+each run replaces only its own script's samples and keeps the rest.
+Everything is a gauge that holds the value from the most recent run.
+When export is off, record() costs one check.
+
+Used by the analyze-*.py scripts, analysis-daemon.py, ga4_properties.py and
+ga4_shards.py.
+"""
+
+import atexit
+import functools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PREFIX = 'cie_'
+
+# Metric → (help, unit); units follow the OpenMetrics naming rule (name ends with _<unit>)
+METRICS = {
+    'sessions': ('Sessions in the report window', None),
+    'bot_sessions': ('Sessions classified as likely bots in the report window', None),
+    'human_sessions': ('Sessions classified as likely human in the report window', None),
+    'article_views': ('Article page views in the report window, folded to the canonical article', None),
+    'json_endpoint_hits': ('Views of JSON files in the report window', None),
+    'api_endpoint_hits': ('Views of /api/ paths in the report window', None),
+    'endpoint_bytes': ('Bytes served per machine endpoint in the request logs', 'bytes'),
+    'search_clicks': ('Google Search clicks per landing page in the report window (Search Console)', None),
+    'search_impressions': ('Google Search impressions per landing page in the report window (Search Console)', None),
+    'funnel_sessions': ('Sessions reaching each funnel step', None),
+    'llm_requests': ('AI consultant requests in the logs', None),
+    'llm_tokens': ('AI consultant tokens in the logs', None),
+    'llm_cost_usd': ('AI consultant API cost in the logs', 'usd'),
+    'llm_latency_p95_milliseconds': ('95th percentile AI consultant API latency', 'milliseconds'),
+    'run_duration_seconds': ('Wall-clock duration of the last run', 'seconds'),
+    'run_success': ('1 if the last run completed without errors, otherwise 0', None),
+    'run_timestamp_seconds': ('Unix time the last run finished', 'seconds'),
+    'run_ga4_requests': ('GA4 API requests made by the last run', None),
+    'run_rows_fetched': ('GA4 rows fetched by the last run', None),
+}
+
+RUN_METRICS = ('run_duration_seconds', 'run_success', 'run_timestamp_seconds', 'run_ga4_requests', 'run_rows_fetched')
+
+GA4_METHODS = ('run_report', 'run_pivot_report', 'run_realtime_report')
+
+SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)')
+SCRIPT_LABEL_PATTERN = re.compile(r'[{,]script="((?:[^"\\]|\\.)*)"')
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsFile:
+    """Samples for one script, merged into the textfile alongside other scripts' samples."""
+
+    def __init__(self, path: Optional[Path], script: str):
+        self.path = Path(path) if path else None
+        self.script = script
+        self.samples: Dict[str, Dict[Tuple, float]] = {}
+        self.started = time.time()
+        self.success = True
+        self.ga4_requests = 0
+        self.rows_fetched = 0
+
+    def record(self, metric: str, value: float, **labels):
+        if metric not in METRICS:
+            raise KeyError(f"Unknown metric {metric!r}; add it to METRICS")
+        key = (('script', self.script),) + tuple(sorted((k, str(v)) for k, v in labels.items()))
+        self.samples.setdefault(metric, {})[key] = value
+
+    def sample_list(self) -> List[Dict]:
+        """This run's samples as {metric, labels, value} dicts (script label omitted)."""
+        return [
+            {'metric': metric, 'labels': dict(key[1:]), 'value': value}
+            for metric, samples in self.samples.items()
+            for key, value in samples.items()
+        ]
+
+    def _read_existing(self) -> Dict[str, List[str]]:
+        """Other scripts' sample lines from the current file, by metric family."""
+        families: Dict[str, List[str]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return families
+        for line in lines:
+            match = SAMPLE_PATTERN.match(line)
+            if not match or line.startswith('#'):
+                continue
+            script = SCRIPT_LABEL_PATTERN.search(match.group(2) or '')
+            if script and script.group(1) == _escape(self.script):
+                continue
+            families.setdefault(match.group(1)[len(PREFIX):], []).append(line)
+        return families
+
+    def render(self) -> str:
+        families = self._read_existing()
+        for name, samples in self.samples.items():
+            lines = families.setdefault(name, [])
+            for key, value in samples.items():
+                lines.append(f"{PREFIX}{name}{_format_labels(dict(key))} {_format_value(value)}")
+
+        output = []
+        for name in sorted(families):
+            help_text, unit = METRICS.get(name, ('', None))
+            output.append(f"# TYPE {PREFIX}{name} gauge")
+            if unit:
+                output.append(f"# UNIT {PREFIX}{name} {unit}")
+            if help_text:
+                output.append(f"# HELP {PREFIX}{name} {help_text}")
+            output.extend(sorted(families[name]))
+        output.append("# EOF")
+        return '\n'.join(output) + '\n'
+
+    def finalize(self):
+        """Record the run health metrics; call once the run is over."""
+        self.record('run_duration_seconds', round(time.time() - self.started, 3))
+        self.record('run_success', self.success)
+        self.record('run_timestamp_seconds', int(time.time()))
+        self.record('run_ga4_requests', self.ga4_requests)
+        self.record('run_rows_fetched', self.rows_fetched)
+
+    def merge(self, other: 'MetricsFile', **labels):
+        """Add another run's samples, with extra labels, and its request counts to this run.
+
+        Samples with the same labels are summed, which suits the count
+        gauges the GA4 analyses record (e.g. one property's runs into a
+        portfolio total). The other run's health metrics are left out;
+        this run records its own in finalize().
+        """
+        extra = tuple((key, str(value)) for key, value in labels.items())
+        for metric, samples in other.samples.items():
+            if metric in RUN_METRICS:
+                continue
+            target = self.samples.setdefault(metric, {})
+            for key, value in samples.items():
+                merged = (('script', self.script),) + tuple(sorted(key[1:] + extra))
+                target[merged] = target.get(merged, 0) + value
+        self.ga4_requests += other.ga4_requests
+        self.rows_fetched += other.rows_fetched
+        self.success = self.success and other.success
+
+    def write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Written atomically so a scrape never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+_metrics: Optional[MetricsFile] = None
+_local = threading.local()
+_counter_lock = threading.Lock()
+
+
+def _current() -> Optional[MetricsFile]:
+    """The collector for this thread's run: a collecting() block, else the process-wide file."""
+    collected = getattr(_local, 'metrics', None)
+    return collected if collected is not None else _metrics
+
+
+def start_metrics(metrics_path: Optional[str], script: Optional[str] = None) -> Optional[MetricsFile]:
+    """Enable export for this run if metrics_path is set; the file is written at exit."""
+    global _metrics
+    if not metrics_path or _metrics is not None:
+        return _metrics
+
+    script = script or Path(sys.argv[0]).stem
+    _metrics = MetricsFile(metrics_path, script)
+
+    def finish():
+        _metrics.finalize()
+        try:
+            _metrics.write()
+        except OSError as e:
+            print(f"⚠️  Could not write metrics to {metrics_path}: {e}")
+
+    # An uncaught exception still writes the file, with run_success 0
+    previous_hook = sys.excepthook
+
+    def excepthook(*exc_info):
+        record_failure()
+        previous_hook(*exc_info)
+
+    sys.excepthook = excepthook
+    atexit.register(finish)
+    return _metrics
+
+
+@contextmanager
+def collecting(metrics_path: Optional[str], script: str) -> Iterator[MetricsFile]:
+    """Collect one run's metrics apart from the process-wide file, e.g. per daemon job.
+
+    Collection is per thread, so concurrent runs each get their own. The
+    file is written when the block ends, if metrics_path is set; an
+    exception inside the block is reported as run_success 0 and re-raised.
+    """
+    previous = getattr(_local, 'metrics', None)
+    collected = _local.metrics = MetricsFile(metrics_path, script)
+    try:
+        yield collected
+    except Exception:
+        collected.success = False
+        raise
+    finally:
+        _local.metrics = previous
+        collected.finalize()
+        if metrics_path:
+            collected.write()
+
+
+def propagate(func):
+    """func wrapped to record into the calling thread's collecting() run when called on another thread."""
+    collected = getattr(_local, 'metrics', None)
+    if collected is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'metrics', None)
+        _local.metrics = collected
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.metrics = previous
+    return run
+
+
+def merge_run(collected: MetricsFile, **labels):
+    """Add a run collected apart (see collecting()) to the process-wide file, with extra labels."""
+    if _metrics is not None:
+        _metrics.merge(collected, **labels)
+
+
+def record(metric: str, value: float, **labels):
+    """Set a gauge for this run (no-op unless export is enabled)."""
+    metrics = _current()
+    if metrics is not None:
+        metrics.record(metric, value, **labels)
+
+
+def record_failure():
+    """Mark the run as failed; reported as run_success 0."""
+    metrics = _current()
+    if metrics is not None:
+        metrics.success = False
+
+
+class MeteredClient:
+    """GA4 client proxy counting requests and rows for the run metrics."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name not in GA4_METHODS or not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            response = attribute(*args, **kwargs)
+            metrics = _current()
+            if metrics is not None:
+                # Requests may run on several threads (sharded reports)
+                with _counter_lock:
+                    metrics.ga4_requests += 1
+                    metrics.rows_fetched += len(getattr(response, 'rows', None) or [])
+            return response
+        return call
+
+
+def metered_client(client):
+    """client wrapped to count GA4 requests and rows, or unchanged when export is off."""
+    if _current() is None or isinstance(client, MeteredClient):
+        return client
+    return MeteredClient(client)
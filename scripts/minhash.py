@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+MinHash + LSH Banding
+
+Near-duplicate detection in roughly linear time:
+- MinHash signatures estimate Jaccard similarity between shingle sets
+- LSH banding buckets signatures so only items sharing a band are compared,
+  instead of comparing every pair
+
+With b bands of r rows, two items with Jaccard similarity s become
+candidates with probability 1 - (1 - s^r)^b. The defaults (16 bands × 4
+rows) put the 50% point at s ≈ (1/b)^(1/r) = 0.5.
+
+Used by cluster-concierge-queries.py, simulate-query-cache.py and
+sync-new-article.py.
+"""
+
+import hashlib
+import random
+from typing import Dict, Hashable, Iterable, List, Set
+
+# Mersenne prime for universal hashing (a*x + b) mod p
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+DEFAULT_BANDS = 16
+DEFAULT_ROWS = 4
+
+
+def _hash32(shingle: str) -> int:
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _hash64(shingle: str) -> int:
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def char_shingles(text: str, size: int = 4) -> Set[str]:
+    """Overlapping character n-grams; short texts become a single shingle."""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def word_shingles(text: str, size: int = 3) -> Set[str]:
+    """Overlapping word n-grams; short texts become a single shingle."""
+    words = text.split()
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Builds fixed-length MinHash signatures from shingle sets."""
+
+    def __init__(self, bands: int = DEFAULT_BANDS, rows: int = DEFAULT_ROWS, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        rng = random.Random(seed)
+        self._coefficients = [
+            (rng.randint(1, _PRIME - 1), rng.randint(0, _PRIME - 1))
+            for _ in range(self.num_perm)
+        ]
+
+    def signature(self, shingles: Iterable[str]) -> List[int]:
+        hashes = [_hash32(s) for s in shingles]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+            for a, b in self._coefficients
+        ]
+
+    def band_keys(self, signature: List[int]) -> List[int]:
+        """One hash key per band of the signature."""
+        rows = self.rows
+        return [hash(tuple(signature[i * rows:(i + 1) * rows])) for i in range(self.bands)]
+
+
+class OnePermutationHasher(MinHasher):
+    """MinHash signatures from a single hash per shingle (one-permutation hashing).
+
+    Each shingle's 64-bit hash picks one of num_perm bins and the minimum
+    per bin becomes that signature slot, so building a signature costs
+    O(shingles) instead of O(shingles × num_perm). Empty bins borrow the
+    next non-empty bin's value (rotation densification), keeping signatures
+    comparable for short texts. Suited to long documents such as article
+    bodies; interchangeable with MinHasher for banding and estimate_jaccard.
+    """
+
+    def signature(self, shingles: Iterable[str]) -> List[int]:
+        num_perm = self.num_perm
+        bins = [None] * num_perm
+        for shingle in shingles:
+            slot, value = divmod(_hash64(shingle), 1 << 32)
+            slot %= num_perm
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+        if all(value is None for value in bins):
+            return [_MAX_HASH] * num_perm
+        signature = []
+        for i in range(num_perm):
+            j, offset = i, 0
+            while bins[j] is None:
+                j = (j + 1) % num_perm
+                offset += 1
+            # Salt borrowed values by distance so different empty bins stay distinct
+            signature.append((bins[j] + offset * 0x9E3779B1) & _MAX_HASH)
+        return signature
+
+
+def estimate_jaccard(sig_a: List[int], sig_b: List[int]) -> float:
+    """Fraction of matching MinHash values ≈ Jaccard similarity."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class LSHIndex:
+    """Banded LSH buckets for incremental candidate lookup."""
+
+    def __init__(self, hasher: MinHasher):
+        self.hasher = hasher
+        self._buckets: List[Dict[int, Set[Hashable]]] = [{} for _ in range(hasher.bands)]
+
+    def query(self, signature: List[int]) -> Set[Hashable]:
+        """Keys sharing at least one band with the signature."""
+        candidates = set()
+        for band, key in enumerate(self.hasher.band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        return candidates
+
+    def insert(self, item: Hashable, signature: List[int]):
+        for band, key in enumerate(self.hasher.band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(item)
+
+    def remove(self, item: Hashable, signature: List[int]):
+        for band, key in enumerate(self.hasher.band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._buckets[band][key]
+
+
+class UnionFind:
+    """Disjoint sets with path halving and union by size."""
+
+    def __init__(self):
+        self._parent: Dict[Hashable, Hashable] = {}
+        self._size: Dict[Hashable, int] = {}
+
+    def find(self, item: Hashable) -> Hashable:
+        parent = self._parent.setdefault(item, item)
+        if parent == item:
+            self._size.setdefault(item, 1)
+            return item
+        while self._parent[item] != item:
+            self._parent[item] = self._parent[self._parent[item]]
+            item = self._parent[item]
+        return item
+
+    def union(self, a: Hashable, b: Hashable):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size.pop(root_b)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Precompressed Static Artifacts
+
+Post-sync build stage for the machine-readable files crawlers fetch most:
+- Writes .gz (level 9) and .br (quality 11) variants next to each file in
+  public/, only when the file's content hash has changed
+- Records a manifest of SHA-256 hashes, strong ETags and Content-Length
+  for the original and each variant, so responses can be revalidated with
+  If-None-Match instead of re-sent in full
+
+src/app/artifacts/[name]/route.ts serves these paths (via the rewrites in
+next.config.ts): the best variant the client accepts, with
+Content-Encoding and the manifest's ETag, and 304 for a matching
+If-None-Match. Keep ARTIFACTS in sync with src/lib/artifacts.ts. The
+variants and manifest are committed with the files they compress, so
+every deployment serves them.
+
+gzip output uses a fixed mtime so identical content always compresses to
+identical bytes. brotli is optional (pip install brotli); without it only
+gzip variants are written.
+
+Called by sync-new-article.py.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = BASE_DIR / "public"
+MANIFEST_FILE = PUBLIC_DIR / "artifact-manifest.json"
+
+ARTIFACTS = [
+    "llms-full.txt",
+    "ai-sitemap.json",
+    "manifest.json",
+]
+
+# ETag suffix per Content-Encoding (variants need distinct strong ETags)
+ENCODINGS = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return None
+
+
+def _entry(data: bytes, suffix: str = '') -> Dict:
+    digest = hashlib.sha256(data).hexdigest()
+    return {
+        'sha256': digest,
+        'etag': f'"{digest[:32]}{suffix}"',
+        'length': len(data),
+    }
+
+
+def _write_bytes(path: Path, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_manifest(manifest_file: Path = MANIFEST_FILE) -> Dict:
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def precompress_artifacts(artifacts: List[str] = ARTIFACTS, public_dir: Path = PUBLIC_DIR,
+                          manifest_file: Path = MANIFEST_FILE, dry_run: bool = False) -> bool:
+    """Refresh compressed variants and the ETag manifest for changed artifacts."""
+    manifest = load_manifest(manifest_file)
+    updated = {}
+    changed = []
+
+    for name in artifacts:
+        path = public_dir / name
+        if not path.exists():
+            print(f"⚠️  {path.relative_to(BASE_DIR)} not found, skipping")
+            continue
+
+        data = path.read_bytes()
+        entry = _entry(data)
+        previous = manifest.get(name, {})
+        variants_present = all(
+            (public_dir / (name + ENCODINGS[encoding])).exists()
+            for encoding in previous.get('encodings', {})
+        )
+        if previous.get('sha256') == entry['sha256'] and variants_present and (
+                brotli is None or 'br' in previous.get('encodings', {})):
+            updated[name] = previous
+            continue
+
+        changed.append(name)
+        if dry_run:
+            continue
+
+        entry['encodings'] = {}
+        for encoding, extension in ENCODINGS.items():
+            compressed = _compress(data, encoding)
+            variant = public_dir / (name + extension)
+            if compressed is None:
+                continue
+            _write_bytes(variant, compressed)
+            entry['encodings'][encoding] = _entry(compressed, suffix=f"-{encoding}")
+        updated[name] = entry
+
+        sizes = ", ".join(f"{encoding} {e['length'] / 1024:.1f}KB"
+                          for encoding, e in entry['encodings'].items())
+        print(f"✓ Precompressed {path.relative_to(BASE_DIR)} ({len(data) / 1024:.1f}KB → {sizes})")
+
+    if not changed:
+        print("✓ Precompressed artifacts already up to date")
+        return True
+
+    if dry_run:
+        print(f"  Would precompress {', '.join(changed)}")
+        return True
+
+    if brotli is None:
+        print("  ℹ️  brotli not installed; wrote gzip variants only (pip install brotli)")
+
+    _write_bytes(manifest_file, (json.dumps(updated, indent=2, sort_keys=True) + "\n").encode('utf-8'))
+    print(f"✓ Updated {manifest_file.relative_to(BASE_DIR)}")
+    return True
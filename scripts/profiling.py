@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Run Profiling → Chrome Trace
+
+Records where an analysis or sync run spends its time, enabled with
+--profile <trace.json>:
+- A span per phase (@traced functions and span() blocks), nested as called
+- A span per GA4 request made through profiled_client(), with latency,
+  row count, response bytes and the request's dimensions and metrics
+- Time spent writing to stdout, charged to the innermost open span, so
+  each phase splits into GA4 requests, output and everything else
+  (decoding rows, analysis)
+- Cache hits and misses, where a phase reports them with annotate()
+
+On exit the spans are written as Chrome trace-event JSON (open in
+chrome://tracing or https://ui.perfetto.dev) and a summary table is
+printed. When profiling is off, span() and @traced cost one check.
+
+The GA4 client fetches its OAuth token on the first request, so the
+first request span includes authentication.
+
+Used by sync-new-article.py and the analyze-*.py scripts.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+GA4_METHODS = ('run_report', 'run_pivot_report', 'run_realtime_report', 'batch_run_reports')
+
+
+class Profiler:
+    """Collects spans as Chrome trace 'complete' events."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.events: List[Dict] = []
+        self.pid = os.getpid()
+        self._start_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Dict]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str, category: str, args: Dict) -> Dict:
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+            'start_ns': time.perf_counter_ns(),
+            'child_ns': 0,
+            'output_ns': 0,
+            'args': args,
+        }
+        self._stack().append(event)
+        return event
+
+    def end(self, event: Dict):
+        stack = self._stack()
+        while stack:
+            if stack.pop() is event:
+                break
+        duration = time.perf_counter_ns() - event['start_ns']
+        event['dur_ns'] = duration
+        if stack:
+            stack[-1]['child_ns'] += duration
+        with self._lock:
+            self.events.append(event)
+
+    def add_output(self, elapsed_ns: int):
+        stack = self._stack()
+        if stack:
+            stack[-1]['output_ns'] += elapsed_ns
+
+    def close_open_spans(self):
+        stack = self._stack()
+        while stack:
+            self.end(stack[-1])
+
+    def trace(self) -> Dict:
+        """Chrome trace-event JSON (timestamps in µs from the start of the run)."""
+        events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+            'args': {'name': self.name},
+        }]
+        for event in sorted(self.events, key=lambda e: e['start_ns']):
+            args = dict(event['args'])
+            if event['output_ns']:
+                args['output_ms'] = round(event['output_ns'] / 1e6, 3)
+            events.append({
+                'name': event['name'],
+                'cat': event['cat'],
+                'ph': 'X',
+                'pid': event['pid'],
+                'tid': event['tid'],
+                'ts': (event['start_ns'] - self._start_ns) / 1000,
+                'dur': event['dur_ns'] / 1000,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f, default=str)
+
+    def summary(self) -> List[Dict]:
+        """Per span name: calls, total/self time, and the GA4 and output share of it."""
+        rows: Dict[str, Dict] = {}
+        for event in self.events:
+            row = rows.setdefault(event['name'], {
+                'name': event['name'], 'category': event['cat'], 'calls': 0,
+                'total_ns': 0, 'max_ns': 0, 'child_ns': 0, 'output_ns': 0, 'rows': 0, 'bytes': 0,
+            })
+            row['calls'] += 1
+            row['total_ns'] += event['dur_ns']
+            row['max_ns'] = max(row['max_ns'], event['dur_ns'])
+            row['child_ns'] += event['child_ns']
+            row['output_ns'] += event['output_ns']
+            row['rows'] += event['args'].get('rows') or 0
+            row['bytes'] += event['args'].get('response_bytes') or 0
+        return sorted(rows.values(), key=lambda row: -row['total_ns'])
+
+    def print_summary(self, file=None):
+        file = file or sys.stdout
+        rows = self.summary()
+        run_ns = max((e['dur_ns'] for e in self.events if e['cat'] == 'run'), default=0) or 1
+
+        print("\n" + "=" * 70, file=file)
+        print(f"  ⏱️  PROFILE - {self.name}", file=file)
+        print("=" * 70, file=file)
+        print(f"  {'Span':<34}{'Calls':>6}{'Total ms':>10}{'Self ms':>9}{'Output':>8}{'%':>5}", file=file)
+        for row in rows:
+            self_ms = (row['total_ns'] - row['child_ns'] - row['output_ns']) / 1e6
+            print(f"  {row['name'][:33]:<34}{row['calls']:>6}{row['total_ns'] / 1e6:>10.1f}"
+                  f"{self_ms:>9.1f}{row['output_ns'] / 1e6:>8.1f}"
+                  f"{100 * row['total_ns'] / run_ns:>5.0f}", file=file)
+
+        requests = [row for row in rows if row['category'] == 'ga4']
+        if requests:
+            calls = sum(row['calls'] for row in requests)
+            total_ms = sum(row['total_ns'] for row in requests) / 1e6
+            slowest = max(row['max_ns'] for row in requests) / 1e6
+            print(f"\n  GA4: {calls} requests, {total_ms:.0f}ms total, slowest {slowest:.0f}ms, "
+                  f"{sum(row['rows'] for row in requests)} rows, "
+                  f"{sum(row['bytes'] for row in requests) / 1024:.1f}KB", file=file)
+
+
+class _TimedStream:
+    """stdout proxy that charges time spent writing to the current span."""
+
+    def __init__(self, stream, profiler: Profiler):
+        self._stream = stream
+        self._profiler = profiler
+
+    def write(self, text):
+        start = time.perf_counter_ns()
+        try:
+            return self._stream.write(text)
+        finally:
+            self._profiler.add_output(time.perf_counter_ns() - start)
+
+    def flush(self):
+        start = time.perf_counter_ns()
+        try:
+            return self._stream.flush()
+        finally:
+            self._profiler.add_output(time.perf_counter_ns() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def start_profiling(trace_path: Optional[str], name: Optional[str] = None) -> Optional[Profiler]:
+    """Enable profiling for this run if trace_path is set; the trace is written at exit."""
+    global _profiler
+    if not trace_path or _profiler is not None:
+        return _profiler
+
+    name = name or Path(sys.argv[0]).name
+    _profiler = Profiler(name)
+    _profiler.begin(name, 'run', {'argv': sys.argv[1:]})
+    stdout = sys.stdout
+    sys.stdout = _TimedStream(stdout, _profiler)
+
+    def finish():
+        profiler = _profiler
+        profiler.close_open_spans()
+        sys.stdout = stdout
+        profiler.write_trace(trace_path)
+        profiler.print_summary(file=stdout)
+        print(f"\n  Trace written to {trace_path} (open in chrome://tracing or ui.perfetto.dev)\n")
+
+    atexit.register(finish)
+    return _profiler
+
+
+@contextmanager
+def span(name: str, category: str = 'phase', **args) -> Iterator[Dict]:
+    """Time a block; the yielded dict becomes the span's args (add cache_hits etc.)."""
+    if _profiler is None:
+        yield args
+        return
+    event = _profiler.begin(name, category, args)
+    try:
+        yield event['args']
+    finally:
+        _profiler.end(event)
+
+
+def annotate(**args):
+    """Add args (e.g. cache_hits, cache_misses) to the innermost open span."""
+    if _profiler is None:
+        return
+    stack = _profiler._stack()
+    if stack:
+        stack[-1]['args'].update(args)
+
+
+def traced(func):
+    """Record each call of func as a phase span named after it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _profiler is None:
+            return func(*args, **kwargs)
+        with span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _describe_request(request) -> Dict:
+    details = {}
+    for field in ('dimensions', 'metrics'):
+        values = getattr(request, field, None)
+        if values:
+            details[field] = [getattr(value, 'name', str(value)) for value in values]
+    date_ranges = getattr(request, 'date_ranges', None)
+    if date_ranges:
+        details['date_range'] = f"{date_ranges[0].start_date}..{date_ranges[0].end_date}"
+    return details
+
+
+def _response_size(response) -> Optional[int]:
+    try:
+        return type(response).pb(response).ByteSize()
+    except Exception:
+        return None
+
+
+class ProfiledClient:
+    """GA4 client proxy recording a span per report request."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name not in GA4_METHODS or not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(request=None, *args, **kwargs):
+            with span(name, 'ga4', **_describe_request(request)) as details:
+                response = attribute(request, *args, **kwargs)
+                rows = getattr(response, 'rows', None)
+                details['rows'] = len(rows) if rows is not None else None
+                details['row_count'] = getattr(response, 'row_count', None)
+                details['response_bytes'] = _response_size(response)
+            return response
+        return call
+
+
+def profiled_client(client):
+    """client wrapped to record GA4 request spans, or unchanged when profiling is off."""
+    if _profiler is None or isinstance(client, ProfiledClient):
+        return client
+    return ProfiledClient(client)
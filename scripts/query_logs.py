@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Concierge Query Log Reading and Normalization
+
+Shared by the scripts that replay or analyze AI consultant query logs:
+- Streams query records from JSONL files, gzipped files or stdin. Lines may
+  carry a Vercel log prefix such as 'AI_HANDLING: {...}' or
+  'CONTENT_MATCH: {...}'
+- Normalizes queries the way QUERY_CACHE_PLAN.md's normalizeQuery() does, so
+  the clustering report and the cache simulator agree on what counts as the
+  same question
+
+Used by cluster-concierge-queries.py and simulate-query-cache.py.
+"""
+
+import gzip
+import json
+import re
+import sys
+from typing import Dict, Iterator, List, Set
+
+from minhash import char_shingles
+
+# Words ignored when normalizing and matching queries
+STOPWORDS = {
+    'a', 'an', 'as', 'at', 'be', 'by', 'do', 'i', 'if', 'in', 'is', 'it', 'me',
+    'my', 'of', 'on', 'or', 'so', 'to', 'up', 'us', 'we',
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'your', 'with', 'can',
+    'how', 'what', 'why', 'when', 'who', 'does', 'our', 'this', 'that', 'from',
+    'have', 'has', 'about', 'into', 'should', 'would', 'could', 'there', 'any',
+    'tell', 'more', 'get', 'use', 'need', 'much', 'really', 'most',
+}
+
+WORD_PATTERN = re.compile(r'[a-z0-9£$%]+')
+
+
+def read_query_records(paths: List[str]) -> Iterator[Dict]:
+    """Stream records with a 'query' field from JSONL files or stdin.
+
+    Lines may carry a log prefix (e.g. 'AI_HANDLING: {...}'); everything
+    from the first '{' is parsed.
+    """
+    for path in paths:
+        if path == '-':
+            stream = sys.stdin
+        elif path.endswith('.gz'):
+            stream = gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+        else:
+            stream = open(path, 'r', encoding='utf-8', errors='replace')
+
+        try:
+            for line in stream:
+                start = line.find('{')
+                if start == -1:
+                    continue
+                try:
+                    record = json.loads(line[start:])
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and record.get('query'):
+                    yield record
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms without stopwords; a trailing plural 's' is dropped."""
+    terms = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and stopwords, sort unique terms.
+
+    Mirrors the normalizeQuery() plan in QUERY_CACHE_PLAN.md so word order
+    and filler words don't split otherwise identical questions.
+    """
+    return ' '.join(sorted(set(tokenize(query))))
+
+
+def query_shingles(normalized: str) -> Set[str]:
+    """Whole terms plus character trigrams within each term.
+
+    Trigrams keep near-miss spellings close; whole terms keep very short
+    queries from collapsing onto each other.
+    """
+    shingles = set()
+    for term in normalized.split():
+        shingles.add(term)
+        shingles.update(char_shingles(term, 3))
+    return shingles
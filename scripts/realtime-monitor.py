@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Realtime Crawler and Concierge Monitor
+
+Polls GA4's realtime report (events from the last 30 minutes) and shows
+only what changed since the previous poll:
+- Rows are counted per minute (minutesAgo resolved against the poll
+  time), so each poll yields the events that arrived since the last one
+  rather than the whole trailing window again
+- Changes are classified as they arrive: AI_BOTS by agent, /insights/
+  articles by page title, and concierge events by event name
+- Each bot, article and concierge event keeps a running mean of its
+  activity per poll (crawl_anomaly.py), so bursts are flagged live
+- --jsonl writes one JSON object per change instead of the terminal
+  view, for tailing or piping into other tools
+
+Realtime reports have no page path, source or browser dimensions. Pages
+are identified by title (unifiedScreenName), and AI bot classification
+needs the visitor's agent as a user-scoped custom dimension, e.g. an
+`ai_agent` user property registered as customUser:ai_agent.
+
+Usage:
+    python scripts/realtime-monitor.py [--interval 60]
+    python scripts/realtime-monitor.py --agent-dimension customUser:ai_agent
+    python scripts/realtime-monitor.py --jsonl - | jq .
+    python scripts/realtime-monitor.py --jsonl .cache/realtime.jsonl --polls 60
+"""
+
+import importlib.util
+import json
+import base64
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from article_index import get_article_index
+from crawl_anomaly import CrawlAnomalyDetector
+
+# GA4 Property ID
+GA4_PROPERTY_ID = "506980538"
+
+SCRIPTS_DIR = Path(__file__).parent
+
+# Seconds between polls; realtime requests draw on the property's token quota
+DEFAULT_INTERVAL = 60
+MIN_INTERVAL = 10
+
+# Minutes of history a realtime report covers (60 on GA4 360 properties)
+DEFAULT_WINDOW = 30
+
+# Rows per realtime request (minute × event × page × country)
+REALTIME_ROW_LIMIT = 100000
+
+# Events sent by the concierge (src/lib/analytics.ts)
+CONCIERGE_EVENTS = frozenset([
+    'chat_query',
+    'chat_response',
+    'article_mentioned',
+    'article_clicked',
+    'contact_form_opened',
+    'contact_form_submitted',
+])
+
+# Distinct keys classified before the cache is cleared (long-running monitors)
+CLASSIFY_CACHE_SIZE = 100000
+
+# Per-poll activity needed before a label can be flagged as a burst
+SPIKE_MIN_POLLS = 10
+
+# Consecutive failed polls before giving up
+MAX_FAILURES = 5
+
+
+def load_script(filename: str):
+    """Import a hyphenated script as a module (its main() is not run)."""
+    path = SCRIPTS_DIR / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_ga4_client():
+    """Initialize GA4 client with credentials from environment or file."""
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+
+    credentials_b64 = os.getenv('GA4_SERVICE_ACCOUNT_KEY')
+
+    if credentials_b64:
+        credentials_json = json.loads(base64.b64decode(credentials_b64))
+    else:
+        with open('ga4-service-account.json', 'r') as f:
+            credentials_json = json.load(f)
+
+    return BetaAnalyticsDataClient.from_service_account_info(credentials_json)
+
+
+def build_request(property_id: str, window: int, agent_dimension: Optional[str] = None):
+    """Realtime report of event counts by minute, event, page title, country (and agent)."""
+    from google.analytics.data_v1beta.types import Dimension, Metric, MinuteRange, RunRealtimeReportRequest
+
+    dimensions = ['minutesAgo', 'eventName', 'unifiedScreenName', 'country']
+    if agent_dimension:
+        dimensions.append(agent_dimension)
+    return RunRealtimeReportRequest(
+        property=f"properties/{property_id}",
+        dimensions=[Dimension(name=name) for name in dimensions],
+        metrics=[Metric(name="eventCount")],
+        minute_ranges=[MinuteRange(start_minutes_ago=window - 1, end_minutes_ago=0)],
+        limit=REALTIME_ROW_LIMIT,
+    )
+
+
+def read_rows(response) -> List[Tuple[int, Tuple[str, ...], int]]:
+    """(minutes ago, (event, page, country[, agent]), event count) per response row."""
+    intern = sys.intern
+    rows = []
+    for row in response.rows:
+        values = row.dimension_values
+        key = tuple(intern(value.value) for value in values[1:])
+        rows.append((int(values[0].value), key, int(row.metric_values[0].value)))
+    return rows
+
+
+class RealtimeDeltas:
+    """Turns successive realtime reports into the events that arrived between them.
+
+    Counts are kept per (minutes ago, key) from the previous poll. A minute
+    that was m minutes ago then is m + shift minutes ago now, where shift is
+    normally the whole minutes elapsed between polls; GA4's clock and ours
+    can straddle a minute boundary differently, so the neighbouring shifts
+    are tried too and the one explaining the rows with the fewest new
+    events wins (counts only grow, so a misaligned window looks like a
+    burst of new events).
+    """
+
+    def __init__(self):
+        self.previous: Dict[Tuple[int, Tuple[str, ...]], int] = {}
+        self.previous_minute: Optional[int] = None
+
+    def _new_events(self, rows, shift: int) -> int:
+        previous = self.previous
+        return sum(max(0, count - previous.get((minutes_ago - shift, key), 0))
+                   for minutes_ago, key, count in rows)
+
+    def update(self, rows: List[Tuple[int, Tuple[str, ...], int]],
+               polled_at: float) -> List[Tuple[int, Tuple[str, ...], int, int]]:
+        """Apply one poll; returns (minutes ago, key, new events, count) for rows that grew."""
+        minute = int(polled_at // 60)
+        shift = 0
+        if self.previous_minute is not None:
+            expected = minute - self.previous_minute
+            candidates = [expected] + [shift for shift in (expected - 1, expected + 1) if shift >= 0]
+            shift = min(candidates, key=lambda shift: self._new_events(rows, shift))
+
+        previous = self.previous
+        current = {}
+        changes = []
+        for minutes_ago, key, count in rows:
+            seen = previous.get((minutes_ago - shift, key), 0)
+            if count > seen:
+                changes.append((minutes_ago, key, count - seen, count))
+            # A count that dips (late attribution, sampling) isn't counted again when it recovers
+            current[(minutes_ago, key)] = max(count, seen)
+
+        self.previous = current
+        self.previous_minute = minute
+        return changes
+
+
+class Classifier:
+    """Labels (event, page, country[, agent]) keys as bot, article and concierge activity."""
+
+    def __init__(self, classify_bot: Callable[[str], Optional[str]]):
+        self.classify_bot = classify_bot
+        self.index = get_article_index()
+        self._cache: Dict[Tuple[str, ...], Dict] = {}
+
+    def __call__(self, key: Tuple[str, ...]) -> Dict:
+        labels = self._cache.get(key)
+        if labels is None:
+            if len(self._cache) >= CLASSIFY_CACHE_SIZE:
+                self._cache.clear()
+            event, page = key[0], key[1]
+            article = self.index.resolve_title(page)
+            labels = self._cache[key] = {
+                'bot': self.classify_bot(key[3]) if len(key) > 3 else None,
+                'article': f"/insights/{article['slug']}" if article else None,
+                'concierge': event in CONCIERGE_EVENTS,
+            }
+        return labels
+
+
+def summarize(changes, classify: Classifier) -> Dict[str, Dict[str, int]]:
+    """New events per bot, per article page view and per concierge event."""
+    summary = {'events': {}, 'bots': {}, 'articles': {}, 'concierge': {}}
+    for _, key, delta, _ in changes:
+        labels = classify(key)
+        event = key[0]
+        summary['events'][event] = summary['events'].get(event, 0) + delta
+        if labels['bot']:
+            summary['bots'][labels['bot']] = summary['bots'].get(labels['bot'], 0) + delta
+        if labels['article'] and event == 'page_view':
+            summary['articles'][labels['article']] = summary['articles'].get(labels['article'], 0) + delta
+        if labels['concierge']:
+            summary['concierge'][event] = summary['concierge'].get(event, 0) + delta
+    return summary
+
+
+def detect_bursts(detector: CrawlAnomalyDetector, summary: Dict[str, Dict[str, int]], stamp: str) -> List[Dict]:
+    """Feed this poll's activity per label (zero for quiet labels) and return surges."""
+    values = {f"{group}:{label}": count for group in ('bots', 'articles', 'concierge')
+              for label, count in summary[group].items()}
+    alerts = []
+    for source in sorted(set(detector.sources) | set(values)):
+        alert = detector.update(source, stamp, float(values.get(source, 0)))
+        if alert and alert['kind'] == 'surge':
+            alerts.append(alert)
+    return alerts
+
+
+def print_poll(polled_at: datetime, summary: Dict[str, Dict[str, int]], alerts: List[Dict], top: int):
+    total = sum(summary['events'].values())
+    events = ', '.join(f"{name} {count}" for name, count in
+                       sorted(summary['events'].items(), key=lambda x: x[1], reverse=True)[:4])
+    print(f"\n[{polled_at:%H:%M:%S}] +{total} events ({events})")
+    for icon, group in (('🤖', 'bots'), ('💬', 'concierge'), ('📄', 'articles')):
+        for label, count in sorted(summary[group].items(), key=lambda x: x[1], reverse=True)[:top]:
+            print(f"  {icon} {label:<50} +{count}")
+    for alert in alerts:
+        label = alert['source'].split(':', 1)[1]
+        print(f"  🔥 Burst: {label} +{alert['value']:.0f} this poll "
+              f"(usually {alert['expected']:.1f}, z={alert['z']:.1f})")
+
+
+def write_jsonl(feed, polled_at: datetime, changes, classify: Classifier, alerts: List[Dict]):
+    """One object per changed (minute, event, page, country[, agent]) row, then one per burst."""
+    now = polled_at.isoformat(timespec='seconds')
+    for minutes_ago, key, delta, count in changes:
+        entry = {'time': now, 'minutes_ago': minutes_ago, 'event': key[0], 'page': key[1],
+                 'country': key[2], 'new': delta, 'count': count}
+        if len(key) > 3:
+            entry['agent'] = key[3]
+        entry.update(classify(key))
+        feed.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    for alert in alerts:
+        group, label = alert['source'].split(':', 1)
+        feed.write(json.dumps({'time': now, 'burst': group, 'label': label, 'new': alert['value'],
+                               'expected': round(alert['expected'], 2), 'z': round(alert['z'], 2)},
+                              separators=(',', ':')) + '\n')
+    feed.flush()
+
+
+def print_totals(totals: Dict[str, Dict[str, int]], polls: int, top: int):
+    print("\n" + "=" * 70)
+    print(f"  📊 REALTIME SUMMARY ({polls} polls after the baseline)")
+    print("=" * 70)
+    print(f"\nNew events: {sum(totals['events'].values())}")
+    for icon, title, group in (('🤖', 'AI BOTS', 'bots'), ('💬', 'CONCIERGE EVENTS', 'concierge'),
+                               ('📄', 'ARTICLE PAGE VIEWS', 'articles')):
+        if totals[group]:
+            print(f"\n{icon} {title}:")
+            for label, count in sorted(totals[group].items(), key=lambda x: x[1], reverse=True)[:top]:
+                print(f"  • {label}: {count}")
+
+
+def monitor(client, args, classify: Classifier, feed=None) -> Tuple[Dict[str, Dict[str, int]], int]:
+    """Poll until args.polls polls have followed the baseline, or until interrupted.
+
+    Returns the new events per group and label, and the polls counted.
+    """
+    request = build_request(args.property, args.window, args.agent_dimension)
+    deltas = RealtimeDeltas()
+    detector = CrawlAnomalyDetector(threshold=args.spike_threshold, min_periods=SPIKE_MIN_POLLS)
+    totals = {'events': {}, 'bots': {}, 'articles': {}, 'concierge': {}}
+    status = sys.stderr if feed is sys.stdout else sys.stdout
+    baseline = False
+    polls = failures = 0
+    next_poll = time.monotonic()
+
+    try:
+        while args.polls is None or polls < args.polls:
+            try:
+                response = client.run_realtime_report(request)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                print(f"⚠️  Realtime poll failed ({failures}/{MAX_FAILURES}): {e}", file=sys.stderr)
+                if failures >= MAX_FAILURES:
+                    raise
+            else:
+                polled_at = datetime.now()
+                changes = deltas.update(read_rows(response), polled_at.timestamp())
+                summary = summarize(changes, classify)
+                if not baseline:
+                    # The first poll is the whole trailing window: a baseline, not news
+                    baseline = True
+                    print(f"📡 Baseline: {sum(summary['events'].values())} events in the last "
+                          f"{args.window} minutes ({len(summary['bots'])} AI bots, "
+                          f"{len(summary['articles'])} articles); polling every {args.interval}s", file=status)
+                else:
+                    polls += 1
+                    for group, counts in summary.items():
+                        for label, count in counts.items():
+                            totals[group][label] = totals[group].get(label, 0) + count
+                    alerts = detect_bursts(detector, summary, f"{polled_at:%Y%m%d%H%M%S}")
+                    if feed is not None:
+                        write_jsonl(feed, polled_at, changes, classify, alerts)
+                    elif changes:
+                        print_poll(polled_at, summary, alerts, args.top)
+                    if args.polls is not None and polls >= args.polls:
+                        break
+
+            # Fixed schedule, so slow polls don't drift the interval
+            next_poll += args.interval
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+
+    return totals, polls
+
+
+def main():
+    """Main monitor loop."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Watch AI crawler and concierge activity in GA4 realtime reports')
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL,
+                        help=f'Seconds between polls (default: {DEFAULT_INTERVAL}, minimum {MIN_INTERVAL})')
+    parser.add_argument('--polls', type=int, default=None,
+                        help='Stop after this many polls following the baseline (default: run until interrupted)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help=f'Minutes the realtime report covers (default: {DEFAULT_WINDOW}; 60 on GA4 360)')
+    parser.add_argument('--property', default=GA4_PROPERTY_ID, help='GA4 property ID')
+    parser.add_argument('--agent-dimension', default=None,
+                        help='User-scoped custom dimension holding the visitor agent, for AI_BOTS '
+                             'classification (e.g. customUser:ai_agent)')
+    parser.add_argument('--jsonl', metavar='PATH', default=None,
+                        help="Write changes as JSON lines to PATH ('-' for stdout) instead of the terminal view")
+    parser.add_argument('--spike-threshold', type=float, default=3.0,
+                        help='Flag a label whose activity this poll is this many standard deviations above its mean')
+    parser.add_argument('--top', type=int, default=10, help='Labels shown per group each poll')
+    args = parser.parse_args()
+
+    if args.interval < MIN_INTERVAL:
+        parser.error(f"--interval must be at least {MIN_INTERVAL} seconds")
+    if not 1 <= args.window <= 60:
+        parser.error("--window must be 1-60 minutes")
+
+    bots = load_script('analyze-ai-bot-traffic.py')
+    classify = Classifier(bots.classify_ai_bot)
+    if not args.agent_dimension:
+        print("ℹ️  No --agent-dimension: AI bots can't be identified from realtime reports alone", file=sys.stderr)
+
+    feed = None
+    if args.jsonl == '-':
+        feed = sys.stdout
+    elif args.jsonl:
+        Path(args.jsonl).parent.mkdir(parents=True, exist_ok=True)
+        feed = open(args.jsonl, 'a', encoding='utf-8')
+
+    try:
+        client = get_ga4_client()
+        totals, polls = monitor(client, args, classify, feed)
+    except Exception as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if feed is not None and feed is not sys.stdout:
+            feed.close()
+
+    if feed is None:
+        print_totals(totals, polls, args.top)
+
+
+if __name__ == "__main__":
+    main()
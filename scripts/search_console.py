@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Search Console Export Store
+
+Ingests Search Console query × page × date rows from local export files
+into an indexed SQLite store, and joins them with GA4 landing-page
+metrics, so query-to-article performance covers real organic queries
+(GA4's sessionGoogleAdsQuery is almost always (not set) for them):
+- Files are streamed row by row (CSV or JSON lines, .gz ok) and written
+  in batches, so exports of any size ingest in constant memory
+- Rows are stored per (page path, query, date, URL) in a table clustered
+  by normalized page path, with a date index for window lookups
+- Within a file, rows split further (country, device) are summed; a
+  later file replaces the rows it shares with earlier ones, so
+  overlapping exports never double-count. Files already ingested
+  unchanged are skipped
+- query_performance() streams the grouped store rows past a hash table
+  of GA4 landing-page metrics keyed by the same normalized path
+
+Accepted columns (case-insensitive; Search Console bulk export, the
+Search Analytics API, or the Performance report export):
+- date: data_date or date (YYYY-MM-DD or YYYYMMDD)
+- query: query; anonymized queries (is_anonymized_query, or an empty
+  query) are kept as (anonymized) so page totals stay complete
+- page: url, page or landing_page
+- clicks, impressions
+- position (average, 1-based) or sum_position (bulk export, zero-based
+  sum of top positions)
+- search_type: only WEB rows are kept when present
+API rows may carry {"keys": [query, page, date], ...} instead.
+
+Used by analyze-ai-bot-traffic.py (see --search-console-db).
+"""
+
+import csv
+import gzip
+import heapq
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from article_index import normalize_path
+
+SCHEMA_VERSION = 1
+
+# Rows written per executemany batch while streaming a file
+BATCH_SIZE = 10000
+
+# Order of "keys" in Search Analytics API rows
+API_KEYS = ('query', 'page', 'date')
+
+ANONYMIZED_QUERY = '(anonymized)'
+
+COLUMN_ALIASES = {
+    'data_date': 'date',
+    'top_queries': 'query',
+    'url': 'page',
+    'landing_page': 'page',
+    'top_pages': 'page',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_rows (
+    path TEXT NOT NULL,
+    query TEXT NOT NULL,
+    date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    clicks INTEGER NOT NULL,
+    impressions INTEGER NOT NULL,
+    position_sum REAL NOT NULL,
+    PRIMARY KEY (path, query, date, url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS search_rows_date ON search_rows (date);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    first_date TEXT,
+    last_date TEXT,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+
+def _open_text(path: Path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    return opener(path, 'rt', encoding='utf-8-sig', errors='replace', newline='')
+
+
+def _column(name: str) -> str:
+    name = name.strip().lower().replace(' ', '_')
+    return COLUMN_ALIASES.get(name, name)
+
+
+def _records(path: Path) -> Iterator[Dict]:
+    """Records from a CSV or JSON-lines file, keyed by canonical column name."""
+    stem = path.name[:-3] if path.suffix == '.gz' else path.name
+    with _open_text(path) as f:
+        if stem.endswith(('.jsonl', '.json', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    if 'keys' in record:
+                        record.update(zip(API_KEYS, record.pop('keys')))
+                    yield {_column(key): value for key, value in record.items()}
+        else:
+            reader = csv.reader(f)
+            columns = [_column(name) for name in next(reader, [])]
+            for row in reader:
+                yield dict(zip(columns, row))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_date(value: str) -> Optional[str]:
+    value = value.strip()
+    if len(value) == 8 and value.isdigit():
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _number(value, convert=int):
+    if value is None or value == '':
+        return convert(0)
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    return convert(float(value)) if convert is int else convert(value)
+
+
+def parse_rows(path: Path, skipped: Dict[str, int]) -> Iterator[Tuple]:
+    """(path, query, date, url, clicks, impressions, position_sum) per usable record."""
+    intern = sys.intern
+    for record in _records(path):
+        search_type = record.get('search_type')
+        if search_type and str(search_type).upper() != 'WEB':
+            skipped['search_type'] = skipped.get('search_type', 0) + 1
+            continue
+        date = _normalize_date(str(record.get('date') or ''))
+        url = str(record.get('page') or '').strip()
+        if date is None or not url or 'query' not in record:
+            skipped['incomplete'] = skipped.get('incomplete', 0) + 1
+            continue
+        query = str(record.get('query') or '').strip()
+        anonymized = str(record.get('is_anonymized_query', '')).lower() in ('true', '1')
+        try:
+            clicks = _number(record.get('clicks'))
+            impressions = _number(record.get('impressions'))
+            if 'sum_position' in record:
+                position_sum = _number(record['sum_position'], float)
+            else:
+                position_sum = max(_number(record.get('position'), float) - 1, 0.0) * impressions
+        except ValueError:
+            skipped['invalid'] = skipped.get('invalid', 0) + 1
+            continue
+        yield (intern(normalize_path(url)), ANONYMIZED_QUERY if anonymized or not query else query,
+               date, intern(url), clicks, impressions, position_sum)
+
+
+def _batches(rows: Iterable[Tuple], size: int = BATCH_SIZE) -> Iterator[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SearchConsoleStore:
+    """SQLite store of Search Console rows, clustered by normalized page path."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{self.path} has schema version {version}, expected {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+        self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.db.close()
+
+    def ingest(self, file) -> Dict:
+        """Stream one export file into the store; unchanged files already ingested are skipped."""
+        file = Path(file)
+        stat = file.stat()
+        key = str(file.resolve())
+        known = self.db.execute("SELECT size, mtime_ns, rows FROM ingested_files WHERE file = ?", (key,)).fetchone()
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return {'file': file.name, 'rows': known[2], 'skipped': {}, 'unchanged': True}
+
+        skipped: Dict[str, int] = {}
+        with self.db:
+            # Sum the file's own breakdowns (country, device) first, then
+            # replace whatever earlier files stored for the same rows
+            self.db.execute("DROP TABLE IF EXISTS temp.staging")
+            self.db.execute("CREATE TEMP TABLE staging AS SELECT * FROM search_rows WHERE 0")
+            self.db.execute("CREATE UNIQUE INDEX temp.staging_key ON staging (path, query, date, url)")
+            for batch in _batches(parse_rows(file, skipped)):
+                self.db.executemany(
+                    "INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (path, query, date, url) DO UPDATE SET "
+                    "clicks = clicks + excluded.clicks, impressions = impressions + excluded.impressions, "
+                    "position_sum = position_sum + excluded.position_sum", batch)
+            rows, first_date, last_date = self.db.execute(
+                "SELECT COUNT(*), MIN(date), MAX(date) FROM staging").fetchone()
+            self.db.execute(
+                "INSERT INTO search_rows SELECT * FROM staging WHERE 1 "
+                "ON CONFLICT (path, query, date, url) DO UPDATE SET "
+                "clicks = excluded.clicks, impressions = excluded.impressions, position_sum = excluded.position_sum")
+            self.db.execute("DROP TABLE temp.staging")
+            self.db.execute(
+                "INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, rows, first_date, last_date,
+                 datetime.now().isoformat(timespec='seconds')))
+        return {'file': file.name, 'rows': rows, 'skipped': skipped, 'unchanged': False,
+                'first_date': first_date, 'last_date': last_date}
+
+    def date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.db.execute("SELECT MIN(date), MAX(date) FROM search_rows").fetchone()
+
+    def page_queries(self, start: str, end: str) -> Iterator[Tuple[str, str, int, int, float]]:
+        """(path, query, clicks, impressions, position_sum) summed over the window's dates and URLs."""
+        return self.db.execute(
+            "SELECT path, query, SUM(clicks), SUM(impressions), SUM(position_sum) FROM search_rows "
+            "WHERE date BETWEEN ? AND ? GROUP BY path, query", (start, end))
+
+
+def average_position(position_sum: float, impressions: int) -> float:
+    """1-based average top position, as Search Console reports it."""
+    return position_sum / impressions + 1 if impressions else 0.0
+
+
+def query_performance(rows: Iterable[Tuple[str, str, int, int, float]],
+                      landing_pages: Dict[str, Dict], top: int = 10) -> Dict:
+    """Hash-join streamed page × query rows with GA4 landing-page metrics.
+
+    landing_pages (the build side) maps normalized path → {'sessions',
+    'engaged_sessions'}; the store rows are the probe side and are never
+    held in memory: only per-page totals and the top queries by clicks
+    are kept. Each query's estimated sessions are its page's organic
+    landing sessions in proportion to its share of the page's clicks.
+    """
+    pages: Dict[str, Dict] = {}
+    queries: List[Tuple] = []
+    for path, query, clicks, impressions, position_sum in rows:
+        page = pages.get(path)
+        if page is None:
+            landing = landing_pages.get(path)
+            page = pages[path] = {
+                'clicks': 0, 'impressions': 0, 'position_sum': 0.0, 'queries': 0,
+                'top_query': None, 'top_query_clicks': -1,
+                'sessions': landing['sessions'] if landing else 0,
+                'engaged_sessions': landing['engaged_sessions'] if landing else 0,
+                'matched': landing is not None,
+            }
+        page['clicks'] += clicks
+        page['impressions'] += impressions
+        page['position_sum'] += position_sum
+        page['queries'] += 1
+        if query == ANONYMIZED_QUERY:
+            continue
+        if clicks > page['top_query_clicks']:
+            page['top_query'], page['top_query_clicks'] = query, clicks
+
+        entry = (clicks, impressions, query, path, position_sum)
+        if len(queries) < top:
+            heapq.heappush(queries, entry)
+        elif entry > queries[0]:
+            heapq.heapreplace(queries, entry)
+
+    top_queries = []
+    for clicks, impressions, query, path, position_sum in sorted(queries, reverse=True):
+        page = pages[path]
+        top_queries.append({
+            'query': query,
+            'path': path,
+            'clicks': clicks,
+            'impressions': impressions,
+            'ctr': clicks / impressions if impressions else 0.0,
+            'position': average_position(position_sum, impressions),
+            'sessions': page['sessions'] * clicks / page['clicks'] if page['matched'] and page['clicks'] else None,
+            'engagement_rate': page['engaged_sessions'] / page['sessions'] if page['sessions'] else None,
+        })
+    return {'pages': pages, 'top_queries': top_queries}
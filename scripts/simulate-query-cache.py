@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Query Cache Replay Simulator
+
+Sizes the answer cache proposed in QUERY_CACHE_PLAN.md before it is built,
+by replaying recorded concierge queries against candidate cache policies:
+- Tiers: exact match, normalized match, similarity match (MinHash/LSH),
+  each switchable on or off
+- Eviction: LRU or LFU, bounded by entry count and/or bytes
+- Expiry: optional TTL on cached answers
+
+Reports, per policy:
+- Hit ratio overall and per tier
+- Input/output tokens, API cost and latency saved
+- Cache memory footprint over time
+
+Query records come from the same logs as cluster-concierge-queries.py. Token
+counts and latency are taken from each record (input_tokens, output_tokens,
+latency_ms) when present, otherwise from the --avg-* defaults.
+
+Usage:
+    python scripts/simulate-query-cache.py queries.jsonl
+    python scripts/simulate-query-cache.py queries.jsonl --policy lfu --max-entries 500 --ttl-hours 168
+    python scripts/simulate-query-cache.py queries.jsonl --tiers exact,normalized
+    python scripts/simulate-query-cache.py queries.jsonl --compare
+"""
+
+import heapq
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from minhash import LSHIndex, MinHasher, estimate_jaccard
+from query_logs import normalize_query, query_shingles, read_query_records
+
+TIERS = ['exact', 'normalized', 'similarity']
+
+# Haiku list prices (USD per token), as in analyze-token-usage.sh
+INPUT_TOKEN_COST = 0.00000025
+OUTPUT_TOKEN_COST = 0.00000125
+
+# Fallbacks for records without usage data
+DEFAULT_INPUT_TOKENS = 3000
+DEFAULT_OUTPUT_TOKENS = 300
+DEFAULT_LATENCY_MS = 2000
+CACHE_LATENCY_MS = 50
+
+# Rough per-entry bookkeeping overhead (key, timestamps, counters), bytes
+ENTRY_OVERHEAD_BYTES = 200
+BYTES_PER_OUTPUT_TOKEN = 4
+
+
+class LRUPolicy:
+    """Evict the least recently used entry."""
+
+    name = 'lru'
+
+    def __init__(self):
+        self._order: 'OrderedDict[str, None]' = OrderedDict()
+
+    def insert(self, key: str, entry: Dict):
+        self._order[key] = None
+
+    def touch(self, key: str, entry: Dict):
+        self._order.move_to_end(key)
+
+    def remove(self, key: str):
+        self._order.pop(key, None)
+
+    def victim(self) -> str:
+        return next(iter(self._order))
+
+
+class LFUPolicy:
+    """Evict the least frequently used entry (ties: least recently used)."""
+
+    name = 'lfu'
+
+    def __init__(self):
+        self._heap: List = []
+        self._current: Dict[str, tuple] = {}
+        self._tick = 0
+
+    def _push(self, key: str, entry: Dict):
+        self._tick += 1
+        item = (entry['usage_count'], self._tick, key)
+        self._current[key] = item
+        heapq.heappush(self._heap, item)
+
+    def insert(self, key: str, entry: Dict):
+        self._push(key, entry)
+
+    def touch(self, key: str, entry: Dict):
+        self._push(key, entry)
+
+    def remove(self, key: str):
+        self._current.pop(key, None)
+
+    def victim(self) -> str:
+        while True:
+            item = self._heap[0]
+            if self._current.get(item[2]) == item:
+                return item[2]
+            heapq.heappop(self._heap)
+
+
+POLICIES = {'lru': LRUPolicy, 'lfu': LFUPolicy}
+
+
+class CacheSimulator:
+    """Replays queries through a tiered cache and accumulates savings."""
+
+    def __init__(self, tiers: Iterable[str] = TIERS, policy: str = 'lru',
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, similarity: float = 0.7):
+        self.tiers = set(tiers)
+        unknown = self.tiers - set(TIERS)
+        if unknown:
+            raise ValueError(f"Unknown cache tiers: {', '.join(sorted(unknown))}")
+        self.policy = POLICIES[policy]()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+
+        self.entries: Dict[str, Dict] = {}
+        self.exact_index: Dict[str, str] = {}
+        self.bytes = 0
+        self.hasher = MinHasher() if 'similarity' in self.tiers else None
+        self.lsh = LSHIndex(self.hasher) if self.hasher else None
+
+        self.stats = {
+            'queries': 0,
+            'hits': dict.fromkeys(TIERS, 0),
+            'evictions': 0,
+            'expired': 0,
+            'input_tokens_saved': 0,
+            'output_tokens_saved': 0,
+            'latency_saved_ms': 0.0,
+            'peak_bytes': 0,
+            'peak_entries': 0,
+        }
+        # (period label, queries, hits, entries, bytes)
+        self.timeline: List[tuple] = []
+        self._period = None
+        self._period_queries = 0
+        self._period_hits = 0
+        # Entry created by the current miss, sized once its answer is known
+        self._pending_entry: Optional[Dict] = None
+
+    def _entry_key(self, exact_key: str, normalized: str) -> str:
+        if normalized and self.tiers & {'normalized', 'similarity'}:
+            return normalized
+        return exact_key
+
+    def _alive(self, key: str, now: Optional[float]) -> bool:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if self.ttl_seconds and now is not None and entry['created'] is not None:
+            if now - entry['created'] > self.ttl_seconds:
+                self._remove(key)
+                self.stats['expired'] += 1
+                return False
+        return True
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.bytes -= entry['size']
+        self.policy.remove(key)
+        for exact_key in entry['exact_keys']:
+            if self.exact_index.get(exact_key) == key:
+                del self.exact_index[exact_key]
+        if self.lsh is not None and entry['signature'] is not None:
+            self.lsh.remove(key, entry['signature'])
+
+    def lookup(self, query: str, now: Optional[float]) -> Optional[str]:
+        """Return the tier that answers the query, or None on a miss."""
+        exact_key = query.strip().lower()
+        normalized = normalize_query(query)
+
+        if 'exact' in self.tiers:
+            key = self.exact_index.get(exact_key)
+            if key is not None and self._alive(key, now):
+                return self._hit('exact', key, now)
+
+        if 'normalized' in self.tiers and normalized and self._alive(normalized, now):
+            return self._hit('normalized', normalized, now, exact_key)
+
+        signature = None
+        if self.lsh is not None and normalized:
+            signature = self.hasher.signature(query_shingles(normalized))
+            best_key, best_score = None, self.similarity
+            for candidate in self.lsh.query(signature):
+                score = estimate_jaccard(signature, self.entries[candidate]['signature'])
+                # Expired candidates are dropped here, so a live runner-up can still answer
+                if score >= best_score and self._alive(candidate, now):
+                    best_key, best_score = candidate, score
+            if best_key is not None:
+                return self._hit('similarity', best_key, now, exact_key)
+
+        self._insert(self._entry_key(exact_key, normalized), exact_key, signature, now)
+        return None
+
+    def _hit(self, tier: str, key: str, now: Optional[float], exact_key: Optional[str] = None) -> str:
+        entry = self.entries[key]
+        entry['usage_count'] += 1
+        entry['last_used'] = now
+        if exact_key is not None and 'exact' in self.tiers and exact_key not in self.exact_index:
+            self.exact_index[exact_key] = key
+            entry['exact_keys'].append(exact_key)
+        self.policy.touch(key, entry)
+        return tier
+
+    def _insert(self, key: str, exact_key: str, signature: Optional[List[int]], now: Optional[float]):
+        if key in self.entries:
+            self._remove(key)
+        entry = {
+            'size': 0,
+            'usage_count': 1,
+            'created': now,
+            'last_used': now,
+            'exact_keys': [exact_key] if 'exact' in self.tiers else [],
+            'signature': signature,
+        }
+        self.entries[key] = entry
+        if 'exact' in self.tiers:
+            self.exact_index[exact_key] = key
+        if self.lsh is not None and signature is not None:
+            self.lsh.insert(key, signature)
+        self.policy.insert(key, entry)
+        self._pending_entry = entry
+
+    def _evict(self):
+        while self.entries and (
+            (self.max_entries and len(self.entries) > self.max_entries)
+            or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            self._remove(self.policy.victim())
+            self.stats['evictions'] += 1
+
+    def replay(self, record: Dict, defaults: Dict):
+        now = _timestamp(record.get('timestamp'))
+        input_tokens = int(record.get('input_tokens') or defaults['input_tokens'])
+        output_tokens = int(record.get('output_tokens') or defaults['output_tokens'])
+        latency_ms = float(record.get('latency_ms') or defaults['latency_ms'])
+
+        self._pending_entry = None
+        tier = self.lookup(record['query'], now)
+        self.stats['queries'] += 1
+
+        if tier is not None:
+            self.stats['hits'][tier] += 1
+            self.stats['input_tokens_saved'] += input_tokens
+            self.stats['output_tokens_saved'] += output_tokens
+            self.stats['latency_saved_ms'] += max(latency_ms - CACHE_LATENCY_MS, 0)
+        elif self._pending_entry is not None:
+            # Size the new entry from the answer it would store
+            size = (ENTRY_OVERHEAD_BYTES + len(record['query'].encode('utf-8'))
+                    + output_tokens * BYTES_PER_OUTPUT_TOKEN
+                    + (self.hasher.num_perm * 8 if self.hasher else 0))
+            self._pending_entry['size'] = size
+            self.bytes += size
+            self._evict()
+
+        self.stats['peak_bytes'] = max(self.stats['peak_bytes'], self.bytes)
+        self.stats['peak_entries'] = max(self.stats['peak_entries'], len(self.entries))
+        self._record_timeline(now, tier is not None)
+
+    def _record_timeline(self, now: Optional[float], hit: bool):
+        if now is not None:
+            period = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%d')
+        else:
+            period = f"#{self.stats['queries'] // 1000 * 1000}"
+        if period != self._period:
+            self._flush_period()
+            self._period = period
+        self._period_queries += 1
+        self._period_hits += hit
+
+    def _flush_period(self):
+        if self._period is not None:
+            self.timeline.append((self._period, self._period_queries, self._period_hits,
+                                  len(self.entries), self.bytes))
+        self._period_queries = 0
+        self._period_hits = 0
+
+    def finish(self):
+        self._flush_period()
+        self._period = None
+
+    def hit_ratio(self, tier: Optional[str] = None) -> float:
+        if not self.stats['queries']:
+            return 0.0
+        hits = self.stats['hits'][tier] if tier else sum(self.stats['hits'].values())
+        return hits / self.stats['queries']
+
+    def cost_saved(self) -> float:
+        return (self.stats['input_tokens_saved'] * INPUT_TOKEN_COST
+                + self.stats['output_tokens_saved'] * OUTPUT_TOKEN_COST)
+
+
+def _timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def describe_policy(sim: CacheSimulator) -> str:
+    parts = ['+'.join(t for t in TIERS if t in sim.tiers), sim.policy.name]
+    if sim.max_entries:
+        parts.append(f"≤{sim.max_entries} entries")
+    if sim.max_bytes:
+        parts.append(f"≤{sim.max_bytes // 1024} KB")
+    if sim.ttl_seconds:
+        parts.append(f"TTL {sim.ttl_seconds / 3600:g}h")
+    return ', '.join(parts)
+
+
+def print_report(sim: CacheSimulator, show_timeline: bool = True):
+    stats = sim.stats
+    print(f"\n🗄️  CACHE POLICY: {describe_policy(sim)}")
+    print("=" * 70)
+    print(f"  Queries replayed: {stats['queries']}")
+    print(f"  Hit ratio: {sim.hit_ratio()*100:.1f}%")
+    for tier in TIERS:
+        if tier in sim.tiers:
+            print(f"    • {tier}: {stats['hits'][tier]} hits ({sim.hit_ratio(tier)*100:.1f}%)")
+    print(f"  Tokens saved: {stats['input_tokens_saved']} input, {stats['output_tokens_saved']} output")
+    print(f"  API cost saved: ${sim.cost_saved():.4f}")
+    print(f"  Latency saved: {stats['latency_saved_ms'] / 1000:.1f}s total")
+    print(f"  Peak footprint: {stats['peak_entries']} entries, {stats['peak_bytes'] / 1024:.1f} KB")
+    print(f"  Evictions: {stats['evictions']}, expirations: {stats['expired']}")
+
+    if show_timeline and sim.timeline:
+        print(f"\n  📅 OVER TIME:")
+        for period, queries, hits, entries, size in sim.timeline[-14:]:
+            print(f"    {period}: {queries} queries, {hits / queries * 100:.0f}% hits, "
+                  f"{entries} entries, {size / 1024:.1f} KB")
+
+
+def comparison_grid(args) -> List[Dict]:
+    """Preset policy grid for --compare."""
+    grid = []
+    for tiers in (['exact'], ['exact', 'normalized'], TIERS):
+        for policy in POLICIES:
+            grid.append({'tiers': tiers, 'policy': policy, 'max_entries': args.max_entries,
+                         'max_bytes': args.max_bytes, 'ttl_seconds': args.ttl_seconds,
+                         'similarity': args.similarity})
+    return grid
+
+
+def main():
+    """Replay concierge queries against cache policies."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulate the planned concierge answer cache')
+    parser.add_argument('logs', nargs='+', help="Query log files (JSONL, .gz ok) or '-' for stdin")
+    parser.add_argument('--tiers', default=','.join(TIERS), help='Comma-separated tiers to enable')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='lru', help='Eviction policy')
+    parser.add_argument('--max-entries', type=int, help='Maximum cached answers')
+    parser.add_argument('--max-bytes', type=int, help='Maximum cache size in bytes')
+    parser.add_argument('--ttl-hours', type=float, help='Expire answers after this many hours')
+    parser.add_argument('--similarity', type=float, default=0.7, help='Minimum Jaccard for similarity hits')
+    parser.add_argument('--avg-input-tokens', type=int, default=DEFAULT_INPUT_TOKENS)
+    parser.add_argument('--avg-output-tokens', type=int, default=DEFAULT_OUTPUT_TOKENS)
+    parser.add_argument('--avg-latency-ms', type=float, default=DEFAULT_LATENCY_MS)
+    parser.add_argument('--compare', action='store_true', help='Replay a grid of tier/policy combinations')
+    args = parser.parse_args()
+    args.ttl_seconds = args.ttl_hours * 3600 if args.ttl_hours else None
+
+    defaults = {
+        'input_tokens': args.avg_input_tokens,
+        'output_tokens': args.avg_output_tokens,
+        'latency_ms': args.avg_latency_ms,
+    }
+
+    if args.compare:
+        configs = comparison_grid(args)
+    else:
+        configs = [{'tiers': [t.strip() for t in args.tiers.split(',') if t.strip()],
+                    'policy': args.policy, 'max_entries': args.max_entries,
+                    'max_bytes': args.max_bytes, 'ttl_seconds': args.ttl_seconds,
+                    'similarity': args.similarity}]
+
+    try:
+        simulators = [CacheSimulator(**config) for config in configs]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    # One pass over the logs feeds every simulator
+    for record in read_query_records(args.logs):
+        for sim in simulators:
+            sim.replay(record, defaults)
+
+    if not simulators[0].stats['queries']:
+        print("❌ No queries found in the given logs")
+        sys.exit(1)
+
+    for sim in simulators:
+        sim.finish()
+        print_report(sim, show_timeline=not args.compare)
+
+    if args.compare:
+        print(f"\n📊 COMPARISON:")
+        for sim in sorted(simulators, key=lambda s: s.hit_ratio(), reverse=True):
+            print(f"  {sim.hit_ratio()*100:5.1f}% hits, ${sim.cost_saved():.4f} saved, "
+                  f"{sim.stats['peak_bytes'] / 1024:.0f} KB peak - {describe_policy(sim)}")
+    print("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Probabilistic Sketches for Long-Horizon Traffic Statistics
+
+Fixed-memory, mergeable summaries so a year of traffic can be answered by
+merging small per-day sketches instead of keeping every row:
+- HyperLogLog: distinct counts (unique pages, unique sources, unique bots)
+- Count-Min Sketch: approximate per-item counts
+- TopK: Count-Min plus a bounded heavy-hitters heap for top crawled paths
+
+Error bounds (defaults):
+- HyperLogLog, precision p=12 (4096 one-byte registers, 4 KB):
+  standard error 1.04/sqrt(2^p) ≈ 1.6% of the true distinct count.
+- Count-Min, width w=1024, depth d=4 (16 KB of 32-bit counters):
+  estimates never undercount, and overcount by at most e/w ≈ 0.27% of the
+  total count N with probability 1 - e^-d ≈ 98%.
+- TopK keeps k candidates ranked by their Count-Min estimate, so any item
+  with a true count above the k-th largest estimate plus the Count-Min
+  error is reported.
+
+All sketches hash with unkeyed BLAKE2b, so sketches built in
+different processes (or on different days) can be merged. Merging requires
+identical parameters (precision, width, depth).
+
+Used by analyze-ai-bot-traffic.py (see --sketch-dir).
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+import math
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_HLL_PRECISION = 12
+DEFAULT_CMS_WIDTH = 1024
+DEFAULT_CMS_DEPTH = 4
+DEFAULT_TOP_K = 20
+
+
+def _hash64(item: str) -> int:
+    """Stable 64-bit hash (Python's hash() is randomized per process)."""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _hash128(item: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes for double hashing."""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+def _encode_bytes(data: bytes) -> str:
+    return base64.b64encode(zlib.compress(data, 9)).decode('ascii')
+
+
+def _decode_bytes(data: str) -> bytes:
+    return zlib.decompress(base64.b64decode(data))
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2^precision one-byte registers."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be 4-18, got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, item: str):
+        h = _hash64(item)
+        index = h >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        w = h & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - w.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = self.m
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Small-range correction: linear counting is more accurate here
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_dict(self) -> Dict:
+        return {'precision': self.precision, 'registers': _encode_bytes(bytes(self.registers))}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        sketch = cls(data['precision'])
+        sketch.registers = bytearray(_decode_bytes(data['registers']))
+        return sketch
+
+
+class CountMinSketch:
+    """Approximate counts in a depth × width table of 32-bit counters."""
+
+    def __init__(self, width: int = DEFAULT_CMS_WIDTH, depth: int = DEFAULT_CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = array('I', bytes(4 * width * depth))
+
+    def _cells(self, item: str) -> List[int]:
+        h1, h2 = _hash128(item)
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Add count for item and return the updated estimate."""
+        self.total += count
+        estimate = None
+        for cell in self._cells(item):
+            value = self.table[cell] + count
+            self.table[cell] = value
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(self.table[cell] for cell in self._cells(item))
+
+    def merge(self, other: 'CountMinSketch'):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        self.total += other.total
+        for i, value in enumerate(other.table):
+            if value:
+                self.table[i] += value
+
+    def to_dict(self) -> Dict:
+        table = array(self.table.typecode, self.table)
+        if sys.byteorder == 'big':
+            table.byteswap()
+        return {
+            'width': self.width,
+            'depth': self.depth,
+            'total': self.total,
+            'table': _encode_bytes(table.tobytes()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CountMinSketch':
+        sketch = cls(data['width'], data['depth'])
+        sketch.total = data['total']
+        table = array(sketch.table.typecode)
+        table.frombytes(_decode_bytes(data['table']))
+        if sys.byteorder == 'big':
+            table.byteswap()
+        sketch.table = table
+        return sketch
+
+
+class TopK:
+    """Heavy hitters: Count-Min estimates plus a bounded min-heap of candidates."""
+
+    def __init__(self, k: int = DEFAULT_TOP_K, width: int = DEFAULT_CMS_WIDTH,
+                 depth: int = DEFAULT_CMS_DEPTH):
+        self.k = k
+        self.cms = CountMinSketch(width, depth)
+        # item -> current estimate; the heap may hold stale (lower) entries
+        self.candidates: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, item: str, count: int = 1):
+        estimate = self.cms.add(item, count)
+        self._offer(item, estimate)
+
+    def _offer(self, item: str, estimate: int):
+        if item in self.candidates or len(self.candidates) < self.k:
+            self.candidates[item] = estimate
+            heapq.heappush(self._heap, (estimate, item))
+        else:
+            smallest = self._smallest()
+            if estimate <= smallest[0]:
+                return
+            del self.candidates[smallest[1]]
+            heapq.heappop(self._heap)
+            self.candidates[item] = estimate
+            heapq.heappush(self._heap, (estimate, item))
+
+        # Stale entries accumulate as estimates grow; rebuild occasionally
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(est, item) for item, est in self.candidates.items()]
+            heapq.heapify(self._heap)
+
+    def _smallest(self) -> Tuple[int, str]:
+        """Return the live minimum heap entry, discarding stale ones."""
+        while True:
+            estimate, item = self._heap[0]
+            if self.candidates.get(item) == estimate:
+                return estimate, item
+            heapq.heappop(self._heap)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        ranked = sorted(self.candidates.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:n or self.k]
+
+    def merge(self, other: 'TopK'):
+        self.cms.merge(other.cms)
+        items = set(self.candidates) | set(other.candidates)
+        self.candidates = {}
+        self._heap = []
+        for item in items:
+            self._offer(item, self.cms.estimate(item))
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'cms': self.cms.to_dict(), 'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TopK':
+        sketch = cls(data['k'])
+        sketch.cms = CountMinSketch.from_dict(data['cms'])
+        for item, estimate in data['candidates'].items():
+            sketch._offer(item, estimate)
+        return sketch
+
+
+class TrafficSketch:
+    """Per-period traffic summary: distinct pages/sources/bots and top paths per bot."""
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.pages = HyperLogLog()
+        self.sources = HyperLogLog()
+        self.bots = HyperLogLog()
+        self.pageviews = 0
+        # bot name -> TopK of paths; 'All traffic' covers every source
+        self.top_paths: Dict[str, TopK] = {}
+
+    def add(self, source: str, path: str, pageviews: int, bot: Optional[str] = None):
+        self.pages.add(path)
+        self.sources.add(source)
+        self.pageviews += pageviews
+        self._paths_for('All traffic').add(path, pageviews)
+        if bot:
+            self.bots.add(bot)
+            self._paths_for(bot).add(path, pageviews)
+
+    def _paths_for(self, name: str) -> TopK:
+        if name not in self.top_paths:
+            self.top_paths[name] = TopK(self.top_k)
+        return self.top_paths[name]
+
+    def merge(self, other: 'TrafficSketch'):
+        self.pages.merge(other.pages)
+        self.sources.merge(other.sources)
+        self.bots.merge(other.bots)
+        self.pageviews += other.pageviews
+        for name, sketch in other.top_paths.items():
+            if name in self.top_paths:
+                self.top_paths[name].merge(sketch)
+            else:
+                self.top_paths[name] = TopK.from_dict(sketch.to_dict())
+
+    def to_dict(self) -> Dict:
+        return {
+            'top_k': self.top_k,
+            'pages': self.pages.to_dict(),
+            'sources': self.sources.to_dict(),
+            'bots': self.bots.to_dict(),
+            'pageviews': self.pageviews,
+            'top_paths': {name: sketch.to_dict() for name, sketch in self.top_paths.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TrafficSketch':
+        sketch = cls(data['top_k'])
+        sketch.pages = HyperLogLog.from_dict(data['pages'])
+        sketch.sources = HyperLogLog.from_dict(data['sources'])
+        sketch.bots = HyperLogLog.from_dict(data['bots'])
+        sketch.pageviews = data['pageviews']
+        sketch.top_paths = {name: TopK.from_dict(d) for name, d in data['top_paths'].items()}
+        return sketch
+
+
+class DailySketchStore:
+    """Directory of one TrafficSketch JSON file per day (YYYYMMDD.json)."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def path_for(self, date: str) -> Path:
+        return self.directory / f"{date}.json"
+
+    def has(self, date: str) -> bool:
+        return self.path_for(date).exists()
+
+    def save(self, date: str, sketch: TrafficSketch):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(date)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sketch.to_dict(), f, separators=(',', ':'))
+        tmp_path.replace(path)
+
+    def discard(self, date: str):
+        self.path_for(date).unlink(missing_ok=True)
+
+    def load(self, date: str) -> Optional[TrafficSketch]:
+        path = self.path_for(date)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return TrafficSketch.from_dict(json.load(f))
+
+    def dates(self) -> List[str]:
+        return sorted(p.stem for p in self.directory.glob("[0-9]" * 8 + ".json"))
+
+    def query(self, start: str, end: str) -> Tuple[TrafficSketch, int]:
+        """Merge daily sketches for start..end inclusive (YYYYMMDD).
+
+        Returns the merged sketch and the number of days that had data.
+        """
+        merged = None
+        days_found = 0
+        day = datetime.strptime(start, "%Y%m%d")
+        last = datetime.strptime(end, "%Y%m%d")
+        while day <= last:
+            sketch = self.load(day.strftime("%Y%m%d"))
+            if sketch is not None:
+                days_found += 1
+                if merged is None:
+                    merged = sketch
+                else:
+                    merged.merge(sketch)
+            day += timedelta(days=1)
+        return merged or TrafficSketch(), days_found
+
+
+def build_daily_sketches(rows: Iterable[Tuple[str, str, str, int, Optional[str]]],
+                         top_k: int = DEFAULT_TOP_K) -> Dict[str, TrafficSketch]:
+    """Build one sketch per day from (date, source, path, pageviews, bot) rows."""
+    daily: Dict[str, TrafficSketch] = {}
+    for date, source, path, pageviews, bot in rows:
+        if date not in daily:
+            daily[date] = TrafficSketch(top_k)
+        daily[date].add(source, path, pageviews, bot)
+    return daily
@@ -8,30 +8,55 @@ This script will:
 1. Scan thought_leadership/articles/ for new article JSON files
 2. Update src/app/insights/[slug]/page.tsx with slug mapping
 3. Update src/app/api/ai/sitemap/route.ts with article metadata
-4. Update src/app/api/ai/knowledge-base/route.ts with article summary
+4. Compile thought_leadership/knowledge-base.json (served by /api/ai/knowledge-base)
+   from articles, case studies (Case_studies/version-store.json) and
+   content modules
 5. Update src/app/api/ai-consultant/route.ts system prompt
-6. Verify structured data exists in article JSON
-7. Create a summary report
+6. Regenerate public/llms.txt and public/llms-full.txt (within size budgets)
+7. Precompress crawler-facing files and refresh their ETag manifest
+8. Rebuild the offline chunk store (.cache/) from each article's bot content
+9. Detect slug/ID collisions and near-duplicate article bodies
+10. Verify structured data exists in article JSON
+11. Create a summary report
+
+Case studies are edited with case-study-versions.py.
 
 Usage:
     python scripts/sync-new-article.py
     python scripts/sync-new-article.py --check  # Check only, don't update
+    python scripts/sync-new-article.py --llms-full-kb 128 --llms-article-kb 16
+    python scripts/sync-new-article.py --check --profile sync-trace.json
 """
 
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
+
+from article_metadata import load_article_metadata
+from chunk_store import CHUNK_STORE, DEFAULT_MAX_TOKENS, build_chunk_store
+from knowledge_base import KNOWLEDGE_BASE_FILE, build_knowledge_base
+from llms_txt import LLMS_FULL_TXT, LLMS_TXT, generate_llms_files
+from minhash import LSHIndex, OnePermutationHasher, estimate_jaccard, word_shingles
+from precompress import MANIFEST_FILE, precompress_artifacts
+from profiling import span, start_profiling, traced
 
 # Base paths
 BASE_DIR = Path(__file__).parent.parent
 ARTICLES_DIR = BASE_DIR / "thought_leadership" / "articles"
 PAGE_TSX = BASE_DIR / "src" / "app" / "insights" / "[slug]" / "page.tsx"
 SITEMAP_ROUTE = BASE_DIR / "src" / "app" / "api" / "ai" / "sitemap" / "route.ts"
-KNOWLEDGE_BASE_ROUTE = BASE_DIR / "src" / "app" / "api" / "ai" / "knowledge-base" / "route.ts"
 AI_CONSULTANT_ROUTE = BASE_DIR / "src" / "app" / "api" / "ai-consultant" / "route.ts"
+NEAR_DUPLICATE_CACHE = BASE_DIR / ".cache" / "near-duplicates.json"
+
+# Bodies sharing at least this fraction of 5-word shingles are reported as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.5
+SHINGLE_WORDS = 5
 
 
 def load_article_json(file_path: Path) -> Dict:
@@ -40,8 +65,12 @@ def load_article_json(file_path: Path) -> Dict:
         return json.load(f)
 
 
-def scan_articles() -> List[Tuple[str, Dict]]:
-    """Scan all article JSON files and return parsed data."""
+@traced
+def scan_articles(full: bool = False, save_index: bool = True) -> List[Tuple[str, Dict]]:
+    """Scan article JSON files; metadata only (no bodies) unless full is set."""
+    if not full:
+        return [(file_path.stem, data) for file_path, data in load_article_metadata(save=save_index)]
+
     articles = []
     for file_path in ARTICLES_DIR.glob("article-*.json"):
         try:
@@ -52,6 +81,129 @@ def scan_articles() -> List[Tuple[str, Dict]]:
     return sorted(articles, key=lambda x: x[0])
 
 
+@traced
+def scan_article_sources(save_index: bool = True) -> List[Dict]:
+    """Every JSON file in the articles directory, in either schema, reduced to identity and body hash.
+
+    Read from the metadata index; bodies are loaded by load_bodies() only
+    when the near-duplicate scan has to run.
+    """
+    sources = []
+    for file_path, entry in load_article_metadata("*.json", save=save_index):
+        article = entry['article']
+        sources.append({
+            'file': file_path.name,
+            'path': file_path,
+            'id': article.get('id') or file_path.stem,
+            'slug': article.get('slug'),
+            'body_sha256': entry['body_sha256'],
+            'legacy': entry['legacy'],
+        })
+    return sources
+
+
+def load_bodies(sources: List[Dict]):
+    """Add each source's bot content as 'content'."""
+    for source in sources:
+        try:
+            data = load_article_json(source['path'])
+        except Exception as e:
+            print(f"⚠️  Error reading {source['file']}: {e}")
+            data = {}
+        source['content'] = data.get('article', data).get('versions', {}).get('bot', {}).get('content', '')
+
+
+def find_collisions(sources: List[Dict]) -> Dict[str, Dict[str, List[str]]]:
+    """Slugs and IDs claimed by more than one file, via one hash index pass each."""
+    collisions = {}
+    for field in ('slug', 'id'):
+        index: Dict[str, List[str]] = defaultdict(list)
+        for source in sources:
+            if source[field]:
+                index[str(source[field]).lower()].append(source['file'])
+        collisions[field] = {value: files for value, files in index.items() if len(files) > 1}
+    return collisions
+
+
+def body_shingles(content: str) -> Set[str]:
+    return word_shingles(' '.join(re.findall(r'\w+', content.lower())), SHINGLE_WORDS)
+
+
+@traced
+def cached_near_duplicates(sources: List[Dict], save: bool = True) -> List[Tuple[str, str, float]]:
+    """find_near_duplicates(), reused from the last run while no body has changed.
+
+    The result is cached under a hash of every (file, body hash) pair, so
+    the bodies are only read when one of them was added, edited or removed.
+    """
+    key = hashlib.sha256(json.dumps(
+        [NEAR_DUPLICATE_THRESHOLD, SHINGLE_WORDS] + [[s['file'], s['body_sha256']] for s in sources]
+    ).encode('utf-8')).hexdigest()
+    try:
+        with open(NEAR_DUPLICATE_CACHE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return [tuple(pair) for pair in cached['pairs']]
+    except (OSError, ValueError):
+        pass
+
+    load_bodies(sources)
+    pairs = find_near_duplicates(sources)
+    if not save:
+        return pairs
+    try:
+        save_near_duplicates(key, pairs)
+    except OSError as e:
+        print(f"⚠️  Could not save near-duplicate cache: {e}")
+    return pairs
+
+
+def save_near_duplicates(key: str, pairs: List[Tuple[str, str, float]]):
+    NEAR_DUPLICATE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=NEAR_DUPLICATE_CACHE.parent, prefix=f".{NEAR_DUPLICATE_CACHE.name}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'pairs': pairs}, f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, NEAR_DUPLICATE_CACHE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def find_near_duplicates(sources: List[Dict],
+                         threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Tuple[str, str, float]]:
+    """(file, file, Jaccard) for article bodies above threshold.
+
+    One-permutation MinHash signatures cost O(shingles) per article, and LSH
+    only compares files that share a signature band, so the cost grows with
+    the number of articles rather than the number of pairs.
+    Candidates are confirmed with exact Jaccard on their shingle sets.
+    """
+    hasher = OnePermutationHasher()
+    index = LSHIndex(hasher)
+    shingles = {}
+    signatures = {}
+    pairs = []
+
+    for source in sources:
+        name = source['file']
+        shingles[name] = body_shingles(source['content'])
+        if not shingles[name]:
+            continue
+        signatures[name] = hasher.signature(shingles[name])
+        for other in index.query(signatures[name]):
+            if estimate_jaccard(signatures[name], signatures[other]) < threshold / 2:
+                continue
+            a, b = shingles[name], shingles[other]
+            similarity = len(a & b) / len(a | b)
+            if similarity >= threshold:
+                pairs.append((other, name, similarity))
+        index.insert(name, signatures[name])
+
+    return sorted(pairs, key=lambda p: p[2], reverse=True)
+
+
 def extract_slug_mappings(page_tsx_content: str) -> Dict[str, str]:
     """Extract current slug mappings from page.tsx ARTICLE_SLUGS section only."""
     # Extract just the ARTICLE_SLUGS section
@@ -89,7 +241,9 @@ def generate_slug_from_title(title: str) -> str:
     return slug
 
 
-def analyze_discrepancies(articles: List[Tuple[str, Dict]], current_mappings: Dict[str, str]) -> Dict:
+@traced
+def analyze_discrepancies(articles: List[Tuple[str, Dict]], current_mappings: Dict[str, str],
+                          sources: List[Dict] = None, save_cache: bool = True) -> Dict:
     """Analyze discrepancies between articles and current mappings."""
     article_ids = {article_id for article_id, _ in articles}
     mapped_ids = set(current_mappings.values())
@@ -103,10 +257,16 @@ def analyze_discrepancies(articles: List[Tuple[str, Dict]], current_mappings: Di
         if not check_structured_data(data):
             missing_structured_data.append(article_id)
 
+    sources = sources or []
+    collisions = find_collisions(sources)
+
     return {
         'missing_from_mappings': missing_from_mappings,
         'extra_in_mappings': extra_in_mappings,
-        'missing_structured_data': missing_structured_data
+        'missing_structured_data': missing_structured_data,
+        'slug_collisions': collisions['slug'],
+        'id_collisions': collisions['id'],
+        'near_duplicates': cached_near_duplicates(sources, save=save_cache) if sources else [],
     }
 
 
@@ -146,21 +306,6 @@ def generate_sitemap_article_entry(article_data: Dict) -> str:
       }}'''
 
 
-def generate_knowledge_base_entry(article_data: Dict) -> str:
-    """Generate knowledge base entry for an article."""
-    article = article_data['article']
-    title = article['title']
-    slug = article['slug']
-    excerpt = article['versions']['bot']['excerpt']
-
-    return f'''      {{
-        title: "{title}",
-        url: "/insights/{slug}",
-        summary: "{excerpt}",
-        key_insights: {json.dumps(article['metadata']['tags'][:3])}
-      }}'''
-
-
 def generate_system_prompt_entry(article_data: Dict, number: int) -> str:
     """Generate system prompt entry for an article."""
     article = article_data['article']
@@ -175,6 +320,7 @@ def generate_system_prompt_entry(article_data: Dict, number: int) -> str:
     return f"{number}. **{title}**: {summary}"
 
 
+@traced
 def update_page_tsx(articles: List[Tuple[str, Dict]], dry_run: bool = False) -> bool:
     """Update page.tsx with new slug mappings."""
     if not PAGE_TSX.exists():
@@ -204,6 +350,7 @@ def update_page_tsx(articles: List[Tuple[str, Dict]], dry_run: bool = False) ->
     return True
 
 
+@traced
 def update_ai_consultant_prompt(articles: List[Tuple[str, Dict]], dry_run: bool = False) -> bool:
     """Update AI consultant system prompt with all articles."""
     if not AI_CONSULTANT_ROUTE.exists():
@@ -238,6 +385,7 @@ def update_ai_consultant_prompt(articles: List[Tuple[str, Dict]], dry_run: bool
     return True
 
 
+@traced
 def print_sync_report(articles: List[Tuple[str, Dict]], discrepancies: Dict):
     """Print comprehensive sync report."""
     print("\n" + "=" * 70)
@@ -267,11 +415,27 @@ def print_sync_report(articles: List[Tuple[str, Dict]], discrepancies: Dict):
             print(f"    • {article_id}")
         print(f"\n  Run: python scripts/add-structured-data.py {' '.join(discrepancies['missing_structured_data'])}")
 
+    for field in ('slug', 'id'):
+        collisions = discrepancies.get(f'{field}_collisions')
+        if collisions:
+            print(f"\n⚠️  {field.upper()} COLLISIONS (same {field} in several files):")
+            for value, files in sorted(collisions.items()):
+                print(f"    • {value}: {', '.join(files)}")
+
+    if discrepancies.get('near_duplicates'):
+        print(f"\n⚠️  NEAR-DUPLICATE ARTICLE BODIES:")
+        for file_a, file_b, similarity in discrepancies['near_duplicates']:
+            print(f"    • {file_a} ≈ {file_b} ({similarity:.0%} shared shingles)")
+
     print(f"\n📝 FILES TO UPDATE:")
     print(f"  • {PAGE_TSX.relative_to(BASE_DIR)}")
     print(f"  • {AI_CONSULTANT_ROUTE.relative_to(BASE_DIR)}")
     print(f"  • {SITEMAP_ROUTE.relative_to(BASE_DIR)}")
-    print(f"  • {KNOWLEDGE_BASE_ROUTE.relative_to(BASE_DIR)}")
+    print(f"  • {KNOWLEDGE_BASE_FILE.relative_to(BASE_DIR)}")
+    print(f"  • {LLMS_TXT.relative_to(BASE_DIR)}")
+    print(f"  • {LLMS_FULL_TXT.relative_to(BASE_DIR)}")
+    print(f"  • {MANIFEST_FILE.relative_to(BASE_DIR)} (+ .gz/.br variants)")
+    print(f"  • {CHUNK_STORE.relative_to(BASE_DIR)} (local only, not committed)")
 
 
 def main():
@@ -281,10 +445,18 @@ def main():
     parser = argparse.ArgumentParser(description='Sync articles across all files')
     parser.add_argument('--check', action='store_true', help='Check only, don\'t update files')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--llms-full-kb', type=int, help='Size budget for llms-full.txt in KB')
+    parser.add_argument('--llms-article-kb', type=int, help='Size budget per article in llms-full.txt in KB')
+    parser.add_argument('--chunk-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                        help='Approximate token size of retrieval chunks')
+    parser.add_argument('--force-llms', action='store_true', help='Rebuild llms files even if sources are unchanged')
+    parser.add_argument('--profile', metavar='TRACE_JSON',
+                        help='Write a Chrome trace of each sync stage and print a timing summary')
     args = parser.parse_args()
+    start_profiling(args.profile)
 
     print("\n🔍 Scanning articles directory...")
-    articles = scan_articles()
+    articles = scan_articles(save_index=not args.check)
 
     if not articles:
         print("❌ No article JSON files found in thought_leadership/articles/")
@@ -300,7 +472,9 @@ def main():
         current_mappings = {}
 
     # Analyze discrepancies
-    discrepancies = analyze_discrepancies(articles, current_mappings)
+    discrepancies = analyze_discrepancies(articles, current_mappings,
+                                          scan_article_sources(save_index=not args.check),
+                                          save_cache=not args.check)
 
     # Print report
     print_sync_report(articles, discrepancies)
@@ -315,6 +489,20 @@ def main():
     success = True
     success = update_page_tsx(articles, dry_run=False) and success
     success = update_ai_consultant_prompt(articles, dry_run=False) and success
+    with span('build_knowledge_base'):
+        success = build_knowledge_base() and success
+
+    budgets = {}
+    if args.llms_full_kb:
+        budgets['full_bytes'] = args.llms_full_kb * 1024
+    if args.llms_article_kb:
+        budgets['article_bytes'] = args.llms_article_kb * 1024
+    with span('generate_llms_files'):
+        success = generate_llms_files(budgets, force=args.force_llms) and success
+    with span('precompress_artifacts'):
+        success = precompress_artifacts() and success
+    with span('build_chunk_store'):
+        success = build_chunk_store(max_tokens=args.chunk_tokens) and success
 
     if success:
         print("\n✅ SYNC COMPLETE")
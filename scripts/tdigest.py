@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+t-digest Streaming Quantiles
+
+Constant-memory quantile sketch (merging t-digest, Dunning & Ertl). Values
+are buffered and periodically merged into at most ~compression centroids,
+with small centroids at the tails so p95/p99 stay accurate. Digests are
+mergeable and serializable, so per-window digests can be combined later.
+
+Used by analyze-token-usage.py.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+DEFAULT_COMPRESSION = 100
+
+
+class TDigest:
+    """Mergeable quantile sketch with bounded centroid count."""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Sorted [mean, weight] pairs
+        self._centroids: List[List[float]] = []
+        self._buffer: List[List[float]] = []
+        self._buffer_limit = int(5 * compression)
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append([float(value), float(weight)])
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def _scale(self, q: float) -> float:
+        """k1 scale function: centroids shrink toward q=0 and q=1."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer, key=lambda c: c[0])
+        self._buffer = []
+        total = sum(w for _, w in points)
+
+        merged = [list(points[0])]
+        cumulative = 0.0
+        k_left = self._scale(0.0)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            q_right = (cumulative + current[1] + weight) / total
+            if self._scale(q_right) - k_left <= 1.0:
+                new_weight = current[1] + weight
+                current[0] += (mean - current[0]) * weight / new_weight
+                current[1] = new_weight
+            else:
+                cumulative += current[1]
+                k_left = self._scale(cumulative / total)
+                merged.append([mean, weight])
+        self._centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile q (0..1); None if empty."""
+        self._compress()
+        centroids = self._centroids
+        if not centroids:
+            return None
+        if len(centroids) == 1:
+            return centroids[0][0]
+        q = min(max(q, 0.0), 1.0)
+        target = q * self.count
+
+        cumulative = 0.0
+        prev_center, prev_mean = 0.0, self.min
+        for mean, weight in centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - prev_center
+                if span <= 0:
+                    return mean
+                return prev_mean + (mean - prev_mean) * (target - prev_center) / span
+            prev_center, prev_mean = center, mean
+            cumulative += weight
+
+        span = self.count - prev_center
+        if span <= 0:
+            return self.max
+        return prev_mean + (self.max - prev_mean) * (target - prev_center) / span
+
+    def merge(self, other: 'TDigest'):
+        other._compress()
+        for mean, weight in other._centroids:
+            self._buffer.append([mean, weight])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def centroid_count(self) -> int:
+        self._compress()
+        return len(self._centroids)
+
+    def to_dict(self) -> Dict:
+        self._compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'centroids': self._centroids,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TDigest':
+        digest = cls(data['compression'])
+        digest.count = data['count']
+        if data['count']:
+            digest.min = data['min']
+            digest.max = data['max']
+        digest._centroids = [list(c) for c in data['centroids']]
+        return digest
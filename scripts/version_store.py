@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Case Study Version Store
+
+The committed source of the case studies (Case_studies/version-store.json):
+each case study's revision history, without storing a full copy of every
+revision:
+- Long text fields are cut into content-defined chunks (lines, and
+  sentences within long lines) and each distinct chunk is stored once in a
+  shared pool
+- A revision is the document's JSON structure with each long string
+  replaced by its list of chunk numbers (consecutive numbers stored as a
+  run: n, -count), so text shared between revisions,
+  between human/bot/chat renditions, or between documents costs one pool
+  entry
+- Rebuilding any revision is a single pass joining pooled chunks; no diff
+  chain has to be replayed
+
+There are no separate case study JSON files: the site and concierge read
+the latest revisions through src/lib/version-store.ts, and
+knowledge_base.py through load_documents(). Edits go through
+case-study-versions.py (checkout, edit, commit), which records a revision
+only when the document's content hash differs from the latest one. Chunks
+are never rewritten or removed, so existing chunk numbers stay valid.
+
+Used by case-study-versions.py and knowledge_base.py.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASE_DIR = Path(__file__).parent.parent
+VERSION_STORE = BASE_DIR / "Case_studies" / "version-store.json"
+
+FORMAT_VERSION = 1
+
+# Strings shorter than this stay inline in the revision structure
+MIN_CHUNKED_LENGTH = 80
+
+# Zero-width split points: after each run of newlines (so blank lines stay with the
+# paragraph before them), and after sentence ends inside a line
+CHUNK_BOUNDARY_PATTERN = re.compile(r'(?<=\n)(?!\n)|(?<=[.!?] )')
+
+CHUNK_MARKER = '$t'
+
+
+def split_text(text: str) -> List[str]:
+    """Content-defined chunks of text; joining them gives back the original."""
+    return [piece for piece in CHUNK_BOUNDARY_PATTERN.split(text) if piece]
+
+
+def encode_runs(ids: List[int]) -> List[int]:
+    """[5, 6, 7, 8, 2] -> [5, -3, 2]: each negative entry extends the previous number."""
+    encoded = []
+    run = 0
+    for n, chunk_id in enumerate(ids):
+        if n and chunk_id == ids[n - 1] + 1:
+            run += 1
+            continue
+        if run:
+            encoded.append(-run)
+            run = 0
+        encoded.append(chunk_id)
+    if run:
+        encoded.append(-run)
+    return encoded
+
+
+def decode_runs(encoded: List[int]) -> List[int]:
+    ids = []
+    for value in encoded:
+        if value < 0:
+            start = ids[-1] + 1
+            ids.extend(range(start, start - value))
+        else:
+            ids.append(value)
+    return ids
+
+
+def document_hash(document: Dict) -> str:
+    canonical = json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class VersionStore:
+    """Revisions per document key, with long strings deduplicated through a chunk pool."""
+
+    def __init__(self, path: Path = VERSION_STORE, data: Optional[Dict] = None):
+        self.path = Path(path)
+        data = data or {}
+        self.chunks: List[str] = data.get('chunks', [])
+        self.documents: Dict[str, List[Dict]] = data.get('documents', {})
+        self._chunk_ids = {chunk: n for n, chunk in enumerate(self.chunks)}
+        self._dirty = False
+
+    @classmethod
+    def open(cls, path: Path = VERSION_STORE) -> 'VersionStore':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} version store")
+        return cls(path, data)
+
+    def _pack(self, value):
+        if isinstance(value, str) and len(value) >= MIN_CHUNKED_LENGTH:
+            ids = []
+            for chunk in split_text(value):
+                chunk_id = self._chunk_ids.get(chunk)
+                if chunk_id is None:
+                    chunk_id = self._chunk_ids[chunk] = len(self.chunks)
+                    self.chunks.append(chunk)
+                ids.append(chunk_id)
+            return {CHUNK_MARKER: encode_runs(ids)}
+        if isinstance(value, dict):
+            return {key: self._pack(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._pack(item) for item in value]
+        return value
+
+    def _unpack(self, value):
+        if isinstance(value, dict):
+            if len(value) == 1 and CHUNK_MARKER in value:
+                chunks = self.chunks
+                return ''.join([chunks[n] for n in decode_runs(value[CHUNK_MARKER])])
+            return {key: self._unpack(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._unpack(item) for item in value]
+        return value
+
+    def record(self, key: str, document: Dict) -> Optional[int]:
+        """Add document as the next revision of key; None if it matches the latest one."""
+        revisions = self.documents.setdefault(key, [])
+        digest = document_hash(document)
+        if revisions and revisions[-1]['sha256'] == digest:
+            return None
+
+        revisions.append({
+            'revision': len(revisions) + 1,
+            'sha256': digest,
+            'recorded': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'length': len(json.dumps(document, ensure_ascii=False)),
+            'tree': self._pack(document),
+        })
+        self._dirty = True
+        return len(revisions)
+
+    def keys(self) -> List[str]:
+        return sorted(self.documents)
+
+    def history(self, key: str) -> List[Dict]:
+        """Revision summaries (number, hash, timestamp, size) for key, oldest first."""
+        return [{k: v for k, v in revision.items() if k != 'tree'}
+                for revision in self.documents.get(key, [])]
+
+    def get(self, key: str, revision: int = -1) -> Optional[Dict]:
+        """Rebuild a revision of key: 1-based number, or negative to count from the latest."""
+        revisions = self.documents.get(key, [])
+        index = revision - 1 if revision > 0 else revision
+        if not revisions or not -len(revisions) <= index < len(revisions):
+            return None
+        return self._unpack(revisions[index]['tree'])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'documents': len(self.documents),
+            'revisions': sum(len(revisions) for revisions in self.documents.values()),
+            'chunks': len(self.chunks),
+            'history_bytes': sum(r['length'] for revisions in self.documents.values() for r in revisions),
+        }
+
+    def _serialize(self) -> str:
+        # Valid JSON with one chunk or revision per line, so a new revision
+        # shows up in git as a few added lines
+        def dump(value):
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+        documents = ',\n'.join(
+            f"{dump(key)}:[\n" + ',\n'.join(dump(revision) for revision in self.documents[key]) + "\n]"
+            for key in self.keys())
+        return (f'{{"format":{FORMAT_VERSION},\n"chunks":[\n' + ',\n'.join(dump(chunk) for chunk in self.chunks)
+                + f'\n],\n"documents":{{\n{documents}\n}}}}\n')
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self._serialize())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
+
+
+def load_documents(path: Path = VERSION_STORE) -> Dict[str, Dict]:
+    """Latest revision of every document, by key."""
+    store = VersionStore.open(path)
+    return {key: store.get(key) for key in store.keys()}
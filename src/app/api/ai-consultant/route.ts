@@ -297,6 +297,7 @@ Keep responses under 50 words. Be direct, insightful, professional.`
 
     // Call Anthropic API
     // IMPORTANT: API key only works with claude-3-haiku-20240307 - do NOT change to Sonnet/Opus
+    const apiStartTime = Date.now()
     const response = await fetch('https://api.anthropic.com/v1/messages', {
       method: 'POST',
       headers: {
@@ -360,6 +361,8 @@ Keep responses under 50 words. Be direct, insightful, professional.`
       input_tokens: inputTokens,
       output_tokens: outputTokens,
       total_tokens: totalTokens,
+      latency_ms: Date.now() - apiStartTime,
+      route: '/api/ai-consultant',
       model: 'claude-3-haiku-20240307',
       query_preview: sanitizedQuery.substring(0, 50)
     })
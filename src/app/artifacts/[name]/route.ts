@@ -0,0 +1,139 @@
+import { createHash } from 'crypto'
+import { readFile } from 'fs/promises'
+import path from 'path'
+import { NextRequest, NextResponse } from 'next/server'
+import { ARTIFACTS, ARTIFACT_MANIFEST, ENCODINGS } from '@/lib/artifacts'
+
+/**
+ * Precompressed Artifact Endpoint
+ *
+ * Serves the crawler-facing files precompressed by scripts/precompress.py
+ * (reached through the rewrites in next.config.ts):
+ * - Picks the .br or .gz variant the client accepts, with Content-Encoding
+ * - Sends the manifest's strong ETag for the variant served
+ * - Answers a matching If-None-Match with 304 and no body
+ *
+ * Without a manifest entry (precompress not run yet) the original file is
+ * served with an ETag hashed from its content.
+ *
+ * Responses are cached at the CDN (s-maxage), which a deployment purges,
+ * so crawler fetches rarely reach this function; browsers and crawlers
+ * revalidate with If-None-Match. The /artifacts/<name> path itself
+ * redirects to the canonical URL (next.config.ts).
+ *
+ * GET /llms-full.txt, /ai-sitemap.json, /manifest.json
+ */
+
+export const runtime = 'nodejs'
+
+const PUBLIC_DIR = path.join(process.cwd(), 'public')
+
+const CONTENT_TYPES: Record<string, string> = {
+  '.txt': 'text/plain; charset=utf-8',
+  '.json': 'application/json; charset=utf-8',
+}
+
+// Clients revalidate every time; the CDN keeps a copy for a day and serves
+// it stale for up to a week while refreshing
+const CACHE_CONTROL = 'public, max-age=0, must-revalidate, s-maxage=86400, stale-while-revalidate=604800'
+
+interface ManifestEntry {
+  etag: string
+  length: number
+  encodings?: Record<string, { etag: string; length: number }>
+}
+
+let manifestCache: Record<string, ManifestEntry> | null = null
+
+async function loadManifest(): Promise<Record<string, ManifestEntry>> {
+  // Deployments are immutable, so the manifest is read once per instance
+  if (manifestCache === null) {
+    try {
+      manifestCache = JSON.parse(await readFile(path.join(PUBLIC_DIR, ARTIFACT_MANIFEST), 'utf-8'))
+    } catch {
+      manifestCache = {}
+    }
+  }
+  return manifestCache!
+}
+
+// Same format as the manifest's ETags (scripts/precompress.py)
+function contentEtag(body: Buffer): string {
+  return `"${createHash('sha256').update(body).digest('hex').slice(0, 32)}"`
+}
+
+function acceptedEncodings(header: string | null): Set<string> {
+  const accepted = new Set<string>()
+  for (const part of (header || '').split(',')) {
+    const [coding, ...params] = part.trim().toLowerCase().split(';')
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='))
+    if (coding && (!q || parseFloat(q.slice(2)) > 0)) {
+      accepted.add(coding)
+    }
+  }
+  return accepted
+}
+
+function etagMatches(header: string | null, etag: string): boolean {
+  if (!header) return false
+  return header.split(',').some(tag => {
+    const value = tag.trim()
+    return value === '*' || value === etag || value === `W/${etag}`
+  })
+}
+
+async function serve(request: NextRequest, name: string, withBody: boolean) {
+  if (!ARTIFACTS.includes(name)) {
+    return new NextResponse(null, { status: 404 })
+  }
+
+  const entry = (await loadManifest())[name]
+  const headers: Record<string, string> = {
+    'Content-Type': CONTENT_TYPES[path.extname(name)] || 'application/octet-stream',
+    'Cache-Control': CACHE_CONTROL,
+    'Vary': 'Accept-Encoding',
+  }
+
+  let file = name
+  if (entry) {
+    headers['ETag'] = entry.etag
+    const accepted = acceptedEncodings(request.headers.get('accept-encoding'))
+    for (const [encoding, suffix] of Object.entries(ENCODINGS)) {
+      const variant = entry.encodings?.[encoding]
+      if (variant && accepted.has(encoding)) {
+        file = name + suffix
+        headers['ETag'] = variant.etag
+        headers['Content-Encoding'] = encoding
+        break
+      }
+    }
+    if (etagMatches(request.headers.get('if-none-match'), headers['ETag'])) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+  }
+
+  let body: Buffer
+  try {
+    body = await readFile(path.join(PUBLIC_DIR, file))
+  } catch {
+    return new NextResponse(null, { status: 404 })
+  }
+  if (!entry) {
+    headers['ETag'] = contentEtag(body)
+    if (etagMatches(request.headers.get('if-none-match'), headers['ETag'])) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+  }
+  headers['Content-Length'] = String(body.length)
+  return new NextResponse(withBody ? new Uint8Array(body) : null, { status: 200, headers })
+}
+
+export async function GET(request: NextRequest, { params }: { params: Promise<{ name: string }> }) {
+  const { name } = await params
+  return serve(request, name, true)
+}
+
+export async function HEAD(request: NextRequest, { params }: { params: Promise<{ name: string }> }) {
+  const { name } = await params
+  return serve(request, name, false)
+}
@@ -1,6 +1,7 @@
 import { notFound } from 'next/navigation'
 import { Metadata } from 'next'
 import Link from 'next/link'
+import { loadDocument } from '@/lib/version-store'
 
 // Case study slug mapping
 const CASE_STUDY_SLUGS: Record<string, string> = {
@@ -39,11 +40,7 @@ interface CaseStudyData {
 
 async function loadCaseStudy(caseStudyId: string): Promise<CaseStudyData | null> {
   try {
-    const fs = require('fs')
-    const path = require('path')
-    const filePath = path.join(process.cwd(), 'Case_studies', `${caseStudyId}.json`)
-    const fileContent = fs.readFileSync(filePath, 'utf-8')
-    return JSON.parse(fileContent)
+    return loadDocument<CaseStudyData>(caseStudyId)
   } catch (error) {
     return null
   }
@@ -0,0 +1,22 @@
+/**
+ * Precompressed Crawler Artifacts
+ *
+ * Files in public/ that scripts/precompress.py writes .gz/.br variants and
+ * ETags for (keep in sync with ARTIFACTS there). next.config.ts rewrites
+ * these paths to /artifacts/[name], which serves the best variant for the
+ * request's Accept-Encoding and answers If-None-Match with 304.
+ */
+
+export const ARTIFACTS = [
+  'llms-full.txt',
+  'ai-sitemap.json',
+  'manifest.json',
+]
+
+export const ARTIFACT_MANIFEST = 'artifact-manifest.json'
+
+// Content-Encoding → file suffix, in order of preference
+export const ENCODINGS: Record<string, string> = {
+  br: '.br',
+  gzip: '.gz',
+}
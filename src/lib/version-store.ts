@@ -0,0 +1,87 @@
+import { readFileSync } from 'fs'
+import path from 'path'
+
+/**
+ * Case Study Version Store Reader
+ *
+ * Case studies live only in Case_studies/version-store.json, written by
+ * scripts/case-study-versions.py (see scripts/version_store.py for the
+ * format). A revision is the document's JSON with each long string stored
+ * as {"$t": [chunk numbers]}, where a negative number extends the previous
+ * one into a run; the text is the pooled chunks joined in order.
+ *
+ * Server-only: reads the store from disk once per instance.
+ */
+
+export const VERSION_STORE = path.join(process.cwd(), 'Case_studies', 'version-store.json')
+
+const FORMAT_VERSION = 1
+const CHUNK_MARKER = '$t'
+
+interface Revision {
+  revision: number
+  sha256: string
+  recorded: string
+  length: number
+  tree: unknown
+}
+
+interface StoreData {
+  format: number
+  chunks: string[]
+  documents: Record<string, Revision[]>
+}
+
+let storeCache: StoreData | null = null
+
+function loadStore(): StoreData {
+  if (storeCache === null) {
+    const data = JSON.parse(readFileSync(VERSION_STORE, 'utf-8')) as StoreData
+    if (data.format !== FORMAT_VERSION) {
+      throw new Error(`${VERSION_STORE} is not a version ${FORMAT_VERSION} version store`)
+    }
+    storeCache = data
+  }
+  return storeCache
+}
+
+function decodeRuns(encoded: number[]): number[] {
+  const ids: number[] = []
+  for (const value of encoded) {
+    if (value < 0) {
+      const start = ids[ids.length - 1] + 1
+      for (let id = start; id < start - value; id++) ids.push(id)
+    } else {
+      ids.push(value)
+    }
+  }
+  return ids
+}
+
+function unpack(value: unknown, chunks: string[]): unknown {
+  if (Array.isArray(value)) {
+    return value.map(item => unpack(item, chunks))
+  }
+  if (value !== null && typeof value === 'object') {
+    const entries = Object.entries(value)
+    if (entries.length === 1 && entries[0][0] === CHUNK_MARKER) {
+      return decodeRuns(entries[0][1] as number[]).map(id => chunks[id]).join('')
+    }
+    return Object.fromEntries(entries.map(([key, item]) => [key, unpack(item, chunks)]))
+  }
+  return value
+}
+
+/**
+ * Rebuild a revision of a document: 1-based number, or negative to count
+ * back from the latest (default). Null if there is no such revision.
+ */
+export function loadDocument<T>(key: string, revision = -1): T | null {
+  const store = loadStore()
+  const revisions = store.documents[key] || []
+  const index = revision > 0 ? revision - 1 : revisions.length + revision
+  if (index < 0 || index >= revisions.length) {
+    return null
+  }
+  return unpack(revisions[index].tree, store.chunks) as T
+}
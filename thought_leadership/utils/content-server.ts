@@ -138,18 +138,14 @@ async function loadCaseStudy(caseStudyId: string): Promise<CaseStudyContent | nu
   try {
     // In Node.js environment (API routes), read from filesystem
     if (typeof window === 'undefined') {
-      const fs = await import('fs');
-      const path = await import('path');
-
-      const caseStudyPath = path.join(process.cwd(), 'Case_studies', `${caseStudyId}.json`);
+      // Case studies live only in the version store (Case_studies/version-store.json)
+      const { loadDocument } = await import('@/lib/version-store');
 
-      if (!fs.existsSync(caseStudyPath)) {
-        console.warn(`Case study ${caseStudyId} not found at ${caseStudyPath}`);
-        return null;
+      const caseStudy = loadDocument<CaseStudyContent>(caseStudyId);
+      if (!caseStudy) {
+        console.warn(`Case study ${caseStudyId} not found in the version store`);
       }
-
-      const fileContent = fs.readFileSync(caseStudyPath, 'utf8');
-      return JSON.parse(fileContent);
+      return caseStudy;
     } else {
       // In browser environment, fetch from public API
       const caseStudyPath = `/Case_studies/${caseStudyId}.json`;